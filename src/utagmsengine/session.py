@@ -0,0 +1,187 @@
+from typing import List, Dict, Optional, Tuple
+
+import numpy as np
+
+from .utils.analysis_context import AnalysisContext
+from .utils.dataclasses_utils import DataclassesUtils
+from .utils.solver_utils import SolverUtils
+from .dataclasses import Comparison, Criterion, DataValidator, Position, Intensity
+from .solver import Solver
+
+
+class ElicitationSession:
+    """
+    Preference information given one piece at a time, ex. by a decision maker comparing alternatives
+    interactively, with the necessary and possible relations kept between changes.
+
+    Adding preference information can only make the set of compatible value functions smaller, so pairs in the
+    necessary relation stay in it and pairs outside of the possible relation stay outside of it, removing it can
+    only make the set bigger. After a change only the pairs whose status can flip are solved again.
+    """
+
+    def __init__(
+            self,
+            performance_table_dict: Dict[str, Dict[str, float]],
+            criteria: List[Criterion],
+            solver: Optional[Solver] = None
+    ):
+        """
+        :param performance_table_dict:
+        :param criteria: List of Criterion objects
+        :param solver: backend, backend_options, max_workers, executor and show_logs are taken from it,
+        default None - Solver()
+        """
+        DataValidator.validate_criteria(performance_table_dict, criteria)
+        DataValidator.validate_performance_table(performance_table_dict)
+
+        self.performance_table_dict: Dict[str, Dict[str, float]] = performance_table_dict
+        self.criteria: List[Criterion] = criteria
+        self.solver: Solver = solver if solver is not None else Solver()
+
+        self.comparisons: List[Comparison] = []
+        self.positions: List[Position] = []
+        self.intensities: List[Intensity] = []
+
+        self.alternatives_id_list: List[str] = list(performance_table_dict.keys())
+        self.refined_performance_table_dict: List[List[float]] = DataclassesUtils.refine_performance_table_dict(
+            performance_table_dict=performance_table_dict
+        )
+        self.refined_gains: List[bool] = DataclassesUtils.refine_gains(criterions=criteria)
+        self.refined_linear_segments: List[int] = DataclassesUtils.refine_linear_segments(criterions=criteria)
+
+        # Relations for the last computed preference information, None before the first computation
+        self.necessary: Optional[np.ndarray] = None
+        self.possible: Optional[np.ndarray] = None
+        # Whether preference information was added or removed since the last computation
+        self.is_tightened: bool = False
+        self.is_relaxed: bool = False
+
+        self.relation_dicts: Tuple[Dict[str, List[str]], Dict[str, List[str]]] = ({}, {})
+
+        # Number of relation problems solved by the last computation
+        self.number_of_solved: int = 0
+
+    def add_comparison(self, comparison: Comparison):
+        """
+        :param comparison: Comparison object
+        """
+        DataValidator.validate_comparisons_criteria([comparison], [], self.criteria)
+        # Raises an error for unknown alternatives before the session is changed
+        DataclassesUtils.refine_comparisons(performance_table_dict=self.performance_table_dict, comparisons=[comparison])
+
+        self.comparisons.append(comparison)
+        self.is_tightened: bool = True
+
+    def remove_comparison(self, comparison: Comparison):
+        """
+        :param comparison: Comparison object equal to one added before
+
+        :raises ValueError: if there is no such comparison
+        """
+        self.comparisons.remove(comparison)
+        self.is_relaxed: bool = True
+
+    def add_position(self, position: Position):
+        """
+        :param position: Position object
+        """
+        DataValidator.validate_positions([position], self.performance_table_dict)
+        DataValidator.validate_comparisons_criteria([], [position], self.criteria)
+
+        self.positions.append(position)
+        self.is_tightened: bool = True
+
+    def add_intensity(self, intensity: Intensity):
+        """
+        :param intensity: Intensity object
+        """
+        # Raises an error for unknown alternatives or criteria before the session is changed
+        DataclassesUtils.refine_intensities(intensities=[intensity], performance_table_dict=self.performance_table_dict)
+
+        self.intensities.append(intensity)
+        self.is_tightened: bool = True
+
+    def get_relation_bounds(self) -> Tuple[Tuple[Optional[np.ndarray], Optional[np.ndarray]], Tuple[Optional[np.ndarray], Optional[np.ndarray]]]:
+        """
+        Bounds of the relations for the current preference information given by the last computed ones, see
+        AnalysisContext. After both adding and removing preference information nothing is known.
+
+        :return necessary_bounds, possible_bounds:
+        """
+        necessary_bounds: List[Optional[np.ndarray]] = [None, None]
+        possible_bounds: List[Optional[np.ndarray]] = [None, None]
+        if self.necessary is not None:
+            if not self.is_relaxed:
+                necessary_bounds[0] = self.necessary
+                possible_bounds[1] = self.possible
+            if not self.is_tightened:
+                necessary_bounds[1] = self.necessary
+                possible_bounds[0] = self.possible
+
+        return (necessary_bounds[0], necessary_bounds[1]), (possible_bounds[0], possible_bounds[1])
+
+    def update(self):
+        """
+        Method for computing the relations for the current preference information, if it changed since the last
+        computation.
+        """
+        if self.necessary is not None and not self.is_tightened and not self.is_relaxed:
+            return
+
+        necessary_bounds, possible_bounds = self.get_relation_bounds()
+
+        with AnalysisContext(
+                performance_table_list=self.refined_performance_table_dict,
+                alternatives_id_list=self.alternatives_id_list,
+                comparisons=DataclassesUtils.refine_comparisons(
+                    performance_table_dict=self.performance_table_dict,
+                    comparisons=self.comparisons
+                ),
+                criteria=self.refined_gains,
+                worst_best_position=DataclassesUtils.refine_positions(
+                    positions=self.positions,
+                    performance_table_dict=self.performance_table_dict
+                ),
+                number_of_points=self.refined_linear_segments,
+                comprehensive_intensities=DataclassesUtils.refine_intensities(
+                    intensities=self.intensities,
+                    performance_table_dict=self.performance_table_dict
+                ),
+                show_logs=self.solver.show_logs,
+                backend=self.solver.backend,
+                backend_options=self.solver.backend_options,
+                max_workers=self.solver.max_workers,
+                executor=self.solver.executor,
+                necessary_bounds=necessary_bounds,
+                possible_bounds=possible_bounds
+        ) as context:
+            self.necessary: np.ndarray = context.get_necessary_sweep().relation
+            self.possible: np.ndarray = context.get_possible_relation()
+            self.number_of_solved: int = context.number_of_solved
+
+            self.relation_dicts: Tuple[Dict[str, List[str]], Dict[str, List[str]]] = context.get_necessary_and_possible_relations()
+
+        self.is_tightened: bool = False
+        self.is_relaxed: bool = False
+
+    def get_necessary_and_possible_relations(self) -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
+        """
+        :return necessary, possible: for the current preference information
+        """
+        self.update()
+
+        return self.relation_dicts
+
+    def get_hasse_diagram_dict(self) -> Dict[str, List[str]]:
+        """
+        :return direct_relations: see Solver.get_hasse_diagram_dict
+        """
+        necessary, _ = self.get_necessary_and_possible_relations()
+
+        direct_relations: Dict[str, List[str]] = SolverUtils.calculate_direct_relations(necessary)
+
+        for alternatives_id in self.alternatives_id_list:
+            if alternatives_id not in direct_relations.keys():
+                direct_relations[alternatives_id] = []
+
+        return direct_relations
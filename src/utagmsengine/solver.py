@@ -1,6 +1,15 @@
-from typing import List, Dict, Optional, Tuple
+from typing import Any, List, Dict, Optional, Tuple, Union
+
+from pulp import LpSolver, LpStatus
+
+from .utils.backend_utils import BackendUtils
 from .utils.solver_utils import SolverUtils
+from .utils.analysis_context import AnalysisContext
 from .utils.dataclasses_utils import DataclassesUtils
+from .utils.result_cache import ResultCache
+from .utils.sampler_utils import SamplerUtils
+from .utils.sample_store import SampleStore
+from .utils.sampler_worker import SamplerWorker
 from .dataclasses import Comparison, Criterion, DataValidator, Position, Intensity
 
 
@@ -9,16 +18,72 @@ class Inconsistency(Exception):
         super().__init__(message)
         self.data = data
 
+    def __reduce__(self):
+        # Keeps data when the exception is pickled, ex. by the disk store of ResultCache
+        return self.__class__, (self.args[0], self.data)
+
 
 class Solver:
 
-    def __init__(self, show_logs: Optional[bool] = False):
+    def __init__(
+            self,
+            show_logs: Optional[bool] = False,
+            backend: Optional[Union[str, LpSolver]] = 'glpk',
+            backend_options: Optional[Dict[str, float]] = None,
+            max_workers: Optional[int] = None,
+            executor: str = 'thread',
+            cache: Optional[ResultCache] = None,
+            sampler_worker: Optional[SamplerWorker] = None
+    ):
+        """
+        :param show_logs: default False
+        :param backend: 'glpk', 'cbc', 'highs' (in-process, requires highspy) or an instance of a PuLP solver,
+        default 'glpk'
+        :param backend_options: 'time_limit' (seconds), 'mip_gap' (relative) and 'threads', default None
+        :param max_workers: number of problems of the relation and extreme ranking sweeps solved at once,
+        default None - one by one
+        :param executor: 'thread' or 'process' pool of the sweeps, processes are needed to solve with 'highs' in
+        parallel, default 'thread'
+        :param cache: ResultCache returning results of get_hasse_diagram_dict, get_representative_value_function_dict
+        and get_relation_intervals_dict for inputs they were already computed for, not used with an instance of
+        a PuLP solver as backend, whose options are not known, default None - no caching
+        :param sampler_worker: long-lived process running the 'numpy' chain of get_representative_value_function_dict,
+        started on the first call and stopped by SamplerWorker.close, not used by 'polyrun', default None - the chain
+        is run by this process
+        """
+        BackendUtils.check_backend(backend)
+        BackendUtils.check_backend_options(backend_options)
+        if executor not in ('thread', 'process'):
+            raise ValueError(f"Unknown executor '{executor}', expected 'thread' or 'process'")
+
         self.name = 'UTA GMS Solver'
         self.show_logs = show_logs
+        self.backend = backend
+        self.backend_options = backend_options
+        self.max_workers = max_workers
+        self.executor = executor
+        # Results of a PuLP solver instance cannot be keyed, its class does not identify its options
+        self.cache = cache if isinstance(backend, str) else None
+        self.sampler_worker = sampler_worker
 
     def __str__(self):
         return self.name
 
+    def get_cache_key(self, method_name: str, **arguments) -> str:
+        """
+        :param method_name:
+        :param arguments: inputs of the method
+
+        :return key: see ResultCache.get_key, backend and its options are part of the key, max_workers and executor
+        do not change results
+        """
+        return ResultCache.get_key(
+            method_name,
+            backend=self.backend,
+            backend_options=self.backend_options,
+            **arguments
+        )
+
     def get_hasse_diagram_dict(
             self,
             performance_table_dict: Dict[str, Dict[str, float]],
@@ -42,6 +107,19 @@ class Solver:
         DataValidator.validate_performance_table(performance_table_dict)
         DataValidator.validate_positions(positions, performance_table_dict)
 
+        if self.cache is not None:
+            cache_key: str = self.get_cache_key(
+                'get_hasse_diagram_dict',
+                performance_table_dict=performance_table_dict,
+                comparisons=comparisons,
+                criteria=criteria,
+                positions=positions,
+                intensities=intensities
+            )
+            is_cached, direct_relations = self.cache.get(cache_key)
+            if is_cached:
+                return direct_relations
+
         refined_performance_table_dict: List[List[float]] = DataclassesUtils.refine_performance_table_dict(
             performance_table_dict=performance_table_dict
         )
@@ -79,7 +157,11 @@ class Solver:
             worst_best_position=refined_worst_best_position,
             number_of_points=refined_linear_segments,
             comprehensive_intensities=refined_intensities,
-            show_logs=self.show_logs
+            show_logs=self.show_logs,
+            backend=self.backend,
+            backend_options=self.backend_options,
+            max_workers=self.max_workers,
+            executor=self.executor
         )
 
         direct_relations: Dict[str, List[str]] = SolverUtils.calculate_direct_relations(necessary_preference)
@@ -88,6 +170,9 @@ class Solver:
             if alternatives_id not in direct_relations.keys():
                 direct_relations[alternatives_id] = []
 
+        if self.cache is not None:
+            self.cache.put(cache_key, direct_relations)
+
         return direct_relations
 
     def get_representative_value_function_dict(
@@ -99,8 +184,13 @@ class Solver:
             intensities: Optional[List[Intensity]] = [],
             sampler_path: str = 'files/polyrun-1.1.0-jar-with-dependencies.jar',
             number_of_samples: str = '100',
-            sampler_on: bool = True
-    ) -> Tuple[Dict[str, float], Dict[str, List[Tuple[float, float]]], Dict[str, List[float]], Dict[str, Dict[str, float]], int, List[List[int]], Dict[str, List[str]], Dict[str, List[str]], str]:
+            sampler_on: bool = True,
+            sampler: str = 'polyrun',
+            sampler_options: Optional[Dict[str, int]] = None,
+            tolerance: Optional[float] = None,
+            sample_store: Optional[SampleStore] = None,
+            return_sampler_metrics: bool = False
+    ) -> Union[Tuple[Dict[str, float], Dict[str, List[Tuple[float, float]]], Dict[str, List[float]], Dict[str, Dict[str, float]], int, List[List[int]], Dict[str, List[str]], Dict[str, List[str]], str], Tuple[Dict[str, float], Dict[str, List[Tuple[float, float]]], Dict[str, List[float]], Dict[str, Dict[str, float]], int, List[List[int]], Dict[str, List[str]], Dict[str, List[str]], str, Dict[str, Any]]]:
         """
         Method for getting The Most Representative Value Function
 
@@ -112,13 +202,59 @@ class Solver:
         :param sampler_path:
         :param number_of_samples:
         :param sampler_on:
-
-        :return:
+        :param sampler: 'polyrun' - Polyrun JAR at sampler_path, run with Java, or 'numpy' - in-process hit-and-run
+        sampler, default 'polyrun'
+        :param sampler_options: 'seed', 'thinning' (number of steps between samples), 'number_of_chains' (number of
+        independent chains run at the same time, each in its own process, with seeds seed, seed + 1, ...) and, for
+        'numpy', 'burn_in', default None - random seed, Polyrun default thinning or square of the dimension for
+        'numpy', one chain
+        :param tolerance: maximum standard error of position_percentage and pairwise_percentage, in percentage
+        points: samples are drawn in batches until it is reached, number_of_samples is then the maximum number of
+        samples, default None - number_of_samples samples. Samples of a chain are correlated, the standard error
+        is estimated with batch means over batches of 100 consecutive accepted samples of one chain, at least
+        10 of them, and is never below the one of independent samples, see SolverUtils.calculate_sampler_precision
+        :param sample_store: on-disk store of the accepted samples, written as they arrive, which can be reopened
+        with SampleStore.open and read again with SolverUtils.get_sample_store_metrics; results are not taken from
+        nor put in the cache, default None - samples are not kept
+        :param return_sampler_metrics: whether sampler_metrics is returned as the last value, default False
+
+        :return: (representative_value_function_dict, criterion_functions, position_percentage, pairwise_percentage,
+        number_of_samples_used, extreme_ranking, necessary, possible, sampler_error[, sampler_metrics]),
+        sampler_metrics - 'precision', the greatest standard error of a percentage reached (infinity with fewer than
+        10 batches, see tolerance), and 'chain_diagnostics',
+        'seed', 'number_of_drawn', 'number_of_accepted', 'precision' and 'max_difference' (the greatest difference
+        between a percentage of the chain and the merged one) of every chain, see SolverUtils.get_sampler_metrics
         """
         DataValidator.validate_criteria(performance_table_dict, criteria)
         DataValidator.validate_performance_table(performance_table_dict)
         DataValidator.validate_positions(positions, performance_table_dict)
         DataValidator.validate_comparisons_criteria(comparisons, positions, criteria)
+        SamplerUtils.check_sampler(sampler)
+
+        # A result from the cache would leave the sample store empty
+        cache: Optional[ResultCache] = self.cache if sample_store is None else None
+
+        if cache is not None:
+            cache_key: str = self.get_cache_key(
+                'get_representative_value_function_dict',
+                performance_table_dict=performance_table_dict,
+                comparisons=comparisons,
+                criteria=criteria,
+                positions=positions,
+                intensities=intensities,
+                sampler_path=sampler_path,
+                number_of_samples=number_of_samples,
+                sampler_on=sampler_on,
+                sampler=sampler,
+                sampler_options=sampler_options,
+                tolerance=tolerance
+            )
+            is_cached, result = cache.get(cache_key)
+            if is_cached:
+                # Inconsistent preference information is cached as the raised exception
+                if isinstance(result, Inconsistency):
+                    raise result
+                return result if return_sampler_metrics else result[:-1]
 
         refined_performance_table_dict: List[List[float]] = DataclassesUtils.refine_performance_table_dict(
             performance_table_dict=performance_table_dict
@@ -149,79 +285,191 @@ class Solver:
 
         alternatives_id_list: List[str] = list(performance_table_dict.keys())
 
-        problem, position_percentage, pairwise_percentage, number_of_samples_used, sampler_error = SolverUtils.calculate_the_most_representative_function(
-            performance_table_list=refined_performance_table_dict,
-            alternatives_id_list=alternatives_id_list,
-            comparisons=refined_comparisons,
-            criteria=refined_gains,
-            worst_best_position=refined_worst_best_position,
-            number_of_points=refined_linear_segments,
-            comprehensive_intensities=refined_intensities,
-            show_logs=self.show_logs,
-            sampler_path=sampler_path,
-            number_of_samples=number_of_samples,
-            sampler_on=sampler_on
-        )
-
-        extreme_ranking = SolverUtils.calculate_extreme_ranking_analysis(
-            performance_table_list=refined_performance_table_dict,
-            comparisons=refined_comparisons,
-            criteria=refined_gains,
-            worst_best_position=refined_worst_best_position,
-            number_of_points=refined_linear_segments,
-            comprehensive_intensities=refined_intensities,
-            show_logs=self.show_logs
-        )
+        # Necessary relation, extreme ranking and cores of the workers are shared by all phases of the analysis
+        with AnalysisContext(
+                performance_table_list=refined_performance_table_dict,
+                alternatives_id_list=alternatives_id_list,
+                comparisons=refined_comparisons,
+                criteria=refined_gains,
+                worst_best_position=refined_worst_best_position,
+                number_of_points=refined_linear_segments,
+                comprehensive_intensities=refined_intensities,
+                show_logs=self.show_logs,
+                backend=self.backend,
+                backend_options=self.backend_options,
+                max_workers=self.max_workers,
+                executor=self.executor
+        ) as context:
+            problem, position_percentage, pairwise_percentage, number_of_samples_used, sampler_precision, chain_diagnostics, sampler_error = SolverUtils.calculate_the_most_representative_function(
+                performance_table_list=refined_performance_table_dict,
+                alternatives_id_list=alternatives_id_list,
+                comparisons=refined_comparisons,
+                criteria=refined_gains,
+                worst_best_position=refined_worst_best_position,
+                number_of_points=refined_linear_segments,
+                comprehensive_intensities=refined_intensities,
+                show_logs=self.show_logs,
+                sampler_path=sampler_path,
+                number_of_samples=number_of_samples,
+                sampler_on=sampler_on,
+                backend=self.backend,
+                backend_options=self.backend_options,
+                necessary_preference=context.get_necessary_relations(),
+                sampler=sampler,
+                sampler_options=sampler_options,
+                sampler_worker=self.sampler_worker,
+                tolerance=tolerance,
+                sample_store=sample_store
+            )
+
+            # Epsilon is free below, so the problem has an optimum unless the backend was stopped, ex. by time_limit
+            if LpStatus[problem.status] != 'Optimal':
+                raise RuntimeError(f"The most representative value function was not found, status '{LpStatus[problem.status]}'")
+
+            # Inconsistent preference information has no extreme ranking, it is checked first
+            for variable in problem.variables():
+                if variable.name == 'epsilon':
+                    if variable.varValue <= 0.0:
+                        resolved_inconsistencies = SolverUtils.resolve_incosistency(
+                            performance_table_list=refined_performance_table_dict,
+                            comparisons=refined_comparisons,
+                            criteria=refined_gains,
+                            worst_best_position=refined_worst_best_position,
+                            number_of_points=refined_linear_segments,
+                            comprehensive_intensities=refined_intensities,
+                            subsets_to_remove=[],
+                            show_logs=self.show_logs,
+                            backend=self.backend,
+                            backend_options=self.backend_options
+                        )
+
+                        refined_resolved_inconsistencies = DataclassesUtils.refine_resolved_inconsistencies(
+                            resolved_inconsistencies=resolved_inconsistencies,
+                            performance_table_dict=performance_table_dict
+                        )
+
+                        inconsistency: Inconsistency = Inconsistency("Found inconsistencies", refined_resolved_inconsistencies)
+                        if cache is not None:
+                            cache.put(cache_key, inconsistency)
+
+                        raise inconsistency
+                    break
+
+            extreme_ranking: List[List[int]] = context.get_extreme_ranking()
+
+            necessary, possible = context.get_necessary_and_possible_relations()
 
         refined_extreme_ranking: List[List[int]] = DataclassesUtils.refine_extreme_ranking(
             extreme_ranking=extreme_ranking,
             performance_table_dict=performance_table_dict
         )
 
-        necessary, possible = SolverUtils.calculate_necessary_and_possible_relation_matrix(
-            performance_table_list=refined_performance_table_dict,
-            alternatives_id_list=alternatives_id_list,
-            comparisons=refined_comparisons,
-            criteria=refined_gains,
-            worst_best_position=refined_worst_best_position,
-            number_of_points=refined_linear_segments,
-            comprehensive_intensities=refined_intensities,
-            show_logs=self.show_logs
-        )
-
-        for variable in problem.variables():
-            if variable.name == 'epsilon':
-                if variable.varValue <= 0.0:
-                    resolved_inconsistencies = SolverUtils.resolve_incosistency(
-                        performance_table_list=refined_performance_table_dict,
-                        comparisons=refined_comparisons,
-                        criteria=refined_gains,
-                        worst_best_position=refined_worst_best_position,
-                        number_of_points=refined_linear_segments,
-                        comprehensive_intensities=refined_intensities,
-                        subsets_to_remove=[],
-                        show_logs=self.show_logs
-                    )
-
-                    refined_resolved_inconsistencies = DataclassesUtils.refine_resolved_inconsistencies(
-                        resolved_inconsistencies=resolved_inconsistencies,
-                        performance_table_dict=performance_table_dict
-                    )
-
-                    raise Inconsistency("Found inconsistencies", refined_resolved_inconsistencies)
-                break
-
         variables_and_values_dict: Dict[str, float] = {variable.name: variable.varValue for variable in problem.variables()}
 
         criterion_functions: Dict[str, List[Tuple[float, float]]] = SolverUtils.get_criterion_functions(
             variables_and_values_dict=variables_and_values_dict,
             criteria=criteria,
+            registry=context.registry
         )
 
         alternatives_and_utilities_dict: Dict[str, float] = SolverUtils.get_alternatives_and_utilities_dict(
             variables_and_values_dict=variables_and_values_dict,
             performance_table_list=refined_performance_table_dict,
             alternatives_id_list=alternatives_id_list,
+            registry=context.registry
+        )
+
+        sampler_metrics: Dict[str, Any] = {'precision': sampler_precision, 'chain_diagnostics': chain_diagnostics}
+
+        result = (alternatives_and_utilities_dict, criterion_functions, position_percentage, pairwise_percentage, number_of_samples_used, refined_extreme_ranking, necessary, possible, sampler_error, sampler_metrics)
+        # Errors of the sampler, ex. missing Java, are not cached, the next call runs it again
+        if cache is not None and not sampler_error:
+            cache.put(cache_key, result)
+
+        return result if return_sampler_metrics else result[:-1]
+
+    def get_relation_intervals_dict(
+            self,
+            performance_table_dict: Dict[str, Dict[str, float]],
+            comparisons: List[Comparison],
+            criteria: List[Criterion],
+            positions: Optional[List[Position]] = [],
+            intensities: Optional[List[Intensity]] = [],
+    ) -> Tuple[Dict[str, List[str]], Dict[str, List[str]], Dict[str, Dict[str, Tuple[Optional[float], Optional[float]]]]]:
+        """
+        Method for getting necessary and possible relations together with the range of the difference of
+        utilities of every pair of alternatives
+
+        :param intensities:
+        :param performance_table_dict:
+        :param comparisons: List of Comparison objects
+        :param criteria: List of Criterion objects
+        :param positions: List of Position objects
+
+        :return necessary, possible, intervals: intervals[a][b] - minimum and maximum of U(a) - U(b)
+        """
+        DataValidator.validate_criteria(performance_table_dict, criteria)
+        DataValidator.validate_performance_table(performance_table_dict)
+        DataValidator.validate_positions(positions, performance_table_dict)
+
+        if self.cache is not None:
+            cache_key: str = self.get_cache_key(
+                'get_relation_intervals_dict',
+                performance_table_dict=performance_table_dict,
+                comparisons=comparisons,
+                criteria=criteria,
+                positions=positions,
+                intensities=intensities
+            )
+            is_cached, result = self.cache.get(cache_key)
+            if is_cached:
+                return result
+
+        refined_performance_table_dict: List[List[float]] = DataclassesUtils.refine_performance_table_dict(
+            performance_table_dict=performance_table_dict
+        )
+
+        refined_comparisons: List[List[int]] = DataclassesUtils.refine_comparisons(
+            performance_table_dict=performance_table_dict,
+            comparisons=comparisons
+        )
+
+        refined_gains: List[bool] = DataclassesUtils.refine_gains(
+            criterions=criteria
+        )
+
+        refined_linear_segments: List[int] = DataclassesUtils.refine_linear_segments(
+            criterions=criteria
+        )
+
+        refined_worst_best_position: List[List[int]] = DataclassesUtils.refine_positions(
+            positions=positions,
+            performance_table_dict=performance_table_dict
+        )
+
+        refined_intensities: List[List[int]] = DataclassesUtils.refine_intensities(
+            intensities=intensities,
+            performance_table_dict=performance_table_dict
+        )
+
+        alternatives_id_list: List[str] = list(performance_table_dict.keys())
+
+        necessary, possible, intervals = SolverUtils.calculate_necessary_and_possible_relation_intervals(
+            performance_table_list=refined_performance_table_dict,
+            alternatives_id_list=alternatives_id_list,
+            comparisons=refined_comparisons,
+            criteria=refined_gains,
+            worst_best_position=refined_worst_best_position,
+            number_of_points=refined_linear_segments,
+            comprehensive_intensities=refined_intensities,
+            show_logs=self.show_logs,
+            backend=self.backend,
+            backend_options=self.backend_options,
+            max_workers=self.max_workers,
+            executor=self.executor
         )
 
-        return alternatives_and_utilities_dict, criterion_functions, position_percentage, pairwise_percentage, number_of_samples_used, refined_extreme_ranking, necessary, possible, sampler_error
+        if self.cache is not None:
+            self.cache.put(cache_key, (necessary, possible, intervals))
+
+        return necessary, possible, intervals
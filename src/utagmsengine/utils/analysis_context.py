@@ -0,0 +1,335 @@
+from functools import partial
+from typing import List, Dict, Tuple, Optional, Union
+
+import numpy as np
+from pulp import LpSolver
+
+from .compiled_core import CompiledCore
+from .parallel_executor import ParallelExecutor
+from .relation_sweep import RelationSweep
+from .variable_registry import VariableRegistry
+
+
+class AnalysisContext:
+    """
+    Refined inputs of one analysis together with everything derived from them, computed on first use and shared
+    by all phases: the registry of value function variables, the dominance matrix, the necessary relation, the
+    possible relation, the extreme ranking and the ranges of differences of utilities.
+
+    The representative value function and the relation matrix both need the necessary relation, with a shared
+    context it is swept once. Workers of the parallel executor, each with its own CompiledCore, are kept for the
+    whole analysis, so the context has to be used as a context manager.
+    """
+
+    def __init__(
+            self,
+            performance_table_list: List[List[float]],
+            alternatives_id_list: List[str],
+            comparisons: List[List[int]],
+            criteria: List[bool],
+            worst_best_position: List[List[int]],
+            number_of_points: List[int],
+            comprehensive_intensities: List[List[int]],
+            show_logs: bool = False,
+            backend: Union[str, LpSolver] = 'glpk',
+            backend_options: Optional[Dict[str, float]] = None,
+            max_workers: Optional[int] = None,
+            executor: str = 'thread',
+            necessary_bounds: Tuple[Optional[np.ndarray], Optional[np.ndarray]] = (None, None),
+            possible_bounds: Tuple[Optional[np.ndarray], Optional[np.ndarray]] = (None, None)
+    ):
+        """
+        :param performance_table_list:
+        :param alternatives_id_list:
+        :param comparisons:
+        :param criteria:
+        :param worst_best_position:
+        :param number_of_points:
+        :param comprehensive_intensities:
+        :param show_logs: default None
+        :param backend: 'glpk', 'cbc', 'highs' (persistent HiGHS model) or an instance of a PuLP solver, see CompiledCore
+        :param backend_options: see BackendUtils.get_solver
+        :param max_workers: number of problems solved at once, default None - one by one, see ParallelExecutor
+        :param executor: 'thread' or 'process', see ParallelExecutor
+        :param necessary_bounds: pairs known to be in the necessary relation (transitive, ex. the necessary relation
+        before preference information was added) and pairs it is a subset of (ex. the necessary relation before
+        preference information was removed), pairs settled by them are not solved, default (None, None) - unknown
+        :param possible_bounds: pairs known to be in the possible relation and pairs it is a subset of, see
+        necessary_bounds, default (None, None) - unknown
+        """
+        self.performance_table_list: List[List[float]] = performance_table_list
+        self.alternatives_id_list: List[str] = alternatives_id_list
+        self.comparisons: List[List[int]] = comparisons
+        self.criteria: List[bool] = criteria
+        self.worst_best_position: List[List[int]] = worst_best_position
+        self.number_of_points: List[int] = number_of_points
+        self.comprehensive_intensities: List[List[int]] = comprehensive_intensities
+        self.show_logs: bool = show_logs
+        self.necessary_bounds: Tuple[Optional[np.ndarray], Optional[np.ndarray]] = necessary_bounds
+        self.possible_bounds: Tuple[Optional[np.ndarray], Optional[np.ndarray]] = possible_bounds
+
+        self.registry: VariableRegistry = VariableRegistry.from_performance_table(performance_table_list, number_of_points)
+        self.dominance: np.ndarray = AnalysisContext.calculate_dominance_matrix(performance_table_list, criteria)
+
+        self.parallel_executor: ParallelExecutor = ParallelExecutor(
+            partial(
+                CompiledCore,
+                performance_table_list=performance_table_list,
+                comparisons=comparisons,
+                criteria=criteria,
+                worst_best_position=worst_best_position,
+                number_of_points=number_of_points,
+                comprehensive_intensities=comprehensive_intensities,
+                backend=backend,
+                backend_options=backend_options,
+                # Only optimal epsilon, rank counts and objectives are read, values between characteristic points
+                # are not needed
+                substitute_interpolated=True
+            ),
+            max_workers,
+            executor
+        )
+
+        # Artifacts, computed on first use
+        self.necessary_sweep: Optional[RelationSweep] = None
+        self.core_epsilon: Optional[float] = None
+        self.is_core_epsilon_solved: bool = False
+        self.possible_relation: Optional[np.ndarray] = None
+        self.extreme_ranking: Optional[List[List[int]]] = None
+        self.difference_ranges: Dict[float, Tuple[np.ndarray, np.ndarray]] = {}
+
+        # Number of relation problems solved, including the core problem
+        self.number_of_solved: int = 0
+
+    def __enter__(self) -> 'AnalysisContext':
+        self.parallel_executor.__enter__()
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.parallel_executor.__exit__(exc_type, exc_value, exc_traceback)
+
+    @property
+    def number_of_alternatives(self) -> int:
+        return len(self.performance_table_list)
+
+    @staticmethod
+    def calculate_dominance_matrix(performance_table_list: List[List[float]], criteria: List[bool]) -> np.ndarray:
+        """
+        Method for calculating weak dominance between alternatives. An alternative dominating another one is at
+        least as good on every criterion, so it is at least as good for every monotonic value function.
+
+        :param performance_table_list:
+        :param criteria: see DataclassesUtils.refine_gains
+
+        :return dominance: dominance[i, j] - alternative i dominates alternative j
+        """
+        number_of_alternatives: int = len(performance_table_list)
+        dominance: np.ndarray = np.ones((number_of_alternatives, number_of_alternatives), dtype=bool)
+        if number_of_alternatives == 0:
+            return dominance
+
+        performance_table: np.ndarray = np.asarray(performance_table_list, dtype=np.float64)
+        for i in range(len(criteria)):
+            # Costs are negated, so that on every criterion higher is better
+            performances: np.ndarray = performance_table[:, i] if criteria[i] else -performance_table[:, i]
+            dominance &= performances[:, np.newaxis] >= performances[np.newaxis, :]
+
+        return dominance
+
+    def get_relation_dict(self, relation: np.ndarray) -> Dict[str, List[str]]:
+        """
+        :param relation: relation[i, j] - alternative i is at least as good as alternative j
+
+        :return relation_dict: ids of the alternatives every alternative is in relation with, alternatives with
+        no such alternative are left out
+        """
+        relation_dict: Dict[str, List[str]] = {}
+        for i in range(self.number_of_alternatives):
+            for j in range(self.number_of_alternatives):
+                if i == j:
+                    continue
+
+                if relation[i, j]:
+                    if self.alternatives_id_list[i] not in relation_dict:
+                        relation_dict[self.alternatives_id_list[i]] = []
+                    relation_dict[self.alternatives_id_list[i]].append(self.alternatives_id_list[j])
+
+        return relation_dict
+
+    def get_necessary_sweep(self) -> RelationSweep:
+        """
+        Necessary relation, solving only the pairs that are not implied by dominance and by transitivity of the
+        already solved ones. Pairs are solved in batches of max_workers of the executor, answers of a batch are
+        added in the order of the batch, skipping pairs settled by the previous ones, so the result does not
+        depend on the order the problems are finished in.
+
+        :return sweep: sweep.relation[i, j] - alternative i is necessarily at least as good as alternative j
+        """
+        if self.necessary_sweep is not None:
+            return self.necessary_sweep
+
+        lower_bound, upper_bound = self.necessary_bounds
+        if lower_bound is None:
+            sweep: RelationSweep = RelationSweep(self.dominance)
+        else:
+            # Union of two transitive relations is not transitive, a >= b by dominance and b >= c by the lower bound
+            sweep: RelationSweep = RelationSweep(RelationSweep.get_transitive_closure(self.dominance | lower_bound))
+        if upper_bound is not None:
+            # Complement of a preorder that contains the relation is closed under the rules of RelationSweep
+            sweep.not_relation |= ~(upper_bound | sweep.relation)
+
+        pairs: List[Tuple[int, int]] = sweep.get_next_pairs(self.parallel_executor.max_workers or 1)
+        while pairs:
+            epsilons: List[float] = self.parallel_executor.map(
+                CompiledCore.get_relation_epsilon,
+                [{'alternative_id_1': pair[0], 'alternative_id_2': pair[1], 'show_logs': self.show_logs} for pair in pairs]
+            )
+
+            self.number_of_solved += len(pairs)
+
+            for pair, epsilon in zip(pairs, epsilons):
+                if not sweep.is_settled(pair[0], pair[1]):
+                    sweep.add_answer(pair[0], pair[1], epsilon <= 0)
+
+            pairs: List[Tuple[int, int]] = sweep.get_next_pairs(self.parallel_executor.max_workers or 1)
+
+        self.necessary_sweep: RelationSweep = sweep
+
+        return sweep
+
+    def get_necessary_relations(self) -> Dict[str, List[str]]:
+        """
+        :return necessary:
+        """
+        return self.get_relation_dict(self.get_necessary_sweep().relation)
+
+    def get_core_epsilon(self) -> Optional[float]:
+        """
+        :return epsilon: optimal epsilon of the core problem without any pair constraint, see CompiledCore.get_core_epsilon
+        """
+        if not self.is_core_epsilon_solved:
+            self.core_epsilon: Optional[float] = self.parallel_executor.map(
+                CompiledCore.get_core_epsilon,
+                [{'show_logs': self.show_logs}]
+            )[0]
+            self.is_core_epsilon_solved: bool = True
+            self.number_of_solved += 1
+
+        return self.core_epsilon
+
+    def get_possible_relation(self) -> np.ndarray:
+        """
+        :return possible: possible[i, j] - alternative i is possibly at least as good as alternative j
+        """
+        if self.possible_relation is not None:
+            return self.possible_relation
+
+        sweep: RelationSweep = self.get_necessary_sweep()
+
+        lower_bound, upper_bound = self.possible_bounds
+        possible: np.ndarray = np.zeros((self.number_of_alternatives, self.number_of_alternatives), dtype=bool)
+        unknown: np.ndarray = ~sweep.relation
+        if lower_bound is not None:
+            possible |= lower_bound & unknown
+            unknown &= ~lower_bound
+        if upper_bound is not None:
+            unknown &= upper_bound
+
+        pairs: List[Tuple[int, int]] = [(int(i), int(j)) for i, j in zip(*np.nonzero(unknown))]
+        epsilons: List[float] = self.parallel_executor.map(
+            CompiledCore.get_relation_epsilon,
+            [{'alternative_id_1': j, 'alternative_id_2': i, 'type_of_relation': 1, 'show_logs': self.show_logs} for i, j in pairs]
+        )
+        self.number_of_solved += len(pairs)
+
+        for (i, j), epsilon in zip(pairs, epsilons):
+            possible[i, j] = epsilon > 0
+
+        # The weak pair constraint of the possible relation holds for every value function when the pair is in the
+        # necessary relation, so the problem is the core problem itself
+        np.fill_diagonal(possible, False)
+        if sweep.relation.sum() > self.number_of_alternatives:
+            possible[sweep.relation] = self.get_core_epsilon() > 0
+            np.fill_diagonal(possible, False)
+
+        self.possible_relation: np.ndarray = possible
+
+        return possible
+
+    def get_necessary_and_possible_relations(self) -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
+        """
+        :return necessary, possible:
+        """
+        return self.get_necessary_relations(), self.get_relation_dict(self.get_possible_relation())
+
+    def get_extreme_ranking(self) -> List[List[int]]:
+        """
+        :return extreme_ranking: alternative, worst position (pessimistic, optimistic) and best position
+        (pessimistic, optimistic) of every alternative
+        """
+        if self.extreme_ranking is not None:
+            return self.extreme_ranking
+
+        counts: List[int] = self.parallel_executor.map(
+            CompiledCore.get_extreme_rank_count,
+            [
+                {'alternative_id_extreme': j, 'type_of_rank': type_of_rank}
+                for j in range(self.number_of_alternatives)
+                for type_of_rank in range(4)
+            ]
+        )
+
+        results = []
+
+        for j in range(self.number_of_alternatives):
+            count_from_max_optimistic, count_from_max_pessimistic, count_from_min_optimistic, count_from_min_pessimistic = counts[4 * j:4 * j + 4]
+
+            pom = [j, self.number_of_alternatives - count_from_min_pessimistic, self.number_of_alternatives - count_from_min_optimistic, count_from_max_pessimistic + 1, count_from_max_optimistic + 1]
+
+            results.append(pom)
+
+        self.extreme_ranking: List[List[int]] = results
+
+        return results
+
+    def get_utility_difference_ranges(self, epsilon: float = 0.0001) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Range of U(a) - U(b) of every pair of alternatives, two problems per unordered pair. Strict preferences are
+        satisfied with epsilon at least equal to the given one (or the greatest possible epsilon, if it is lower).
+
+        :param epsilon: default 0.0001
+
+        :return minimum, maximum: np.nan if the preference information is inconsistent
+        """
+        if epsilon in self.difference_ranges:
+            return self.difference_ranges[epsilon]
+
+        minimum: np.ndarray = np.full((self.number_of_alternatives, self.number_of_alternatives), np.nan)
+        maximum: np.ndarray = np.full((self.number_of_alternatives, self.number_of_alternatives), np.nan)
+
+        core_epsilon: Optional[float] = self.get_core_epsilon()
+        # Without a positive epsilon the preference information is inconsistent, every range is left unknown
+        if core_epsilon is not None and core_epsilon > 0:
+            pairs: List[Tuple[int, int]] = [
+                (i, j)
+                for i in range(self.number_of_alternatives)
+                for j in range(i + 1, self.number_of_alternatives)
+            ]
+            difference_ranges: List[Tuple[Optional[float], Optional[float]]] = self.parallel_executor.map(
+                CompiledCore.get_utility_difference_range,
+                [
+                    {'alternative_id_1': i, 'alternative_id_2': j, 'epsilon': min(epsilon, core_epsilon), 'show_logs': self.show_logs}
+                    for i, j in pairs
+                ]
+            )
+
+            for (i, j), difference_range in zip(pairs, difference_ranges):
+                if difference_range[0] is not None:
+                    # Rounded to the precision of the solutions read from GLPK and CBC, adding 0.0 turns -0.0 into 0.0
+                    minimum[i, j], maximum[i, j] = round(difference_range[0], 6) + 0.0, round(difference_range[1], 6) + 0.0
+                    minimum[j, i], maximum[j, i] = 0.0 - maximum[i, j], 0.0 - minimum[i, j]
+
+        self.difference_ranges[epsilon] = (minimum, maximum)
+
+        return minimum, maximum
@@ -0,0 +1,181 @@
+from typing import List, Dict, Optional, Union
+
+import numpy as np
+from pulp import LpSolver, LpProblem, LpVariable, LpMaximize, LpStatus, GLPK, PULP_CBC_CMD
+
+from .highs_model import HighsModel
+from .sparse_model import SparseModel
+
+
+class HiGHS(LpSolver):
+    """
+    PuLP-compatible solver solving the problem in-process with HiGHS (highspy).
+    """
+
+    name = 'HiGHS'
+
+    def __init__(
+            self,
+            msg: bool = True,
+            timeLimit: Optional[float] = None,
+            gapRel: Optional[float] = None,
+            threads: Optional[int] = None
+    ):
+        """
+        :param msg: if False, no log is shown
+        :param timeLimit: maximum time for solver (in seconds)
+        :param gapRel: relative MIP gap
+        :param threads: number of threads
+        """
+        LpSolver.__init__(self, msg=msg, timeLimit=timeLimit, gapRel=gapRel, threads=threads)
+
+    def available(self) -> bool:
+        try:
+            import highspy
+        except ImportError:
+            return False
+
+        return True
+
+    def actualSolve(self, lp: LpProblem) -> int:
+        """
+        Solve a well formulated lp problem.
+
+        :param lp:
+
+        :return status:
+        """
+        sparse_model: SparseModel = SparseModel()
+        variables: List[LpVariable] = lp.variables()
+        for variable in variables:
+            sparse_model.add_lp_variable(variable)
+        for constraint in lp.constraints.values():
+            sparse_model.add_lp_constraint(constraint)
+
+        model: HighsModel = HighsModel(sparse_model, show_logs=self.msg)
+        model.set_options(
+            time_limit=self.timeLimit,
+            mip_gap=self.optionsDict.get('gapRel'),
+            threads=self.optionsDict.get('threads')
+        )
+        objective: Dict[int, float] = {
+            sparse_model.column_index[variable.name]: coefficient for variable, coefficient in lp.objective.items()
+        }
+        maximize: bool = lp.sense == LpMaximize
+
+        # HiGHS treats costs of 1e20 and above as infinite, such weights (ex. 1e20 * epsilon - delta) only give
+        # priority to their terms, so they are optimized first and the other terms are optimized on their optimum
+        priority: Dict[int, float] = {column: coefficient / 1e20 for column, coefficient in objective.items() if abs(coefficient) >= 1e20}
+        if priority:
+            model.set_objective(priority, maximize=maximize)
+            status, values = model.solve()
+            if status != 'Optimal':
+                return HiGHS.assign_solution(lp, variables, status, values)
+
+            optimum: float = sum(coefficient * values[column] for column, coefficient in priority.items())
+            row: int = model.add_row()
+            if maximize:
+                model.set_row(row, priority, optimum - 1e-9, np.inf)
+            else:
+                model.set_row(row, priority, -np.inf, optimum + 1e-9)
+
+            objective: Dict[int, float] = {column: coefficient for column, coefficient in objective.items() if column not in priority}
+
+        model.set_objective(objective, maximize=maximize)
+
+        status, values = model.solve()
+
+        return HiGHS.assign_solution(lp, variables, status, values)
+
+    @staticmethod
+    def assign_solution(lp: LpProblem, variables: List[LpVariable], status: str, values: np.ndarray) -> int:
+        """
+        Assign the status and the values of the variables, None for every variable without an optimal solution,
+        so that varValue is never left from a previous solve.
+
+        :param lp:
+        :param variables: variables of lp in the order of the columns
+        :param status: see HighsModel.solve
+        :param values: see HighsModel.solve
+
+        :return status_code: see pulp.LpStatus
+        """
+        status_code: int = {name: code for code, name in LpStatus.items()}[status]
+        if status == 'Optimal':
+            lp.assignVarsVals({variable.name: float(values[i]) for i, variable in enumerate(variables)})
+        else:
+            lp.assignVarsVals({variable.name: None for variable in variables})
+        lp.assignStatus(status_code)
+
+        return status_code
+
+
+class BackendUtils:
+    BACKENDS: List[str] = ['glpk', 'cbc', 'highs']
+    BACKEND_OPTIONS: List[str] = ['time_limit', 'mip_gap', 'threads']
+
+    @staticmethod
+    def check_backend(backend: Union[str, LpSolver]):
+        """
+        Method used for validating backend given by the user.
+
+        :param backend: one of BACKENDS or an instance of a PuLP solver
+        """
+        if not isinstance(backend, LpSolver) and backend not in BackendUtils.BACKENDS:
+            raise ValueError(
+                f"Unknown backend '{backend}', available backends: {', '.join(BackendUtils.BACKENDS)} "
+                f"or an instance of pulp.LpSolver"
+            )
+
+    @staticmethod
+    def check_backend_options(backend_options: Optional[Dict[str, float]]):
+        """
+        Method used for validating backend options given by the user, a misspelled option would be ignored.
+
+        :param backend_options: keys from BACKEND_OPTIONS or None
+        """
+        unknown_options: List[str] = [key for key in (backend_options or {}) if key not in BackendUtils.BACKEND_OPTIONS]
+        if unknown_options:
+            raise ValueError(
+                f"Unknown backend options {', '.join(map(repr, unknown_options))}, available backend options: "
+                f"{', '.join(BackendUtils.BACKEND_OPTIONS)}"
+            )
+
+    @staticmethod
+    def get_solver(
+            backend: Union[str, LpSolver] = 'glpk',
+            show_logs: bool = False,
+            backend_options: Optional[Dict[str, float]] = None
+    ) -> LpSolver:
+        """
+        Method used for getting PuLP solver for the given backend.
+
+        :param backend: 'glpk', 'cbc', 'highs' or an instance of a PuLP solver, which is returned as it is
+        :param show_logs: default None
+        :param backend_options: 'time_limit' (seconds), 'mip_gap' (relative) and 'threads', default None.
+        GLPK is single-threaded, so 'threads' is not used by it, custom solvers keep their own options
+
+        :return solver:
+        """
+        BackendUtils.check_backend(backend)
+        BackendUtils.check_backend_options(backend_options)
+
+        if isinstance(backend, LpSolver):
+            return backend
+
+        if backend_options is None:
+            backend_options = {}
+
+        time_limit: Optional[float] = backend_options.get('time_limit')
+        mip_gap: Optional[float] = backend_options.get('mip_gap')
+        threads: Optional[int] = backend_options.get('threads')
+
+        if backend == 'glpk':
+            options: List[str] = []
+            if mip_gap is not None:
+                options.extend(['--mipgap', str(mip_gap)])
+            return GLPK(msg=show_logs, timeLimit=time_limit, options=options)
+        elif backend == 'cbc':
+            return PULP_CBC_CMD(msg=show_logs, timeLimit=time_limit, gapRel=mip_gap, threads=threads)
+        else:
+            return HiGHS(msg=show_logs, timeLimit=time_limit, gapRel=mip_gap, threads=threads)
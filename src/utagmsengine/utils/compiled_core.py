@@ -0,0 +1,765 @@
+from typing import List, Dict, Tuple, Optional, Union
+
+import numpy as np
+from pulp import LpVariable, LpProblem, LpConstraint, LpAffineExpression, LpMaximize, LpMinimize, LpSolver, LpStatus, lpSum, value
+
+from .backend_utils import BackendUtils
+from .highs_model import HighsModel
+from .sparse_model import SparseModel
+from .utility_bounds import UtilityBounds
+from .variable_registry import VariableRegistry
+
+
+class CompiledCore:
+    """
+    Pair-independent part of the UTA-GMS model, built once per analysis.
+
+    It holds the value function variables together with normalization, monotonicity, bounds, comparison,
+    worst/best position, interpolation and intensity constraints, built as a SparseModel. Problems solved for
+    a single pair of alternatives (or a single alternative in extreme ranking analysis) are derived from it by
+    adding only their own constraints and objective, the already built constraints are shared by reference.
+    Variables are shared as well, so values of a solved problem have to be read before the next one is solved.
+
+    With the 'highs' backend the core is loaded once into a persistent in-process HiGHS model instead, and
+    every solve only replaces the pair (or rank) rows and the objective, re-solving warm from the previous basis.
+
+    With substitute_interpolated, values between characteristic points do not get variables of their own,
+    their utilities are written directly as interpolation between the characteristic points, so the model has
+    only the characteristic points of every criterion as columns and no interpolation rows.
+    """
+
+    def __init__(
+            self,
+            performance_table_list: List[List[float]],
+            comparisons: List[List[int]],
+            criteria: List[bool],
+            worst_best_position: List[List[int]],
+            number_of_points: List[int],
+            comprehensive_intensities: List[List[int]],
+            backend: Union[str, LpSolver] = 'glpk',
+            backend_options: Optional[Dict[str, float]] = None,
+            substitute_interpolated: bool = False,
+    ):
+        """
+        :param performance_table_list:
+        :param comparisons:
+        :param criteria:
+        :param worst_best_position:
+        :param number_of_points:
+        :param comprehensive_intensities:
+        :param backend: 'highs' - persistent HiGHS model, otherwise every problem is solved from scratch by
+        the solver returned by BackendUtils.get_solver ('glpk', 'cbc' or an instance of a PuLP solver)
+        :param backend_options: see BackendUtils.get_solver
+        :param substitute_interpolated: default False - every value is a variable of the model, bound to the
+        characteristic points by interpolation constraints, which is needed only when values of the solved
+        problem are read
+        """
+        BackendUtils.check_backend(backend)
+        BackendUtils.check_backend_options(backend_options)
+
+        self.performance_table_list: List[List[float]] = performance_table_list
+        self.backend: Union[str, LpSolver] = backend
+        self.backend_options: Optional[Dict[str, float]] = backend_options
+
+        self.model: SparseModel = SparseModel()
+        self.variables: List[LpVariable] = []
+
+        # Epsilon is bounded by 1, the greatest difference of utilities, big-Ms of position constraints rely on it
+        epsilon: LpVariable = LpVariable("epsilon", upBound=1)
+        self.epsilon_column: int = self.add_variable(epsilon)
+
+        self.registry: VariableRegistry = VariableRegistry.from_performance_table(performance_table_list, number_of_points)
+        characteristic_points: List[List[float]] = self.registry.characteristic_points
+
+        # Column of the model of every column of the registry, -1 for the substituted ones
+        self.u_columns: List[int] = [
+            self.add_variable(variable) if not substitute_interpolated or self.registry.characteristic[column] else -1
+            for column, variable in enumerate(self.registry.variables)
+        ]
+
+        # Utility of every column of the registry as a combination of columns of the model
+        if substitute_interpolated:
+            self.term_columns: np.ndarray = np.array(self.u_columns, dtype=np.int64)[
+                np.column_stack((self.registry.lower_columns, self.registry.upper_columns))
+            ]
+            self.term_weights: np.ndarray = np.column_stack((self.registry.lower_weights, self.registry.upper_weights))
+        else:
+            self.term_columns: np.ndarray = np.array(self.u_columns, dtype=np.int64).reshape(-1, 1)
+            self.term_weights: np.ndarray = np.ones((self.registry.number_of_columns, 1))
+        self.substitute_interpolated: bool = substitute_interpolated
+
+        # Normalization constraints
+        normalized_to_zero: List[int] = []
+        the_greatest_performance: List[int] = []
+        for i in range(len(self.registry.values)):
+            lowest: int = self.registry.get_column(i, self.registry.values[i][0])
+            highest: int = self.registry.get_column(i, self.registry.values[i][-1])
+            if criteria[i]:
+                the_greatest_performance.append(highest)
+                normalized_to_zero.append(lowest)
+            else:
+                the_greatest_performance.append(lowest)
+                normalized_to_zero.append(highest)
+
+        rows: List[int] = []
+        columns: List[int] = []
+        values: List[float] = []
+        for row, column in enumerate(normalized_to_zero):
+            self.extend_utility_row(rows, columns, values, row, [column], 1.0)
+        self.model.add_rows(rows, columns, values, 0, 0, number_of_rows=len(normalized_to_zero))
+
+        rows: List[int] = []
+        columns: List[int] = []
+        values: List[float] = []
+        self.extend_utility_row(rows, columns, values, 0, the_greatest_performance, 1.0)
+        self.model.add_rows(rows, columns, values, 1, 1, number_of_rows=1)
+
+        characteristic_columns: List[List[int]] = []
+        for i in range(len(characteristic_points)):
+            characteristic_columns.append([self.u_columns[self.registry.get_column(i, point)] for point in characteristic_points[i]])
+
+        # Monotonicity constraint
+        higher: List[int] = []
+        lower: List[int] = []
+        for i in range(len(characteristic_columns)):
+            for j in range(1, len(characteristic_columns[i])):
+                if criteria[i]:
+                    higher.append(characteristic_columns[i][j])
+                    lower.append(characteristic_columns[i][j - 1])
+                else:
+                    higher.append(characteristic_columns[i][j - 1])
+                    lower.append(characteristic_columns[i][j])
+        self.add_difference_rows(higher, lower)
+
+        # Bounds constraint
+        higher: List[int] = []
+        lower: List[int] = []
+        for i in range(len(characteristic_columns)):
+            for j in range(1, len(characteristic_columns[i]) - 1):
+                if criteria[i]:
+                    higher.extend([characteristic_columns[i][-1], characteristic_columns[i][j]])
+                    lower.extend([characteristic_columns[i][j], characteristic_columns[i][0]])
+                else:
+                    higher.extend([characteristic_columns[i][0], characteristic_columns[i][j]])
+                    lower.extend([characteristic_columns[i][j], characteristic_columns[i][-1]])
+        self.add_difference_rows(higher, lower)
+
+        # Registry columns of the values of every alternative on every criterion
+        self.alternatives_columns: np.ndarray = np.array(
+            self.registry.get_alternatives_columns(), dtype=np.int64
+        ).reshape(len(performance_table_list), len(self.registry.values))
+        all_criteria: List[int] = list(range(len(self.registry.values)))
+
+        # Comparison constraint
+        rows: List[int] = []
+        columns: List[int] = []
+        values: List[float] = []
+        lower_bounds: List[float] = []
+        upper_bounds: List[float] = []
+        for comparison in comparisons:
+            if comparison[3] not in ('>', '=', '>='):
+                continue
+
+            indices_to_keep: List[int] = comparison[2] if comparison[2] else all_criteria
+            row: int = len(lower_bounds)
+            self.extend_utility_row(rows, columns, values, row, self.alternatives_columns[comparison[0], indices_to_keep], 1.0)
+            self.extend_utility_row(rows, columns, values, row, self.alternatives_columns[comparison[1], indices_to_keep], -1.0)
+
+            if comparison[3] == '>':
+                rows.append(row)
+                columns.append(self.epsilon_column)
+                values.append(-1.0)
+
+            lower_bounds.append(0)
+            upper_bounds.append(0 if comparison[3] == '=' else np.inf)
+        self.model.add_rows(rows, columns, values, lower_bounds, upper_bounds, number_of_rows=len(lower_bounds))
+
+        # Pair constraint is placed here, so the model is written exactly as if it was built from scratch
+        self.number_of_rows_before_pair: int = self.model.number_of_rows
+
+        # Worst and Best position
+        self.has_position_constraints: bool = bool(worst_best_position)
+        alternatives_binary_columns: Dict[int, List[Dict[int, List[int]]]] = {}
+        for i in worst_best_position:
+            pom_dict = {}
+            for j in range(len(performance_table_list)):
+                if i[0] != j:
+                    pom_dict[j] = [
+                        self.add_variable(LpVariable(f"v_{i[0]}_{i[0]}_higher_than_{j}_criteria_{'_'.join(map(str, i[3]))}", cat='Binary')),
+                        self.add_variable(LpVariable(f"v_{i[0]}_{j}_higher_than_{i[0]}_criteria_{'_'.join(map(str, i[3]))}", cat='Binary'))
+                    ]
+
+            if i[0] not in alternatives_binary_columns:
+                alternatives_binary_columns[i[0]] = []
+
+            alternatives_binary_columns[i[0]].append(pom_dict)
+
+        # Big-M of every constraint is the greatest violation possible for a normalized value function, a constant
+        # like 1e20 weakens the relaxation and, multiplied by the integrality tolerance, switches constraints off
+        # for binaries that are not exactly 0. Epsilon is at most 1, its upper bound.
+        self.utility_bounds: UtilityBounds = UtilityBounds(self.registry, performance_table_list, criteria)
+
+        rows: List[int] = []
+        columns: List[int] = []
+        values: List[float] = []
+        lower_bounds: List[float] = []
+        upper_bounds: List[float] = []
+        dict_with_worst_best_iterations: Dict[int, int] = {i: 0 for i in range(len(performance_table_list))}
+        for worst_best in worst_best_position:
+            x = dict_with_worst_best_iterations[worst_best[0]]
+            binary_columns: Dict[int, List[int]] = alternatives_binary_columns[worst_best[0]][x]
+            indices_to_keep: List[int] = worst_best[3] if worst_best[3] else all_criteria
+            position_columns: np.ndarray = self.alternatives_columns[worst_best[0], indices_to_keep]
+
+            for i in range(len(performance_table_list)):
+                if i != worst_best[0]:
+                    compared_columns: np.ndarray = self.alternatives_columns[i, indices_to_keep]
+
+                    # position - compared + big_M * binary_0 >= 0
+                    # compared - position + big_M * binary_1 >= epsilon
+                    # binary_0 + binary_1 <= 1
+                    big_M_0: float = self.utility_bounds.get_big_m([(1.0, worst_best[0], worst_best[3]), (-1.0, i, worst_best[3])])
+                    big_M_1: float = self.utility_bounds.get_big_m([(1.0, i, worst_best[3]), (-1.0, worst_best[0], worst_best[3])], epsilon=1.0)
+
+                    row: int = len(lower_bounds)
+                    self.extend_utility_row(rows, columns, values, row, position_columns, 1.0)
+                    self.extend_utility_row(rows, columns, values, row, compared_columns, -1.0)
+                    self.extend_utility_row(rows, columns, values, row + 1, position_columns, -1.0)
+                    self.extend_utility_row(rows, columns, values, row + 1, compared_columns, 1.0)
+                    rows.extend([row, row + 1, row + 1, row + 2, row + 2])
+                    columns.extend([binary_columns[i][0], binary_columns[i][1], self.epsilon_column, binary_columns[i][0], binary_columns[i][1]])
+                    values.extend([big_M_0, big_M_1, -1.0, 1.0, 1.0])
+
+                    lower_bounds.extend([0, 0, -np.inf])
+                    upper_bounds.extend([np.inf, np.inf, 1])
+
+            row: int = len(lower_bounds)
+            for j in binary_columns:
+                rows.extend([row, row + 1])
+                columns.extend(binary_columns[j])
+                values.extend([1.0, 1.0])
+            lower_bounds.extend([-np.inf, -np.inf])
+            upper_bounds.extend([worst_best[1] - 1, len(performance_table_list) - worst_best[2]])
+
+            dict_with_worst_best_iterations[worst_best[0]] = dict_with_worst_best_iterations[worst_best[0]] + 1
+        self.model.add_rows(rows, columns, values, lower_bounds, upper_bounds, number_of_rows=len(lower_bounds))
+
+        # Use linear interpolation to create constraints
+        if not substitute_interpolated:
+            interpolated_columns: np.ndarray = self.registry.interpolated_columns
+            u_columns: np.ndarray = np.array(self.u_columns, dtype=np.int64)
+            self.model.add_rows(
+                np.repeat(np.arange(len(interpolated_columns)), 3),
+                np.column_stack((
+                    u_columns[interpolated_columns],
+                    u_columns[self.registry.lower_columns[interpolated_columns]],
+                    u_columns[self.registry.upper_columns[interpolated_columns]]
+                )).ravel(),
+                np.column_stack((
+                    np.ones(len(interpolated_columns)),
+                    -self.registry.lower_weights[interpolated_columns],
+                    -self.registry.upper_weights[interpolated_columns]
+                )).ravel(),
+                0,
+                0,
+                number_of_rows=len(interpolated_columns)
+            )
+
+        # comprehensive comparisons of intensities of preference
+        rows: List[int] = []
+        columns: List[int] = []
+        values: List[float] = []
+        lower_bounds: List[float] = []
+        upper_bounds: List[float] = []
+        for intensity in comprehensive_intensities:
+            # U(left_1) - U(left_2) - U(right_1) + U(right_2)
+            row: int = len(lower_bounds)
+            for position, sign in zip([0, 2, 4, 6], [1.0, -1.0, -1.0, 1.0]):
+                indices_to_keep: List[int] = intensity[position + 1] if intensity[position + 1] else all_criteria
+                self.extend_utility_row(rows, columns, values, row, self.alternatives_columns[intensity[position], indices_to_keep], sign)
+
+            if intensity[-1] == '>':
+                rows.append(row)
+                columns.append(self.epsilon_column)
+                values.append(-1.0)
+
+            lower_bounds.append(0)
+            upper_bounds.append(np.inf if intensity[-1] in ('>', '>=') else 0)
+        self.model.add_rows(rows, columns, values, lower_bounds, upper_bounds, number_of_rows=len(lower_bounds))
+
+        self.epsilon: LpVariable = epsilon
+        self.alternatives_utilities: List[LpAffineExpression] = [
+            self.get_utility_expression(alternative_columns) for alternative_columns in self.alternatives_columns
+        ]
+
+        # PuLP constraints for solvers called through PuLP, created on first use
+        self.lp_constraints: Optional[List[LpConstraint]] = None
+
+        # Persistent models of the 'highs' backend, created on first use
+        self.relation_model: Optional[HighsModel] = None
+        self.relation_row: int = -1
+        self.interval_model: Optional[HighsModel] = None
+        self.extreme_model: Optional[HighsModel] = None
+        self.extreme_rows: List[int] = []
+        self.extreme_binary_columns: List[int] = []
+
+    def add_variable(self, variable: LpVariable) -> int:
+        """
+        Add the variable as a column of the model, unless a variable with the same name is already there.
+
+        :param variable:
+
+        :return column:
+        """
+        column: int = self.model.add_lp_variable(variable)
+        if column == len(self.variables):
+            self.variables.append(variable)
+
+        return column
+
+    def get_utility_terms(self, registry_columns: Union[np.ndarray, List[int]]) -> Tuple[List[int], List[float]]:
+        """
+        :param registry_columns:
+
+        :return columns, weights: sum of utilities of the registry columns as columns of the model with their
+        coefficients, a column may appear more than once
+        """
+        registry_columns: np.ndarray = np.asarray(registry_columns, dtype=np.int64)
+
+        return self.term_columns[registry_columns].ravel().tolist(), self.term_weights[registry_columns].ravel().tolist()
+
+    def extend_utility_row(
+            self,
+            rows: List[int],
+            columns: List[int],
+            values: List[float],
+            row: int,
+            registry_columns: Union[np.ndarray, List[int]],
+            sign: float
+    ):
+        """
+        Add sign * sum of utilities of the registry columns to the row of a family of rows being built.
+
+        :param rows:
+        :param columns:
+        :param values:
+        :param row:
+        :param registry_columns:
+        :param sign:
+        """
+        term_columns, term_weights = self.get_utility_terms(registry_columns)
+        rows.extend([row] * len(term_columns))
+        columns.extend(term_columns)
+        values.extend([sign * weight for weight in term_weights])
+
+    def get_utility_expression(self, registry_columns: Union[np.ndarray, List[int]]) -> LpAffineExpression:
+        """
+        :param registry_columns:
+
+        :return expression: sum of utilities of the registry columns
+        """
+        if not self.substitute_interpolated:
+            return lpSum([self.variables[column] for column in self.get_utility_terms(registry_columns)[0]])
+
+        # Terms are added one by one, as a column may appear more than once
+        expression: LpAffineExpression = LpAffineExpression()
+        for column, weight in zip(*self.get_utility_terms(registry_columns)):
+            expression.addterm(self.variables[column], weight)
+
+        return expression
+
+    def add_difference_rows(self, higher: List[int], lower: List[int]):
+        """
+        Add rows higher[k] - lower[k] >= 0.
+
+        :param higher:
+        :param lower:
+        """
+        rows: np.ndarray = np.repeat(np.arange(len(higher)), 2)
+        columns: np.ndarray = np.column_stack((higher, lower)).ravel() if higher else np.zeros(0, dtype=np.int64)
+        values: np.ndarray = np.tile([1.0, -1.0], len(higher))
+        self.model.add_rows(rows, columns, values, 0, np.inf, number_of_rows=len(higher))
+
+    @property
+    def constraints_before_pair(self) -> List[LpConstraint]:
+        return self.get_lp_constraints()[:self.number_of_rows_before_pair]
+
+    @property
+    def constraints_after_pair(self) -> List[LpConstraint]:
+        return self.get_lp_constraints()[self.number_of_rows_before_pair:]
+
+    def get_lp_constraints(self) -> List[LpConstraint]:
+        """
+        :return constraints: rows of the model as PuLP constraints
+        """
+        if self.lp_constraints is None:
+            self.lp_constraints = self.model.to_lp_constraints(self.variables)
+
+        return self.lp_constraints
+
+    def solve_relation(
+            self,
+            alternative_id_1: int = -1,
+            alternative_id_2: int = -1,
+            type_of_relation: int = 0,
+            show_logs: bool = False,
+    ) -> LpProblem:
+        """
+        Solve the core problem maximizing epsilon, with the pair constraint between alternative_id_2 and
+        alternative_id_1 added on top of it.
+
+        :param alternative_id_1:
+        :param alternative_id_2:
+        :param type_of_relation: 0 - alternative_id_2 strictly preferred to alternative_id_1, otherwise weakly
+        :param show_logs: default None
+
+        :return problem:
+        """
+        constraints: List[LpConstraint] = self.constraints_before_pair
+
+        if alternative_id_1 >= 0 and alternative_id_2 >= 0:
+            constraints.append(self.pair_constraint(alternative_id_1, alternative_id_2, type_of_relation))
+
+        constraints.extend(self.constraints_after_pair)
+
+        problem: LpProblem = CompiledCore.create_problem(LpMaximize, constraints)
+        problem += self.epsilon
+
+        problem.solve(solver=BackendUtils.get_solver(self.backend, show_logs, self.backend_options))
+
+        return problem
+
+    def solve_extreme_rank(
+            self,
+            alternative_id_extreme: int,
+            type_of_rank: int,
+            show_logs: bool = False,
+    ) -> LpProblem:
+        """
+        Solve the core problem minimizing the number of alternatives that are ranked in the opposite way than
+        required by type_of_rank, in comparison to alternative_id_extreme.
+
+        :param alternative_id_extreme:
+        :param type_of_rank: 0, 1 - best position (optimistic, pessimistic), 2, 3 - worst position (optimistic, pessimistic)
+        :param show_logs: default None
+
+        :return problem:
+        """
+        constraints: List[LpConstraint] = [self.epsilon == 0.0001]
+        constraints.extend(self.get_lp_constraints())
+
+        binary_variables_rank: List[LpVariable] = []
+        for i in range(len(self.performance_table_list)):
+            if i != alternative_id_extreme:
+                variable_1: LpVariable = LpVariable(f"vrank_{i}", cat='Binary')
+                binary_variables_rank.append(variable_1)
+
+                constraints.append(self.rank_constraint(alternative_id_extreme, i, type_of_rank, variable_1))
+
+        problem: LpProblem = CompiledCore.create_problem(LpMinimize, constraints)
+        problem += lpSum(binary_variables_rank)
+
+        problem.solve(solver=BackendUtils.get_solver(self.backend, show_logs, self.backend_options))
+
+        return problem
+
+    def get_relation_epsilon(
+            self,
+            alternative_id_1: int,
+            alternative_id_2: int,
+            type_of_relation: int = 0,
+            show_logs: bool = False,
+    ) -> float:
+        """
+        Optimal epsilon of the problem solved by solve_relation, computed with the backend of the core.
+
+        :param alternative_id_1:
+        :param alternative_id_2:
+        :param type_of_relation: 0 - alternative_id_2 strictly preferred to alternative_id_1, otherwise weakly
+        :param show_logs: default None
+
+        :return epsilon:
+        """
+        if self.backend != 'highs':
+            return self.solve_relation(
+                alternative_id_1=alternative_id_1,
+                alternative_id_2=alternative_id_2,
+                type_of_relation=type_of_relation,
+                show_logs=show_logs
+            ).variables()[0].varValue
+
+        coefficients: Dict[int, float] = self.difference_coefficients(alternative_id_2, alternative_id_1)
+        if type_of_relation == 0:
+            coefficients[self.epsilon_column] = -1.0
+
+        return self.solve_relation_model(coefficients, 0, show_logs)
+
+    def get_core_epsilon(self, show_logs: bool = False) -> float:
+        """
+        Optimal epsilon of the core problem without any pair constraint, computed with the backend of the core.
+        It is the optimal epsilon of every pair whose weak relation holds for all value functions.
+
+        :param show_logs: default None
+
+        :return epsilon:
+        """
+        if self.backend != 'highs':
+            return self.solve_relation(show_logs=show_logs).variables()[0].varValue
+
+        return self.solve_relation_model({}, -np.inf, show_logs)
+
+    def create_highs_model(self, show_logs: bool = False, has_big_m_binaries: bool = False) -> HighsModel:
+        """
+        :param show_logs: default None
+        :param has_big_m_binaries: True for a model extended with big-M rows of binary variables, ex. rank rows
+
+        :return model: persistent HiGHS model of the core with the backend options
+        """
+        presolve_rules_off: int = 0
+        if self.has_position_constraints or has_big_m_binaries:
+            presolve_rules_off = HighsModel.BIG_M_PRESOLVE_RULES_OFF
+
+        model: HighsModel = HighsModel(self.model, show_logs, presolve_rules_off)
+        model.set_options(**(self.backend_options or {}))
+        # Epsilon and differences of utilities are compared with 0, with the default tolerance of 1e-6 binaries
+        # of position constraints that are not exactly 0 or 1 shift the optimum by about as much
+        model.set_options(mip_feasibility_tolerance=1e-9)
+
+        return model
+
+    def solve_relation_model(self, coefficients: Dict[int, float], lower: float, show_logs: bool = False) -> float:
+        """
+        Solve the persistent HiGHS model maximizing epsilon, with its pair row replaced.
+
+        :param coefficients: coefficients of the pair row as column -> coefficient
+        :param lower: lower bound of the pair row, -np.inf for a free row
+        :param show_logs: default None
+
+        :return epsilon: infinity if epsilon is unbounded, minus infinity if no value function satisfies the pair row
+        """
+        if self.relation_model is None:
+            self.relation_model = self.create_highs_model(show_logs)
+            self.relation_model.set_objective({self.epsilon_column: 1.0}, maximize=True)
+            self.relation_row = self.relation_model.add_row()
+
+        self.relation_model.set_row(self.relation_row, coefficients, lower, np.inf)
+
+        status, values = self.relation_model.solve()
+        if status == 'Unbounded':
+            return float('inf')
+        if status == 'Infeasible':
+            return float('-inf')
+
+        return float(values[self.epsilon_column])
+
+    def get_utility_difference_range(
+            self,
+            alternative_id_1: int,
+            alternative_id_2: int,
+            epsilon: float,
+            show_logs: bool = False,
+    ) -> Tuple[Optional[float], Optional[float]]:
+        """
+        Minimum and maximum of U(alternative_id_1) - U(alternative_id_2) over the value functions of the core
+        problem with epsilon at least equal to the given one, computed with the backend of the core.
+
+        :param alternative_id_1:
+        :param alternative_id_2:
+        :param epsilon: lower bound of epsilon
+        :param show_logs: default None
+
+        :return minimum, maximum: None, None if there is no such value function
+        """
+        bounds: List[float] = []
+
+        if self.backend != 'highs':
+            for sense in [LpMinimize, LpMaximize]:
+                problem: LpProblem = CompiledCore.create_problem(sense, [self.epsilon >= epsilon] + self.get_lp_constraints())
+                problem += self.alternatives_utilities[alternative_id_1] - self.alternatives_utilities[alternative_id_2]
+
+                problem.solve(solver=BackendUtils.get_solver(self.backend, show_logs, self.backend_options))
+                if LpStatus[problem.status] != 'Optimal':
+                    return None, None
+
+                bounds.append(value(problem.objective) or 0.0)
+
+            return bounds[0], bounds[1]
+
+        if self.interval_model is None:
+            self.interval_model = self.create_highs_model(show_logs)
+        self.interval_model.set_column_bounds(self.epsilon_column, epsilon, 1)
+
+        coefficients: Dict[int, float] = self.difference_coefficients(alternative_id_1, alternative_id_2)
+        for maximize in [False, True]:
+            self.interval_model.set_objective(coefficients, maximize=maximize)
+
+            status, values = self.interval_model.solve()
+            if status != 'Optimal':
+                return None, None
+
+            bounds.append(float(sum(coefficient * values[column] for column, coefficient in coefficients.items())))
+
+        return bounds[0], bounds[1]
+
+    def get_extreme_rank_count(
+            self,
+            alternative_id_extreme: int,
+            type_of_rank: int,
+            show_logs: bool = False,
+    ) -> int:
+        """
+        Number of alternatives ranked in the opposite way than required by type_of_rank in the optimal
+        solution of the problem solved by solve_extreme_rank, computed with the backend of the core.
+
+        :param alternative_id_extreme:
+        :param type_of_rank: 0, 1 - best position (optimistic, pessimistic), 2, 3 - worst position (optimistic, pessimistic)
+        :param show_logs: default None
+
+        :return count:
+
+        :raises RuntimeError: if the problem is not solved to optimality, ex. it is infeasible for inconsistent
+        preference information or stopped by the time limit of backend_options
+        """
+        if self.backend != 'highs':
+            problem: LpProblem = self.solve_extreme_rank(
+                alternative_id_extreme=alternative_id_extreme,
+                type_of_rank=type_of_rank,
+                show_logs=show_logs
+            )
+
+            if LpStatus[problem.status] != 'Optimal':
+                raise RuntimeError(
+                    f"Extreme rank of alternative {alternative_id_extreme} was not solved to optimality, "
+                    f"status '{LpStatus[problem.status]}'"
+                )
+
+            count: int = 0
+            for var in problem.variables():
+                if 'vrank' in var.name and var.varValue == 1:
+                    count += 1
+
+            return count
+
+        if self.extreme_model is None:
+            self.extreme_model = self.create_highs_model(show_logs, has_big_m_binaries=True)
+            self.extreme_model.set_column_bounds(self.epsilon_column, 0.0001, 0.0001)
+            for i in range(len(self.performance_table_list)):
+                self.extreme_binary_columns.append(self.extreme_model.add_column(0, 1, integer=True))
+                self.extreme_rows.append(self.extreme_model.add_row())
+            self.extreme_model.update_presolve()
+            self.extreme_model.set_objective({column: 1.0 for column in self.extreme_binary_columns}, maximize=False)
+
+        for i, column in enumerate(self.extreme_binary_columns):
+            if i == alternative_id_extreme:
+                # Alternative is not compared with itself, its binary variable can not be counted
+                self.extreme_model.set_row(self.extreme_rows[i], {}, -np.inf, np.inf)
+                self.extreme_model.set_column_bounds(column, 0, 0)
+                continue
+
+            if type_of_rank in (0, 1):
+                coefficients: Dict[int, float] = self.difference_coefficients(alternative_id_extreme, i)
+            else:
+                coefficients: Dict[int, float] = self.difference_coefficients(i, alternative_id_extreme)
+            coefficients[column] = self.get_rank_big_m(alternative_id_extreme, i, type_of_rank)
+            if type_of_rank in (1, 2):
+                coefficients[self.epsilon_column] = -1.0
+
+            self.extreme_model.set_row(self.extreme_rows[i], coefficients, 0, np.inf)
+            self.extreme_model.set_column_bounds(column, 0, 1)
+
+        status, values = self.extreme_model.solve()
+        if status != 'Optimal':
+            raise RuntimeError(
+                f"Extreme rank of alternative {alternative_id_extreme} was not solved to optimality, status '{status}'"
+            )
+
+        return int(np.sum(np.round(values[self.extreme_binary_columns]) == 1))
+
+    def difference_coefficients(self, alternative_id_1: int, alternative_id_2: int) -> Dict[int, float]:
+        """
+        :param alternative_id_1:
+        :param alternative_id_2:
+
+        :return coefficients: coefficients of U(alternative_id_1) - U(alternative_id_2) as column -> coefficient
+        """
+        coefficients: Dict[int, float] = {}
+        for sign, alternative_id in ((1.0, alternative_id_1), (-1.0, alternative_id_2)):
+            for column, weight in zip(*self.get_utility_terms(self.alternatives_columns[alternative_id])):
+                coefficients[column] = coefficients.get(column, 0.0) + sign * weight
+
+        return coefficients
+
+    def pair_constraint(self, alternative_id_1: int, alternative_id_2: int, type_of_relation: int) -> LpConstraint:
+        """
+        :param alternative_id_1:
+        :param alternative_id_2:
+        :param type_of_relation: 0 - alternative_id_2 strictly preferred to alternative_id_1, otherwise weakly
+
+        :return constraint:
+        """
+        left_side: LpAffineExpression = self.alternatives_utilities[alternative_id_2]
+        right_side: LpAffineExpression = self.alternatives_utilities[alternative_id_1]
+
+        if type_of_relation == 0:
+            return left_side >= right_side + self.epsilon
+        else:
+            return left_side >= right_side
+
+    def rank_constraint(
+            self,
+            alternative_id_extreme: int,
+            alternative_id: int,
+            type_of_rank: int,
+            binary_variable: LpVariable
+    ) -> LpConstraint:
+        """
+        :param alternative_id_extreme:
+        :param alternative_id: alternative compared with alternative_id_extreme
+        :param type_of_rank: 0, 1 - best position (optimistic, pessimistic), 2, 3 - worst position (optimistic, pessimistic)
+        :param binary_variable: equal to 1 if the comparison is relaxed
+
+        :return constraint:
+        """
+        left_side: LpAffineExpression = self.alternatives_utilities[alternative_id_extreme]
+        right_side: LpAffineExpression = self.alternatives_utilities[alternative_id]
+        big_M: float = self.get_rank_big_m(alternative_id_extreme, alternative_id, type_of_rank)
+
+        if type_of_rank == 0:
+            return left_side - right_side + big_M * binary_variable >= 0
+        elif type_of_rank == 1:
+            return left_side - right_side + big_M * binary_variable >= self.epsilon
+        elif type_of_rank == 2:
+            return right_side - left_side + big_M * binary_variable >= self.epsilon
+        else:
+            return right_side - left_side + big_M * binary_variable >= 0
+
+    def get_rank_big_m(self, alternative_id_extreme: int, alternative_id: int, type_of_rank: int) -> float:
+        """
+        :param alternative_id_extreme:
+        :param alternative_id: alternative compared with alternative_id_extreme
+        :param type_of_rank: 0, 1 - best position (optimistic, pessimistic), 2, 3 - worst position (optimistic, pessimistic)
+
+        :return big_M: of the constraint returned by rank_constraint, epsilon is fixed to 0.0001 in the extreme ranking
+        """
+        if type_of_rank in (0, 1):
+            terms: List[Tuple[float, int, List[int]]] = [(1.0, alternative_id_extreme, []), (-1.0, alternative_id, [])]
+        else:
+            terms: List[Tuple[float, int, List[int]]] = [(1.0, alternative_id, []), (-1.0, alternative_id_extreme, [])]
+
+        return self.utility_bounds.get_big_m(terms, epsilon=0.0001 if type_of_rank in (1, 2) else 0.0)
+
+    @staticmethod
+    def create_problem(sense: int, constraints: List[LpConstraint]) -> LpProblem:
+        """
+        Create a problem from already built constraints. Constraints are named in the same way PuLP names them
+        when they are added one by one, so the written model is the same as the one built from scratch.
+
+        :param sense:
+        :param constraints:
+
+        :return problem:
+        """
+        problem: LpProblem = LpProblem("UTA-GMS", sense)
+        problem.constraints = {f"_C{i}": constraint for i, constraint in enumerate(constraints, start=1)}
+
+        return problem
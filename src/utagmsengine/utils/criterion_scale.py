@@ -0,0 +1,72 @@
+from typing import List
+
+import numpy as np
+
+
+class CriterionScale:
+    """
+    Values of a single criterion, computed once per performance table and shared by the model builders and the
+    Sampler post-processing.
+
+    It holds the sorted distinct values of the criterion (performances of the alternatives and characteristic
+    points), the index of the value of every alternative (as the inverse returned by np.unique) and, for every
+    value, the segment between characteristic points it lies on together with its interpolation weights.
+    """
+
+    def __init__(self, performances: List[float], number_of_points: int = 0):
+        """
+        :param performances: performances of the alternatives on the criterion
+        :param number_of_points: number of characteristic points, 0 - every performance is a characteristic point
+        """
+        performances: np.ndarray = np.asarray(performances, dtype=np.float64)
+
+        if number_of_points != 0:
+            worst: float = float(performances.min())
+            best: float = float(performances.max())
+            characteristic_points: List[float] = [
+                round(worst + (j / (number_of_points - 1)) * (best - worst), 4) for j in range(number_of_points)
+            ]
+        else:
+            characteristic_points: List[float] = np.unique(performances).tolist()
+
+        performance_values, first_index = np.unique(performances, return_index=True)
+
+        self.values: np.ndarray = np.unique(np.concatenate((performance_values, characteristic_points)))
+        self.inverse: np.ndarray = np.searchsorted(self.values, performances)
+
+        # Performances in the order of their first appearance, then characteristic points which are not
+        # performances, the order in which the interpolation constraints have always been written
+        performance_values_set: set = set(performance_values.tolist())
+        added_points: List[float] = [point for point in dict.fromkeys(characteristic_points) if point not in performance_values_set]
+        self.order: np.ndarray = np.searchsorted(
+            self.values,
+            np.concatenate((performance_values[np.argsort(first_index, kind='stable')], np.asarray(added_points, dtype=np.float64)))
+        )
+
+        self.characteristic_points: np.ndarray = np.asarray(characteristic_points, dtype=np.float64)
+        self.characteristic_indices: np.ndarray = np.searchsorted(self.values, self.characteristic_points)
+        self.is_characteristic: np.ndarray = np.zeros(len(self.values), dtype=bool)
+        self.is_characteristic[self.characteristic_indices] = True
+
+        # Segment of every value: characteristic points lower_points <= value <= upper_points
+        self.lower_points: np.ndarray = np.clip(
+            np.searchsorted(self.characteristic_points, self.values, side='right') - 1,
+            0,
+            max(len(self.characteristic_points) - 2, 0)
+        )
+        self.upper_points: np.ndarray = np.minimum(self.lower_points + 1, len(self.characteristic_points) - 1)
+
+        # Characteristic points are interpolated from themselves
+        own_points: np.ndarray = np.searchsorted(self.characteristic_points, self.values[self.is_characteristic])
+        self.lower_points[self.is_characteristic] = own_points
+        self.upper_points[self.is_characteristic] = own_points
+
+        # Same floating point operations as SolverUtils.linear_interpolation on PuLP expressions:
+        # u = (1 - (value - x1) / (x2 - x1)) * u(x1) + (value - x1) / (x2 - x1) * u(x2)
+        x1: np.ndarray = self.characteristic_points[self.lower_points]
+        x2: np.ndarray = self.characteristic_points[self.upper_points]
+        interpolated: np.ndarray = ~self.is_characteristic
+        self.lower_weights: np.ndarray = np.ones(len(self.values))
+        self.upper_weights: np.ndarray = np.zeros(len(self.values))
+        self.upper_weights[interpolated] = ((self.values[interpolated] - x1[interpolated]) * 1) / (x2[interpolated] - x1[interpolated])
+        self.lower_weights[interpolated] = 1 + ((self.values[interpolated] - x1[interpolated]) * -1) / (x2[interpolated] - x1[interpolated])
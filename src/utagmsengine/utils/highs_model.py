@@ -0,0 +1,216 @@
+from typing import List, Dict, Tuple, Optional
+
+import numpy as np
+
+from .sparse_model import SparseModel
+
+
+class HighsModel:
+    """
+    In-process HiGHS model kept alive for the whole analysis.
+
+    The model is passed to HiGHS once. Between solves only rows created with add_row, column bounds and the
+    objective are changed, so HiGHS re-solves warm from the basis of the previous solve, without writing an
+    LP file and spawning a solver process for every problem.
+    """
+
+    # Bits of the presolve_rule_off option, in the order of the presolve rules of HiGHS
+    PRESOLVE_RULE_AGGREGATOR: int = 1 << 12
+    PRESOLVE_RULE_PARALLEL_ROWS_AND_COLUMNS: int = 1 << 13
+    # HiGHS 1.15.1, pinned in setup.cfg, crashes (segmentation fault) in these rules for MIPs with position
+    # constraints whose big-M is bounded by the normalization, see UtilityBounds
+    BIG_M_PRESOLVE_RULES_OFF: int = PRESOLVE_RULE_AGGREGATOR | PRESOLVE_RULE_PARALLEL_ROWS_AND_COLUMNS
+
+    def __init__(self, model: SparseModel, show_logs: bool = False, presolve_rules_off: int = 0):
+        """
+        :param model: part of the model that never changes
+        :param show_logs: default None
+        :param presolve_rules_off: presolve rules switched off for the MIP, ex. BIG_M_PRESOLVE_RULES_OFF, default 0
+        - all rules
+        """
+        try:
+            import highspy
+        except ImportError:
+            raise ImportError("highspy is required for the 'highs' backend, install it with: pip install uta-gms-engine[highs]")
+
+        self.highspy = highspy
+        self.highs = highspy.Highs()
+        self.highs.setOptionValue('output_flag', bool(show_logs))
+
+        self.presolve_rules_off: int = presolve_rules_off
+        self.column_integer: List[bool] = []
+        self.row_coefficients: Dict[int, Dict[int, float]] = {}
+        self.objective_coefficients: Dict[int, float] = {}
+
+        if model.number_of_columns:
+            self.highs.addVars(
+                model.number_of_columns,
+                np.array(model.column_lower, dtype=np.float64),
+                np.array(model.column_upper, dtype=np.float64)
+            )
+            for column in np.flatnonzero(model.column_integer):
+                self.highs.changeColIntegrality(int(column), highspy.HighsVarType.kInteger)
+            self.column_integer.extend(model.column_integer)
+
+        if model.number_of_rows:
+            indptr, indices, data = model.to_csr()
+            lower, upper = model.get_row_bounds()
+
+            # Entries summed to zero are not needed by HiGHS
+            rows: np.ndarray = np.repeat(np.arange(model.number_of_rows), np.diff(indptr))
+            is_nonzero: np.ndarray = data != 0
+            starts: np.ndarray = np.zeros(model.number_of_rows, dtype=np.int32)
+            np.cumsum(np.bincount(rows[is_nonzero], minlength=model.number_of_rows)[:-1], out=starts[1:])
+
+            status = self.highs.addRows(
+                model.number_of_rows,
+                lower,
+                upper,
+                int(is_nonzero.sum()),
+                starts,
+                indices[is_nonzero].astype(np.int32),
+                data[is_nonzero]
+            )
+            if status == highspy.HighsStatus.kError:
+                raise ValueError("HiGHS rejected the constraints, absolute values of coefficients have to be below 1e15")
+
+        self.update_presolve()
+
+    def add_column(self, lower: float, upper: float, integer: bool = False) -> int:
+        """
+        :param lower:
+        :param upper:
+        :param integer: default False
+
+        :return column:
+        """
+        column: int = len(self.column_integer)
+        self.highs.addVar(lower, upper)
+        if integer:
+            self.highs.changeColIntegrality(column, self.highspy.HighsVarType.kInteger)
+        self.column_integer.append(integer)
+
+        return column
+
+    def update_presolve(self):
+        """
+        Presolve discards the basis of the previous solve, so it is left on only for MIPs, which are not
+        warm started anyway, with presolve_rules_off switched off.
+        """
+        is_mip: bool = any(self.column_integer)
+        self.highs.setOptionValue('presolve', 'choose' if is_mip else 'off')
+        self.highs.setOptionValue('presolve_rule_off', self.presolve_rules_off if is_mip else 0)
+
+    def add_row(self) -> int:
+        """
+        Add an empty row without bounds, which can be replaced later with set_row.
+
+        :return row:
+        """
+        row: int = self.highs.getNumRow()
+        self.highs.addRow(-np.inf, np.inf, 0, np.zeros(0, dtype=np.int32), np.zeros(0))
+        self.row_coefficients[row] = {}
+
+        return row
+
+    def set_row(self, row: int, coefficients: Dict[int, float], lower: float, upper: float):
+        """
+        Replace a row created with add_row.
+
+        :param row:
+        :param coefficients: column -> coefficient
+        :param lower: -np.inf for none
+        :param upper: np.inf for none
+        """
+        for column in self.row_coefficients[row]:
+            if column not in coefficients:
+                self.highs.changeCoeff(row, column, 0.0)
+        for column, coefficient in coefficients.items():
+            self.highs.changeCoeff(row, column, coefficient)
+        self.row_coefficients[row] = coefficients
+
+        self.highs.changeRowBounds(row, lower, upper)
+
+    def set_column_bounds(self, column: int, lower: float, upper: float):
+        """
+        :param column:
+        :param lower:
+        :param upper:
+        """
+        self.highs.changeColBounds(column, lower, upper)
+
+    def set_objective(self, coefficients: Dict[int, float], maximize: bool):
+        """
+        Replace the objective function.
+
+        :param coefficients: column -> coefficient
+        :param maximize:
+        """
+        for column in self.objective_coefficients:
+            if column not in coefficients:
+                self.highs.changeColCost(column, 0.0)
+        for column, coefficient in coefficients.items():
+            if abs(coefficient) >= 1e20:
+                raise ValueError("HiGHS treats objective coefficients of 1e20 and above as infinite")
+            self.highs.changeColCost(column, coefficient)
+        self.objective_coefficients = coefficients
+
+        if maximize:
+            self.highs.changeObjectiveSense(self.highspy.ObjSense.kMaximize)
+        else:
+            self.highs.changeObjectiveSense(self.highspy.ObjSense.kMinimize)
+
+    def set_options(
+            self,
+            time_limit: Optional[float] = None,
+            mip_gap: Optional[float] = None,
+            threads: Optional[int] = None,
+            mip_feasibility_tolerance: Optional[float] = None
+    ):
+        """
+        :param time_limit: maximum time of a single solve in seconds, default None - no limit
+        :param mip_gap: relative MIP gap, default None - HiGHS default
+        :param threads: number of threads, default None - HiGHS default
+        :param mip_feasibility_tolerance: feasibility and integrality tolerance of MIPs, default None - HiGHS default
+        """
+        if time_limit is not None:
+            self.highs.setOptionValue('time_limit', float(time_limit))
+        if mip_gap is not None:
+            self.highs.setOptionValue('mip_rel_gap', float(mip_gap))
+        if mip_feasibility_tolerance is not None:
+            self.highs.setOptionValue('mip_feasibility_tolerance', float(mip_feasibility_tolerance))
+        if threads is not None:
+            self.highs.setOptionValue('threads', int(threads))
+
+    def solve(self) -> Tuple[str, np.ndarray]:
+        """
+        Solve the model in its current state.
+
+        Presolve can stop with a model which is unbounded or infeasible, without telling which one, the model is
+        then solved again without presolve. A model which is still not told apart has no known feasible solution
+        and is reported as infeasible.
+
+        :return status, values: status as in pulp.LpStatus ('Optimal', 'Not Solved', 'Infeasible', 'Unbounded',
+        'Undefined'), values of the columns
+        """
+        self.highs.run()
+
+        model_status = self.highs.getModelStatus()
+        if model_status == self.highspy.HighsModelStatus.kUnboundedOrInfeasible:
+            self.highs.setOptionValue('presolve', 'off')
+            self.highs.run()
+            model_status = self.highs.getModelStatus()
+            self.update_presolve()
+
+        if model_status == self.highspy.HighsModelStatus.kOptimal:
+            status: str = 'Optimal'
+        elif model_status in (self.highspy.HighsModelStatus.kInfeasible, self.highspy.HighsModelStatus.kUnboundedOrInfeasible):
+            status: str = 'Infeasible'
+        elif model_status == self.highspy.HighsModelStatus.kUnbounded:
+            status: str = 'Unbounded'
+        elif model_status in (self.highspy.HighsModelStatus.kTimeLimit, self.highspy.HighsModelStatus.kIterationLimit):
+            status: str = 'Not Solved'
+        else:
+            status: str = 'Undefined'
+
+        return status, np.array(self.highs.getSolution().col_value)
@@ -0,0 +1,148 @@
+import threading
+import traceback
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class TaskError(Exception):
+    """
+    Raised when tasks of a sweep fail, after all the other tasks are finished. data holds the error of every
+    failed task, index of the task -> formatted exception.
+    """
+
+    def __init__(self, message, data=None):
+        super().__init__(message)
+        self.data = data
+
+
+# State of the worker process, created once by the initializer of the process pool
+worker_state: Dict[str, Any] = {}
+
+
+def initialize_worker_process(create_state: Callable[[], Any]):
+    """
+    :param create_state:
+    """
+    worker_state['state'] = create_state()
+
+
+def run_task_in_worker_process(function: Callable[..., Any], task: Dict[str, Any]) -> Tuple[Any, Optional[str]]:
+    """
+    :param function:
+    :param task:
+
+    :return result, error:
+    """
+    return ParallelExecutor.run_task(worker_state['state'], function, task)
+
+
+class ParallelExecutor:
+    """
+    Runs independent tasks of a sweep (pairs of alternatives, extreme ranks) on a pool of workers.
+
+    Every worker creates its own state once, a CompiledCore for the sweeps, so solved problems never share
+    variables or a persistent HiGHS model between workers. Results are returned in the order of the tasks, whatever
+    order they are finished in, and an error of a task does not stop the other ones, all errors are raised
+    together as a TaskError.
+
+    Threads are enough for GLPK and CBC, which solve in subprocesses, processes parallelize the in-process HiGHS
+    backend as well but require create_state and task functions that can be pickled.
+    """
+
+    def __init__(self, create_state: Callable[[], Any], max_workers: Optional[int] = None, executor: str = 'thread'):
+        """
+        :param create_state: creates the state of a worker, ex. functools.partial(CompiledCore, ...)
+        :param max_workers: default None - tasks are run one by one in the calling thread
+        :param executor: 'thread' or 'process', default 'thread'
+        """
+        if executor not in ('thread', 'process'):
+            raise ValueError(f"Unknown executor '{executor}', expected 'thread' or 'process'")
+
+        self.create_state: Callable[[], Any] = create_state
+        self.max_workers: Optional[int] = max_workers
+        self.executor: str = executor
+
+        self.pool: Optional[Executor] = None
+        self.state: Any = None
+        self.thread_states: threading.local = threading.local()
+
+    @property
+    def is_parallel(self) -> bool:
+        return self.max_workers is not None and self.max_workers > 1
+
+    def __enter__(self) -> 'ParallelExecutor':
+        if not self.is_parallel:
+            self.state = self.create_state()
+        elif self.executor == 'thread':
+            self.pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        else:
+            self.pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=initialize_worker_process,
+                initargs=(self.create_state,)
+            )
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def get_thread_state(self) -> Any:
+        """
+        :return state: state of the calling thread, created on first use
+        """
+        if not hasattr(self.thread_states, 'state'):
+            self.thread_states.state = self.create_state()
+
+        return self.thread_states.state
+
+    def run_task_in_thread(self, function: Callable[..., Any], task: Dict[str, Any]) -> Tuple[Any, Optional[str]]:
+        """
+        :param function:
+        :param task:
+
+        :return result, error:
+        """
+        return ParallelExecutor.run_task(self.get_thread_state(), function, task)
+
+    @staticmethod
+    def run_task(state: Any, function: Callable[..., Any], task: Dict[str, Any]) -> Tuple[Any, Optional[str]]:
+        """
+        :param state:
+        :param function: called as function(state, **task)
+        :param task: keyword arguments of function
+
+        :return result, error: error is the formatted exception if the task failed, otherwise None
+        """
+        try:
+            return function(state, **task), None
+        except Exception:
+            return None, traceback.format_exc()
+
+    def map(self, function: Callable[..., Any], tasks: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Run function(state, **task) for every task, ex. CompiledCore.get_relation_epsilon with a pair of
+        alternatives.
+
+        :param function:
+        :param tasks:
+
+        :return results: in the order of tasks
+        """
+        if self.state is None and self.pool is None:
+            raise RuntimeError("ParallelExecutor has to be used as a context manager")
+
+        if not self.is_parallel:
+            outcomes: List[Tuple[Any, Optional[str]]] = [ParallelExecutor.run_task(self.state, function, task) for task in tasks]
+        elif self.executor == 'thread':
+            outcomes: List[Tuple[Any, Optional[str]]] = list(self.pool.map(lambda task: self.run_task_in_thread(function, task), tasks))
+        else:
+            outcomes: List[Tuple[Any, Optional[str]]] = list(self.pool.map(run_task_in_worker_process, [function] * len(tasks), tasks))
+
+        errors: Dict[int, str] = {i: error for i, (result, error) in enumerate(outcomes) if error is not None}
+        if errors:
+            raise TaskError(f"{len(errors)} of {len(tasks)} tasks failed", errors)
+
+        return [result for result, error in outcomes]
@@ -0,0 +1,129 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+class RelationSweep:
+    """
+    State of a sweep computing a preorder (reflexive and transitive relation) pair by pair, such as the
+    necessary relation.
+
+    Pairs known to be in the relation and pairs known not to be in it are kept as boolean matrices, closed
+    under transitivity after every answer: a >= b and b >= c give a >= c, while not a >= c with a >= b gives
+    not b >= c and with b >= c gives not a >= b. The next pair to solve is the unsettled pair whose answer,
+    whichever it is, settles the most other pairs.
+    """
+
+    def __init__(self, relation: np.ndarray):
+        """
+        :param relation: pairs known to be in the relation before any problem is solved, has to be transitive,
+        ex. the dominance matrix
+        """
+        self.relation: np.ndarray = np.array(relation, dtype=bool)
+        np.fill_diagonal(self.relation, True)
+        self.not_relation: np.ndarray = np.zeros_like(self.relation)
+
+        self.number_of_solved: int = 0
+
+    @staticmethod
+    def get_transitive_closure(relation: np.ndarray) -> np.ndarray:
+        """
+        Warshall's algorithm, one alternative as the intermediate one at a time.
+
+        :param relation: relation[i, j] - alternative i is in relation with alternative j
+
+        :return closure: smallest transitive relation containing the given one
+        """
+        closure: np.ndarray = np.array(relation, dtype=bool)
+        for k in range(len(closure)):
+            closure |= np.outer(closure[:, k], closure[k, :])
+
+        return closure
+
+    @property
+    def number_of_alternatives(self) -> int:
+        return len(self.relation)
+
+    def add_relation(self, alternative_id_1: int, alternative_id_2: int):
+        """
+        Add alternative_id_1 >= alternative_id_2 together with the pairs it implies.
+
+        :param alternative_id_1:
+        :param alternative_id_2:
+        """
+        predecessors: np.ndarray = self.relation[:, alternative_id_1].copy()
+        successors: np.ndarray = self.relation[alternative_id_2, :].copy()
+
+        self.relation |= np.outer(predecessors, successors)
+
+        # not x >= v with x >= alternative_id_1 gives not u >= v for every u with alternative_id_2 >= u
+        self.not_relation |= np.outer(successors, self.not_relation[predecessors, :].any(axis=0))
+        # not u >= y with alternative_id_2 >= y gives not u >= v for every v with v >= alternative_id_1
+        self.not_relation |= np.outer(self.not_relation[:, successors].any(axis=1), predecessors)
+
+    def add_not_relation(self, alternative_id_1: int, alternative_id_2: int):
+        """
+        Add not alternative_id_1 >= alternative_id_2 together with the pairs it implies.
+
+        :param alternative_id_1:
+        :param alternative_id_2:
+        """
+        # u <= alternative_id_1 and v >= alternative_id_2 can not be in the relation u >= v
+        self.not_relation |= np.outer(self.relation[alternative_id_1, :], self.relation[:, alternative_id_2])
+
+    def add_answer(self, alternative_id_1: int, alternative_id_2: int, in_relation: bool):
+        """
+        :param alternative_id_1:
+        :param alternative_id_2:
+        :param in_relation: whether alternative_id_1 >= alternative_id_2, as given by the solved problem
+        """
+        self.number_of_solved += 1
+
+        if in_relation:
+            self.add_relation(alternative_id_1, alternative_id_2)
+        else:
+            self.add_not_relation(alternative_id_1, alternative_id_2)
+
+    def is_settled(self, alternative_id_1: int, alternative_id_2: int) -> bool:
+        """
+        :param alternative_id_1:
+        :param alternative_id_2:
+
+        :return settled: whether it is known if alternative_id_1 >= alternative_id_2
+        """
+        return bool(self.relation[alternative_id_1, alternative_id_2] or self.not_relation[alternative_id_1, alternative_id_2])
+
+    def get_next_pairs(self, number_of_pairs: int) -> List[Tuple[int, int]]:
+        """
+        Unsettled pairs maximizing the number of pairs settled by their answer in the worst case, estimated from
+        the number of predecessors and successors of both alternatives. Ties are broken by the lowest index.
+
+        :param number_of_pairs: maximum number of pairs, ex. the number of problems solved at once
+
+        :return pairs: alternative_id_1, alternative_id_2 from the best one, empty if every pair is settled
+        """
+        unsettled: np.ndarray = ~(self.relation | self.not_relation)
+        if not unsettled.any():
+            return []
+
+        predecessors: np.ndarray = self.relation.sum(axis=0)
+        successors: np.ndarray = self.relation.sum(axis=1)
+
+        # a >= b relates every predecessor of a with every successor of b, not a >= b separates every
+        # successor of a from every predecessor of b
+        settled_if_in_relation: np.ndarray = np.outer(predecessors, successors)
+        settled_if_not_in_relation: np.ndarray = np.outer(successors, predecessors)
+        score: np.ndarray = np.where(unsettled, np.minimum(settled_if_in_relation, settled_if_not_in_relation), -1)
+
+        # Stable sort keeps the lowest index first among equal scores
+        order: np.ndarray = np.argsort(-score, axis=None, kind='stable')[:min(number_of_pairs, int(unsettled.sum()))]
+
+        return [(int(i), int(j)) for i, j in zip(*np.unravel_index(order, score.shape))]
+
+    def get_next_pair(self) -> Optional[Tuple[int, int]]:
+        """
+        :return pair: best pair of get_next_pairs or None if every pair is settled
+        """
+        pairs: List[Tuple[int, int]] = self.get_next_pairs(1)
+
+        return pairs[0] if pairs else None
@@ -0,0 +1,154 @@
+import copy
+import hashlib
+import json
+import pickle
+import sqlite3
+import threading
+import zlib
+from collections import OrderedDict
+from contextlib import closing
+from typing import Any, Optional, Tuple
+
+from pydantic import BaseModel
+
+from .. import __version__
+
+
+class ResultCache:
+    """
+    Results of Solver methods keyed by a hash of their inputs: a bounded in-memory LRU layer and an optional
+    SQLite file with compressed results, which survives restarts of the process.
+
+    Keys contain the version of the package and FORMAT_VERSION, results of other versions in a disk store are
+    never returned.
+    """
+
+    # Version of the keys and of the stored results, changed with either of them
+    FORMAT_VERSION: int = 1
+
+    def __init__(self, max_size: int = 128, path: Optional[str] = None):
+        """
+        :param max_size: number of results kept in memory, the least recently used one is evicted first
+        :param path: path of the SQLite file of the disk store, default None - results are kept in memory only
+        """
+        if max_size < 1:
+            raise ValueError("max_size of ResultCache has to be at least 1")
+
+        self.max_size: int = max_size
+        self.path: Optional[str] = path
+
+        self.results: OrderedDict = OrderedDict()
+        self.lock: threading.Lock = threading.Lock()
+
+        if path is not None:
+            with closing(sqlite3.connect(path)) as connection, connection:
+                connection.execute('CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value BLOB NOT NULL)')
+
+    @staticmethod
+    def canonicalize(value: Any) -> Any:
+        """
+        Method for turning inputs into plain JSON values: pydantic dataclasses into dicts of their fields, tuples
+        into lists and numbers into floats, so that ex. a performance of 2 and 2.0 give the same key. Order of dicts
+        is kept, it is the order of the alternatives and criteria.
+
+        :param value:
+
+        :return canonical_value:
+        """
+        if isinstance(value, BaseModel):
+            return ResultCache.canonicalize(value.model_dump())
+        if isinstance(value, dict):
+            return [[str(key), ResultCache.canonicalize(item)] for key, item in value.items()]
+        if isinstance(value, (list, tuple)):
+            return [ResultCache.canonicalize(item) for item in value]
+        if isinstance(value, bool) or value is None or isinstance(value, str):
+            return value
+        if isinstance(value, (int, float)):
+            return float(value)
+
+        return repr(value)
+
+    @staticmethod
+    def get_key(method_name: str, **arguments: Any) -> str:
+        """
+        :param method_name: name of the cached method, ex. 'get_hasse_diagram_dict'
+        :param arguments: every input the result depends on
+
+        :return key: SHA-256 of the canonical JSON of the versions, the method name and the arguments
+        """
+        canonical_arguments: str = json.dumps(
+            [
+                __version__,
+                ResultCache.FORMAT_VERSION,
+                method_name,
+                ResultCache.canonicalize(dict(sorted(arguments.items())))
+            ],
+            separators=(',', ':')
+        )
+
+        return hashlib.sha256(canonical_arguments.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        :param key: see get_key
+
+        :return is_cached, result: copy of the result, so that the cached one cannot be changed by the caller
+        """
+        with self.lock:
+            if key in self.results:
+                self.results.move_to_end(key)
+
+                return True, copy.deepcopy(self.results[key])
+
+        if self.path is None:
+            return False, None
+
+        with closing(sqlite3.connect(self.path)) as connection:
+            row = connection.execute('SELECT value FROM results WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return False, None
+
+        result: Any = pickle.loads(zlib.decompress(row[0]))
+        self.put_in_memory(key, result)
+
+        return True, copy.deepcopy(result)
+
+    def put(self, key: str, result: Any):
+        """
+        :param key: see get_key
+        :param result: picklable result
+        """
+        result: Any = copy.deepcopy(result)
+        self.put_in_memory(key, result)
+
+        if self.path is not None:
+            with closing(sqlite3.connect(self.path)) as connection, connection:
+                connection.execute(
+                    'INSERT OR REPLACE INTO results (key, value) VALUES (?, ?)',
+                    (key, zlib.compress(pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)))
+                )
+
+    def put_in_memory(self, key: str, result: Any):
+        """
+        :param key:
+        :param result:
+        """
+        with self.lock:
+            self.results[key] = result
+            self.results.move_to_end(key)
+            while len(self.results) > self.max_size:
+                self.results.popitem(last=False)
+
+    def clear(self):
+        """
+        Method for removing all results, from memory and from the disk store
+        """
+        with self.lock:
+            self.results.clear()
+
+        if self.path is not None:
+            with closing(sqlite3.connect(self.path)) as connection, connection:
+                connection.execute('DELETE FROM results')
+
+    def __len__(self) -> int:
+        return len(self.results)
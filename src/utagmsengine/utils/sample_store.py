@@ -0,0 +1,221 @@
+import json
+import os
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .sampler_utils import RankingBatches, SamplerUtils
+
+
+class SampleStore:
+    """
+    Accepted samples of SolverUtils.get_sampler_metrics kept on disk, for runs too large to keep in memory and for
+    reading the samples again without sampling. A store is a directory of:
+
+    - samples.dat - memory-mapped array samples x variables of Sampler input, float32 or float64
+    - chains.dat - memory-mapped array of the chain of every sample, int32
+    - utilities_matrix.npy - see SamplerUtils.get_utilities_matrix
+    - metadata.json - dtype, number of variables, samples and chains, alternatives and the criterion (index in
+      the criteria) and characteristic point of every variable, None for epsilon
+
+    Samples are appended as they arrive and metadata.json is written after them, so a store of an interrupted run
+    holds every sample counted in its metadata. Statistics are calculated chunk by chunk, see count_rankings.
+    """
+
+    SAMPLES_FILE: str = 'samples.dat'
+    CHAINS_FILE: str = 'chains.dat'
+    MATRIX_FILE: str = 'utilities_matrix.npy'
+    METADATA_FILE: str = 'metadata.json'
+
+    def __init__(self, path: str, dtype: str = 'float64'):
+        """
+        :param path: path of the directory of the store, created by create, files of a previous store are
+        overwritten
+        :param dtype: 'float32' or 'float64' - type of the stored samples, float32 halves the size of the store,
+        but utilities calculated from its samples can differ from the ones of the run in the last decimal place
+        """
+        if np.dtype(dtype) not in (np.dtype(np.float32), np.dtype(np.float64)):
+            raise ValueError("dtype of SampleStore has to be 'float32' or 'float64'")
+
+        self.path: str = path
+        self.dtype: str = np.dtype(dtype).name
+
+        self.metadata: Optional[Dict[str, Any]] = None
+        self.utilities_matrix: Optional[np.ndarray] = None
+        self.samples_map: Optional[np.ndarray] = None
+        self.chains_map: Optional[np.ndarray] = None
+
+    def __enter__(self) -> 'SampleStore':
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+
+    @staticmethod
+    def open(path: str) -> 'SampleStore':
+        """
+        :param path: directory of a store written before
+
+        :return sample_store: read-only store of the samples counted in its metadata
+        """
+        with open(os.path.join(path, SampleStore.METADATA_FILE)) as metadata_file:
+            metadata: Dict[str, Any] = json.load(metadata_file)
+
+        sample_store: SampleStore = SampleStore(path, metadata['dtype'])
+        sample_store.metadata = metadata
+        sample_store.utilities_matrix = np.load(sample_store.get_file(SampleStore.MATRIX_FILE))
+        sample_store.samples_map = sample_store.map_file(
+            SampleStore.SAMPLES_FILE, metadata['dtype'], (metadata['number_of_samples'], metadata['number_of_variables']), 'r'
+        )
+        sample_store.chains_map = sample_store.map_file(
+            SampleStore.CHAINS_FILE, 'int32', (metadata['number_of_samples'],), 'r'
+        )
+
+        return sample_store
+
+    def get_file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def map_file(self, name: str, dtype: str, shape: Tuple[int, ...], mode: str) -> np.ndarray:
+        """
+        :param name: file of the store
+        :param dtype:
+        :param shape:
+        :param mode: 'r' or 'w+', see numpy.memmap
+
+        :return array: memory-mapped array, an empty array in memory if shape is empty, which cannot be mapped
+        """
+        if shape[0] == 0:
+            return np.empty(shape, dtype=dtype)
+
+        return np.memmap(self.get_file(name), dtype=dtype, mode=mode, shape=shape)
+
+    @property
+    def number_of_samples(self) -> int:
+        return self.metadata['number_of_samples'] if self.metadata is not None else 0
+
+    @property
+    def alternatives_id_list(self) -> List[str]:
+        return self.metadata['alternatives']
+
+    @property
+    def samples(self) -> np.ndarray:
+        """
+        :return samples: samples x variables of Sampler input, memory-mapped
+        """
+        return self.samples_map[:self.number_of_samples]
+
+    @property
+    def chains(self) -> np.ndarray:
+        """
+        :return chains: chain of every sample, memory-mapped
+        """
+        return self.chains_map[:self.number_of_samples]
+
+    def create(
+            self,
+            capacity: int,
+            utilities_matrix: np.ndarray,
+            alternatives_id_list: List[str],
+            variables: List[Dict[str, Optional[float]]],
+            number_of_chains: int = 1
+    ):
+        """
+        Method for creating the files of an empty store.
+
+        :param capacity: the greatest number of samples appended
+        :param utilities_matrix: see SamplerUtils.get_utilities_matrix
+        :param alternatives_id_list:
+        :param variables: 'criterion' and 'point' of every variable of Sampler input
+        :param number_of_chains:
+        """
+        self.close()
+        os.makedirs(self.path, exist_ok=True)
+
+        self.metadata: Dict[str, Any] = {
+            'dtype': self.dtype,
+            'number_of_variables': len(variables),
+            'number_of_samples': 0,
+            'number_of_chains': number_of_chains,
+            'alternatives': list(alternatives_id_list),
+            'variables': variables
+        }
+        self.utilities_matrix: np.ndarray = utilities_matrix
+        np.save(self.get_file(SampleStore.MATRIX_FILE), utilities_matrix)
+
+        self.samples_map: np.ndarray = self.map_file(SampleStore.SAMPLES_FILE, self.dtype, (capacity, len(variables)), 'w+')
+        self.chains_map: np.ndarray = self.map_file(SampleStore.CHAINS_FILE, 'int32', (capacity,), 'w+')
+        self.write_metadata()
+
+    def append(self, samples: np.ndarray, chains: np.ndarray):
+        """
+        :param samples: samples x variables of Sampler input
+        :param chains: chain of every sample
+        """
+        start: int = self.number_of_samples
+        if start + len(samples) > len(self.samples_map):
+            raise ValueError("SampleStore is full")
+        if len(samples) == 0:
+            return
+
+        self.samples_map[start:start + len(samples)] = samples
+        self.chains_map[start:start + len(samples)] = chains
+        self.samples_map.flush()
+        self.chains_map.flush()
+
+        self.metadata['number_of_samples'] = start + len(samples)
+        self.write_metadata()
+
+    def write_metadata(self):
+        """
+        Method for writing metadata.json, replaced at once, so that it is never read half-written.
+        """
+        metadata_path: str = self.get_file(SampleStore.METADATA_FILE)
+        with open(metadata_path + '.tmp', 'w') as metadata_file:
+            json.dump(self.metadata, metadata_file)
+        os.replace(metadata_path + '.tmp', metadata_path)
+
+    def close(self):
+        """
+        Method for unmapping the files, files of a written store are cut to its samples.
+        """
+        if self.samples_map is None:
+            return
+
+        is_writable: bool = isinstance(self.samples_map, np.memmap) and self.samples_map.mode == 'w+'
+        self.samples_map = None
+        self.chains_map = None
+
+        if is_writable:
+            os.truncate(
+                self.get_file(SampleStore.SAMPLES_FILE),
+                self.number_of_samples * self.metadata['number_of_variables'] * np.dtype(self.dtype).itemsize
+            )
+            os.truncate(self.get_file(SampleStore.CHAINS_FILE), self.number_of_samples * np.dtype('int32').itemsize)
+
+    def iterate_chunks(self, chunk_size: int = 100000) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        :param chunk_size: number of samples read into memory at once
+
+        :return chunks: samples, chains
+        """
+        for start in range(0, self.number_of_samples, chunk_size):
+            end: int = min(start + chunk_size, self.number_of_samples)
+            yield np.asarray(self.samples_map[start:end], dtype=np.float64), np.asarray(self.chains_map[start:end], dtype=np.int64)
+
+    def count_rankings(self, chunk_size: int = 100000, batch_size: int = 100) -> RankingBatches:
+        """
+        :param chunk_size: number of samples read into memory at once
+        :param batch_size: see RankingBatches
+
+        :return batches: counts of every chain and of its batches, in the order the samples were stored
+        """
+        batches: RankingBatches = RankingBatches(
+            self.metadata['number_of_chains'], len(self.alternatives_id_list), batch_size
+        )
+
+        for samples, chains in self.iterate_chunks(chunk_size):
+            utilities: np.ndarray = SamplerUtils.calculate_utilities(samples, self.utilities_matrix, len(self.alternatives_id_list))
+            batches.add(utilities, chains)
+
+        return batches
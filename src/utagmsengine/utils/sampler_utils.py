@@ -0,0 +1,1004 @@
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from typing import IO, TYPE_CHECKING, Iterator, NamedTuple, Tuple, List, Dict, Optional
+
+import numpy as np
+from pulp import LpProblem, LpVariable, LpMaximize, LpSolver, LpStatus, PULP_CBC_CMD, lpSum
+
+from .sparse_model import SparseModel
+from .variable_registry import VariableRegistry
+
+if TYPE_CHECKING:
+    from .sampler_worker import SamplerWorker
+
+
+class HitAndRunSampler:
+    """
+    Hit-and-run sampler of points distributed uniformly in a polytope {x: A x (<=, >=, =) b}, an in-process
+    alternative to Polyrun.
+
+    Equality constraints are removed by moving to their null space, x = x0 + N z, so the chain walks in a
+    full-dimensional polytope G z <= h. Every step draws a random direction, finds the chord of the polytope along it
+    and jumps to a uniformly drawn point of the chord. The chain starts in the Chebyshev center, the center of
+    the greatest ball inside the polytope, found by an LP.
+    """
+
+    def __init__(
+            self,
+            lhs: np.ndarray,
+            senses: List[str],
+            rhs: np.ndarray,
+            seed: Optional[int] = None,
+            thinning: Optional[int] = None,
+            burn_in: Optional[int] = None,
+            solver: Optional[LpSolver] = None
+    ):
+        """
+        :param lhs: coefficients of the constraints, constraints are rows
+        :param senses: '<=', '>=' or '=' of every constraint
+        :param rhs: right side of every constraint
+        :param seed: default None - random seed
+        :param thinning: number of steps between returned points, default None - square of the dimension of
+        the polytope
+        :param burn_in: number of steps before the first returned point, default None - equal to thinning
+        :param solver: PuLP solver of the Chebyshev center, default None - CBC
+        """
+        lhs: np.ndarray = np.asarray(lhs, dtype=np.float64).reshape(len(senses), -1)
+        rhs: np.ndarray = np.asarray(rhs, dtype=np.float64)
+        senses: np.ndarray = np.array(senses, dtype=object)
+        self.number_of_variables: int = lhs.shape[1]
+
+        # x = x0 + N z satisfies every equality, N is an orthonormal basis of the null space of equalities
+        equalities: np.ndarray = senses == '='
+        if equalities.any():
+            _, singular_values, right_vectors = np.linalg.svd(lhs[equalities])
+            rank: int = int(np.sum(singular_values > 1e-10 * max(1.0, singular_values[0])))
+            self.origin: np.ndarray = np.linalg.lstsq(lhs[equalities], rhs[equalities], rcond=None)[0]
+            self.basis: np.ndarray = right_vectors[rank:].T
+        else:
+            self.origin: np.ndarray = np.zeros(self.number_of_variables)
+            self.basis: np.ndarray = np.eye(self.number_of_variables)
+
+        # Inequalities as G z <= h
+        signs: np.ndarray = np.where(senses[~equalities] == '>=', -1.0, 1.0)
+        inequalities_lhs: np.ndarray = signs[:, np.newaxis] * lhs[~equalities]
+        inequalities_rhs: np.ndarray = signs * rhs[~equalities]
+        self.lhs: np.ndarray = inequalities_lhs @ self.basis
+        self.rhs: np.ndarray = inequalities_rhs - inequalities_lhs @ self.origin
+
+        # Rows constant in the null space can not cut any chord
+        self.row_norms: np.ndarray = np.linalg.norm(self.lhs, axis=1)
+        self.is_constant: np.ndarray = self.row_norms <= 1e-12
+
+        dimension: int = self.basis.shape[1]
+        self.thinning: int = thinning if thinning is not None else max(1, dimension ** 2)
+        self.burn_in: int = burn_in if burn_in is not None else self.thinning
+        self.random: np.random.Generator = np.random.default_rng(seed)
+        self.solver: Optional[LpSolver] = solver
+
+        self.point: Optional[np.ndarray] = None
+
+    @property
+    def dimension(self) -> int:
+        return self.basis.shape[1]
+
+    def get_chebyshev_center(self) -> Tuple[np.ndarray, float]:
+        """
+        :return center, radius: radius is 0 or lower if the polytope has no interior, ex. it is empty or flat
+        """
+        if (self.rhs[self.is_constant] < -1e-9).any():
+            return np.zeros(self.dimension), -1.0
+
+        problem: LpProblem = LpProblem("Chebyshev_center", LpMaximize)
+        variables: List[LpVariable] = [LpVariable(f"z_{k}") for k in range(self.dimension)]
+        radius: LpVariable = LpVariable("radius", upBound=1)
+
+        for row in np.nonzero(~self.is_constant)[0]:
+            problem += lpSum(coefficient * variables[k] for k, coefficient in enumerate(self.lhs[row]) if coefficient != 0) + self.row_norms[row] * radius <= self.rhs[row]
+        problem += radius
+
+        problem.solve(solver=self.solver if self.solver is not None else PULP_CBC_CMD(msg=False))
+        if LpStatus[problem.status] != 'Optimal':
+            return np.zeros(self.dimension), -1.0
+
+        center: np.ndarray = np.array([variable.varValue or 0.0 for variable in variables])
+
+        return center, radius.varValue or 0.0
+
+    def start(self) -> bool:
+        """
+        Method for placing the chain in the Chebyshev center and running the burn-in steps.
+
+        :return started: False if the polytope has no interior
+        """
+        center, radius = self.get_chebyshev_center()
+        if radius <= 1e-9:
+            return False
+
+        self.point = center
+        self.walk(self.burn_in)
+
+        return True
+
+    def walk(self, number_of_steps: int, block_size: int = 1024):
+        """
+        Method for making hit-and-run steps from the current point. Changes of the constraints along the directions
+        do not depend on the point, so they are computed for a block of steps with one matrix product, a step only
+        finds its chord from the slacks of the constraints.
+
+        :param number_of_steps:
+        :param block_size: number of directions drawn at once
+        """
+        lhs: np.ndarray = self.lhs[~self.is_constant]
+        rhs: np.ndarray = self.rhs[~self.is_constant]
+
+        for first_step in range(0, number_of_steps, block_size):
+            size: int = min(block_size, number_of_steps - first_step)
+            directions: np.ndarray = self.random.standard_normal((size, self.dimension))
+            directions /= np.linalg.norm(directions, axis=1)[:, np.newaxis]
+            changes: np.ndarray = directions @ lhs.T
+            uniforms: np.ndarray = self.random.random(size)
+
+            # Slacks are kept positive, so the chord ends where change / slack is the greatest (forward) and
+            # the lowest (backward)
+            slack: np.ndarray = np.maximum(rhs - lhs @ self.point, 1e-15)
+            lengths: np.ndarray = np.zeros(size)
+            for step in range(size):
+                ratios: np.ndarray = changes[step] / slack
+                highest: float = 1.0 / ratios.max()
+                lowest: float = 1.0 / ratios.min()
+
+                lengths[step] = lowest + uniforms[step] * (highest - lowest)
+                slack = slack - lengths[step] * changes[step]
+
+            self.point = self.point + lengths @ directions
+
+        if not np.isfinite(self.point).all():
+            raise ValueError("Polytope sampled by HitAndRunSampler is unbounded")
+
+    def sample(self, number_of_samples: int) -> np.ndarray:
+        """
+        :param number_of_samples:
+
+        :return samples: samples x variables of the original polytope, empty if the polytope has no interior
+        """
+        if self.point is None and not self.start():
+            return np.zeros((0, self.number_of_variables))
+
+        samples: np.ndarray = np.zeros((number_of_samples, self.number_of_variables))
+        for k in range(number_of_samples):
+            self.walk(self.thinning)
+            samples[k] = self.origin + self.basis @ self.point
+
+        return samples
+
+
+class SamplerPolytope(NamedTuple):
+    """
+    Polytope {x: lhs x (senses) rhs} of Sampler input, constraints are rows of lhs.
+    """
+    lhs: np.ndarray
+    senses: List[str]
+    rhs: np.ndarray
+
+
+class SamplerUtils:
+    SAMPLERS: List[str] = ['polyrun', 'numpy']
+    NO_INTERIOR_ERROR: str = 'Sampler error: the polytope of value functions has no interior'
+
+    @staticmethod
+    def check_sampler(sampler: str):
+        """
+        Method used for validating sampler given by the user.
+
+        :param sampler: one of SAMPLERS
+        """
+        if sampler not in SamplerUtils.SAMPLERS:
+            raise ValueError(f"Unknown sampler '{sampler}', available samplers: {', '.join(SamplerUtils.SAMPLERS)}")
+
+    @staticmethod
+    def get_sampler_polytope(model: SparseModel, registry: VariableRegistry) -> Tuple[SamplerPolytope, List[int]]:
+        """
+        Method for getting the rows of the model as the polytope of Sampler input, ex. the model of a CompiledCore.
+        Only epsilon and characteristic points are sampled (columns outside of the registry, matched by name, are
+        sampled as they are), other columns are replaced with linear interpolation between characteristic points:
+        a coefficient c of an interpolated column adds c * weight to both of its characteristic points. A row with
+        different finite bounds gives two constraints, bounds of the columns are not part of the polytope.
+
+        The interpolation is applied to the whole constraint matrix at once with numpy, the coefficients are not
+        rounded.
+
+        :param model:
+        :param registry:
+
+        :return polytope, sampled_columns: see SamplerPolytope, column of the registry of every variable of
+        the polytope, -1 for epsilon and other columns outside of the registry
+        """
+        indptr, indices, data = model.to_csr()
+        lower, upper = model.get_row_bounds()
+        entry_rows: np.ndarray = np.repeat(np.arange(model.number_of_rows), np.diff(indptr))
+
+        # Columns in none of the rows are left out, ex. epsilon without strict preferences, which would be unbounded
+        is_used: np.ndarray = np.zeros(model.number_of_columns, dtype=bool)
+        is_used[indices] = True
+        has_epsilon: bool = 'epsilon' in model.column_index and bool(is_used[model.column_index['epsilon']])
+
+        columns: np.ndarray = np.array(
+            [registry.column_index.get(name, -1) for name in model.column_names], dtype=np.int64
+        ).reshape(-1)
+        characteristic: np.ndarray = np.asarray(registry.characteristic, dtype=bool)
+
+        is_sampled: np.ndarray = columns < 0
+        is_sampled[~is_sampled] = characteristic[columns[~is_sampled]]
+        is_sampled &= is_used
+        sampled_columns: np.ndarray = columns[is_sampled]
+
+        # Variable of the polytope of every column of the model and of every column of the registry, -1 if none
+        variable_positions: np.ndarray = np.full(model.number_of_columns, -1, dtype=np.int64)
+        variable_positions[is_sampled] = np.arange(len(sampled_columns))
+        column_positions: np.ndarray = np.full(registry.number_of_columns, -1, dtype=np.int64)
+        column_positions[sampled_columns[sampled_columns >= 0]] = np.nonzero(sampled_columns >= 0)[0]
+
+        # Sampled columns keep their coefficients, interpolated ones are split between their two points
+        entry_columns: np.ndarray = columns[indices]
+        is_interpolated: np.ndarray = ~is_sampled[indices] & (entry_columns >= 0)
+        interpolated_columns: np.ndarray = entry_columns[is_interpolated]
+        rows: np.ndarray = np.concatenate([entry_rows[~is_interpolated]] + [entry_rows[is_interpolated]] * 2)
+        positions: np.ndarray = np.concatenate([
+            variable_positions[indices[~is_interpolated]],
+            column_positions[registry.lower_columns[interpolated_columns]],
+            column_positions[registry.upper_columns[interpolated_columns]]
+        ])
+        values: np.ndarray = np.concatenate([
+            data[~is_interpolated],
+            data[is_interpolated] * registry.lower_weights[interpolated_columns],
+            data[is_interpolated] * registry.upper_weights[interpolated_columns]
+        ])
+
+        model_lhs: np.ndarray = np.zeros((model.number_of_rows, len(sampled_columns)))
+        np.add.at(model_lhs, (rows[positions >= 0], positions[positions >= 0]), values[positions >= 0])
+        # Coefficients of points cancelled by the interpolation, ex. 0.4 + 0.6 - 1, are exactly 0
+        model_lhs[np.abs(model_lhs) < 1e-12] = 0.0
+
+        # Constraints of every row in the order of the rows: '=', '>=' of a finite lower bound, '<=' of a finite
+        # upper one
+        is_equality: np.ndarray = lower == upper
+        has_lower: np.ndarray = np.isfinite(lower) & ~is_equality
+        has_upper: np.ndarray = np.isfinite(upper) & ~is_equality
+        constraint_rows: np.ndarray = np.concatenate([np.flatnonzero(is_equality), np.flatnonzero(has_lower), np.flatnonzero(has_upper)])
+        constraint_senses: np.ndarray = np.array(
+            ['='] * int(is_equality.sum()) + ['>='] * int(has_lower.sum()) + ['<='] * int(has_upper.sum()), dtype=object
+        )
+        constraint_rhs: np.ndarray = np.concatenate([lower[is_equality], lower[has_lower], upper[has_upper]])
+        order: np.ndarray = np.argsort(constraint_rows, kind='stable')
+
+        lhs: np.ndarray = np.vstack([model_lhs[constraint_rows[order]], np.zeros((int(has_epsilon), len(sampled_columns)))])
+        senses: List[str] = constraint_senses[order].tolist()
+        rhs: np.ndarray = np.append(constraint_rhs[order], [1e-7] * has_epsilon)
+        rhs[rhs == 0] = 0.0
+
+        if has_epsilon:
+            lhs[-1, variable_positions[model.column_index['epsilon']]] = 1.0
+            senses.append('>=')
+
+        return SamplerPolytope(lhs, senses, rhs), sampled_columns.tolist()
+
+    @staticmethod
+    def format_sampler_input(polytope: SamplerPolytope) -> str:
+        """
+        :param polytope:
+
+        :return sampler_input: line "<a_1> ... <a_n> <sense> <b>" of every constraint
+        """
+        return "".join(
+            " ".join(map(repr, row)) + f" {sense} {right_side!r}\n"
+            for row, sense, right_side in zip(polytope.lhs.tolist(), polytope.senses, polytope.rhs.tolist())
+        )
+
+    @staticmethod
+    def write_sampler_input(model: SparseModel, registry: VariableRegistry, input_file) -> List[int]:
+        """
+        Method for writing rows of the model as the input of Sampler, see get_sampler_polytope.
+
+        :param model:
+        :param registry:
+        :param input_file:
+
+        :return sampled_columns:
+        """
+        polytope, sampled_columns = SamplerUtils.get_sampler_polytope(model, registry)
+        input_file.write(SamplerUtils.format_sampler_input(polytope))
+
+        return sampled_columns
+
+    @staticmethod
+    def read_sample(values: np.ndarray, sampled_columns: List[int], registry: VariableRegistry) -> List[float]:
+        """
+        Method for reading a sample, a line of Sampler output.
+
+        :param values: sampled value of every variable of Sampler input
+        :param sampled_columns: see get_sampler_polytope
+        :param registry:
+
+        :return column_values: value of every column of the registry, with values between characteristic points
+        interpolated
+        """
+        column_values: np.ndarray = np.zeros(registry.number_of_columns)
+        for k in range(len(sampled_columns)):
+            if sampled_columns[k] >= 0:
+                column_values[sampled_columns[k]] = float(values[k])
+
+        return registry.interpolate(column_values).tolist()
+
+    @staticmethod
+    def get_utilities_matrix(sampled_columns: List[int], registry: VariableRegistry) -> np.ndarray:
+        """
+        Matrix of the interpolation of the values of alternatives from the sampled variables, see read_sample.
+
+        :param sampled_columns: see get_sampler_polytope
+        :param registry:
+
+        :return utilities_matrix: sampled variables x (alternatives * criteria), samples @ utilities_matrix gives
+        the value of every alternative on every criterion, criteria of an alternative are consecutive
+        """
+        alternatives_columns: np.ndarray = np.array(registry.get_alternatives_columns(), dtype=np.int64).ravel()
+
+        # Position of every column of the registry in a sample, -1 if it is not sampled
+        sampled_columns: np.ndarray = np.array(sampled_columns, dtype=np.int64)
+        is_column: np.ndarray = sampled_columns >= 0
+        positions: np.ndarray = np.full(registry.number_of_columns, -1, dtype=np.int64)
+        positions[sampled_columns[is_column]] = np.nonzero(is_column)[0]
+
+        utilities_matrix: np.ndarray = np.zeros((len(sampled_columns), len(alternatives_columns)))
+        for point_columns, weights in (
+                (registry.lower_columns, registry.lower_weights),
+                (registry.upper_columns, registry.upper_weights)
+        ):
+            rows: np.ndarray = positions[point_columns[alternatives_columns]]
+            is_sampled: np.ndarray = rows >= 0
+            np.add.at(
+                utilities_matrix,
+                (rows[is_sampled], np.nonzero(is_sampled)[0]),
+                weights[alternatives_columns][is_sampled]
+            )
+
+        return utilities_matrix
+
+    @staticmethod
+    def calculate_utilities(samples: np.ndarray, utilities_matrix: np.ndarray, number_of_alternatives: int) -> np.ndarray:
+        """
+        Method for calculating the utilities of alternatives in every sample, rounded as in
+        SolverUtils.calculate_alternatives_utilities: the value on every criterion and their sum to 4 decimal places.
+
+        :param samples: samples x variables of Sampler input
+        :param utilities_matrix: see get_utilities_matrix
+        :param number_of_alternatives:
+
+        :return utilities: samples x alternatives
+        """
+        values: np.ndarray = np.round(samples @ utilities_matrix, 4)
+
+        return np.round(values.reshape(len(samples), number_of_alternatives, -1).sum(axis=2), 4)
+
+    @staticmethod
+    def calculate_positions(utilities: np.ndarray) -> np.ndarray:
+        """
+        Method for calculating the position of every alternative in the ranking of every sample, as in
+        SolverUtils.get_sampler_metrics: alternatives are sorted by their utility, ascending and stable, and
+        the position is counted from the end, so of tied alternatives the first one has the worst position.
+
+        :param utilities: samples x alternatives, see calculate_utilities
+
+        :return positions: samples x alternatives, from 1 (the best)
+        """
+        order: np.ndarray = np.argsort(utilities, axis=1, kind='stable')
+        positions: np.ndarray = np.empty_like(order)
+        np.put_along_axis(positions, order, utilities.shape[1] - np.arange(utilities.shape[1]), axis=1)
+
+        return positions
+
+    @staticmethod
+    def count_rankings(
+            utilities: np.ndarray,
+            chains: np.ndarray,
+            chain_position_counts: np.ndarray,
+            chain_pairwise_counts: np.ndarray
+    ):
+        """
+        Method for counting, for every chain, the samples in which an alternative is on a position and in which it is
+        better than another one. Tied alternatives share the best of their places, 1 + number of alternatives with
+        greater utility.
+
+        :param utilities: samples x alternatives, see calculate_utilities
+        :param chains: chain of every sample
+        :param chain_position_counts: chains x alternatives x positions, increased by the counts of the samples
+        :param chain_pairwise_counts: chains x alternatives x alternatives, increased by the counts of the samples
+        """
+        number_of_alternatives: int = utilities.shape[1]
+
+        is_better: np.ndarray = utilities[:, :, np.newaxis] > utilities[:, np.newaxis, :]
+        np.add.at(chain_pairwise_counts, chains, is_better.astype(np.int64))
+        places: np.ndarray = is_better.sum(axis=1)
+        np.add.at(
+            chain_position_counts,
+            (np.repeat(chains, number_of_alternatives), np.tile(np.arange(number_of_alternatives), len(utilities)), places.ravel()),
+            1
+        )
+
+    @staticmethod
+    def get_polyrun_command(
+            sampler_path: str,
+            number_of_samples: int,
+            sampler_options: Optional[Dict[str, int]] = None
+    ) -> List[str]:
+        """
+        :param sampler_path: path of Polyrun JAR
+        :param number_of_samples:
+        :param sampler_options: 'seed' and 'thinning' (constant number of steps between samples), default None -
+        defaults of Polyrun
+
+        :return command:
+        """
+        if sampler_options is None:
+            sampler_options = {}
+
+        command: List[str] = ['java', '-jar', sampler_path, '-n', str(number_of_samples)]
+        if sampler_options.get('seed') is not None:
+            command.extend(['-s', str(sampler_options['seed'])])
+        if sampler_options.get('thinning') is not None:
+            command.extend(['-t', f"tfc:{sampler_options['thinning']}"])
+
+        return command
+
+    @staticmethod
+    def start_polyrun(command: List[str]) -> Tuple[subprocess.Popen, List[str], threading.Thread]:
+        """
+        Method for starting Polyrun, which waits for its input until stream_polyrun. Its standard streams are pipes,
+        nothing is written to disk, and its standard error is read by a thread, so that Polyrun never blocks on it.
+
+        :param command: see get_polyrun_command
+
+        :return process, error_chunks, error_thread: error_chunks - standard error read so far, complete after
+        error_thread ends
+        """
+        process: subprocess.Popen = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True
+        )
+
+        error_chunks: List[str] = []
+        error_thread: threading.Thread = threading.Thread(
+            target=SamplerUtils.read_stream,
+            args=(process.stderr, error_chunks),
+            daemon=True
+        )
+        error_thread.start()
+
+        return process, error_chunks, error_thread
+
+    @staticmethod
+    def read_stream(input_stream: IO, chunks: List[str]):
+        """
+        :param input_stream: text stream, closed at its end
+        :param chunks: every chunk read from the stream is appended
+        """
+        with input_stream:
+            for chunk in iter(lambda: input_stream.read(65536), ''):
+                chunks.append(chunk)
+
+    @staticmethod
+    def write_stream(output_stream: IO, text: str):
+        """
+        :param output_stream: text stream, closed after the text, ex. standard input of Polyrun
+        :param text:
+        """
+        try:
+            output_stream.write(text)
+            output_stream.close()
+        except OSError:
+            # Polyrun ended without reading its whole input, its standard error tells why
+            pass
+
+    @staticmethod
+    def stream_polyrun(
+            polytope: SamplerPolytope,
+            process: subprocess.Popen,
+            error_chunks: List[str],
+            error_thread: threading.Thread,
+            chunk_size: int = 1000
+    ) -> Iterator[np.ndarray]:
+        """
+        Method for reading samples while Polyrun is still printing them. The input is written by a thread, samples
+        are parsed from the standard output chunk_size lines at a time. Closing the generator before the end, ex.
+        when no more samples are needed, kills Polyrun.
+
+        :param polytope: see get_sampler_polytope
+        :param process: see start_polyrun
+        :param error_chunks:
+        :param error_thread:
+        :param chunk_size: number of samples of every chunk, but the last one
+
+        :return chunks: samples x variables
+        """
+        input_thread: threading.Thread = threading.Thread(
+            target=SamplerUtils.write_stream,
+            args=(process.stdin, SamplerUtils.format_sampler_input(polytope)),
+            daemon=True
+        )
+        input_thread.start()
+
+        is_finished: bool = False
+        try:
+            lines: List[str] = []
+            for line in process.stdout:
+                if line.strip():
+                    lines.append(line)
+                if len(lines) == chunk_size:
+                    yield SamplerUtils.parse_samples(lines, polytope.lhs.shape[1])
+                    lines: List[str] = []
+
+            if lines:
+                yield SamplerUtils.parse_samples(lines, polytope.lhs.shape[1])
+            is_finished = True
+        finally:
+            if not is_finished:
+                process.kill()
+            process.wait()
+            process.stdout.close()
+            input_thread.join()
+            error_thread.join()
+
+    @staticmethod
+    def parse_samples(lines: List[str], number_of_variables: int) -> np.ndarray:
+        """
+        :param lines: lines of Polyrun output, values separated by tabs
+        :param number_of_variables:
+
+        :return samples: samples x variables
+        """
+        samples: List[List[float]] = [[float(value) for value in line.strip().split('\t')] for line in lines]
+
+        return np.array(samples, dtype=np.float64).reshape(len(samples), number_of_variables)
+
+    @staticmethod
+    def finish_polyrun(
+            polytope: SamplerPolytope,
+            process: subprocess.Popen,
+            error_chunks: List[str],
+            error_thread: threading.Thread
+    ) -> Tuple[np.ndarray, str]:
+        """
+        :param polytope: see get_sampler_polytope
+        :param process: see start_polyrun
+        :param error_chunks:
+        :param error_thread:
+
+        :return samples, error: samples x variables, standard error of Polyrun
+        """
+        chunks: List[np.ndarray] = list(SamplerUtils.stream_polyrun(polytope, process, error_chunks, error_thread))
+        if not chunks:
+            return np.empty((0, polytope.lhs.shape[1])), ''.join(error_chunks)
+
+        return np.vstack(chunks), ''.join(error_chunks)
+
+    @staticmethod
+    def run_polyrun(
+            polytope: SamplerPolytope,
+            sampler_path: str,
+            number_of_samples: int,
+            sampler_options: Optional[Dict[str, int]] = None
+    ) -> Tuple[np.ndarray, str]:
+        """
+        :param polytope: see get_sampler_polytope
+        :param sampler_path: path of Polyrun JAR
+        :param number_of_samples:
+        :param sampler_options: see get_polyrun_command
+
+        :return samples, error: samples x variables, standard error of Polyrun
+        """
+        command: List[str] = SamplerUtils.get_polyrun_command(sampler_path, number_of_samples, sampler_options)
+
+        return SamplerUtils.finish_polyrun(polytope, *SamplerUtils.start_polyrun(command))
+
+    @staticmethod
+    def get_hit_and_run_sampler(
+            polytope: SamplerPolytope,
+            sampler_options: Optional[Dict[str, int]] = None,
+            solver: Optional[LpSolver] = None
+    ) -> HitAndRunSampler:
+        """
+        :param polytope: see get_sampler_polytope
+        :param sampler_options: 'seed', 'thinning' and 'burn_in', see HitAndRunSampler
+        :param solver: PuLP solver of the starting point
+
+        :return sampler:
+        """
+        if sampler_options is None:
+            sampler_options = {}
+
+        return HitAndRunSampler(
+            lhs=polytope.lhs,
+            senses=polytope.senses,
+            rhs=polytope.rhs,
+            seed=sampler_options.get('seed'),
+            thinning=sampler_options.get('thinning'),
+            burn_in=sampler_options.get('burn_in'),
+            solver=solver
+        )
+
+    @staticmethod
+    def run_hit_and_run(
+            polytope: SamplerPolytope,
+            number_of_samples: int,
+            sampler_options: Optional[Dict[str, int]] = None,
+            solver: Optional[LpSolver] = None
+    ) -> Tuple[np.ndarray, str]:
+        """
+        :param polytope: see get_sampler_polytope
+        :param number_of_samples:
+        :param sampler_options: 'seed', 'thinning' and 'burn_in', see HitAndRunSampler
+        :param solver: PuLP solver of the starting point
+
+        :return samples, error: samples x variables, error message if the polytope has no interior
+        """
+        samples: np.ndarray = SamplerUtils.get_hit_and_run_sampler(polytope, sampler_options, solver).sample(number_of_samples)
+        if len(samples) == 0:
+            return samples, SamplerUtils.NO_INTERIOR_ERROR
+
+        return samples, ''
+
+    @staticmethod
+    def sample(
+            model: SparseModel,
+            registry: VariableRegistry,
+            number_of_samples: int,
+            sampler: str = 'polyrun',
+            sampler_path: str = 'files/polyrun-1.1.0-jar-with-dependencies.jar',
+            sampler_options: Optional[Dict[str, int]] = None,
+            solver: Optional[LpSolver] = None
+    ) -> Tuple[np.ndarray, List[int], str]:
+        """
+        Method for sampling value functions compatible with the rows of the model.
+
+        :param model:
+        :param registry:
+        :param number_of_samples:
+        :param sampler: 'polyrun' - Polyrun JAR run with Java, 'numpy' - in-process HitAndRunSampler
+        :param sampler_path: path of Polyrun JAR
+        :param sampler_options: 'seed', 'thinning' and, for 'numpy', 'burn_in'
+        :param solver: PuLP solver of the starting point of 'numpy'
+
+        :return samples, sampled_columns, error: samples x variables of Sampler input, see get_sampler_polytope
+        """
+        SamplerUtils.check_sampler(sampler)
+
+        polytope, sampled_columns = SamplerUtils.get_sampler_polytope(model, registry)
+
+        if sampler == 'polyrun':
+            samples, error = SamplerUtils.run_polyrun(polytope, sampler_path, number_of_samples, sampler_options)
+        else:
+            samples, error = SamplerUtils.run_hit_and_run(polytope, number_of_samples, sampler_options, solver)
+
+        return samples, sampled_columns, error
+
+
+class RankingBatches:
+    """
+    Position and pairwise counts of the accepted samples of every chain, also in consecutive batches of batch_size
+    samples of one chain, in the order they were drawn. Samples of a chain are correlated, batches of enough of
+    them are not, so the standard error of a percentage is estimated from the spread of its batch means, see
+    SolverUtils.calculate_sampler_precision. The last batch of every chain can be shorter.
+    """
+
+    def __init__(self, number_of_chains: int, number_of_alternatives: int, batch_size: int = 100):
+        """
+        :param number_of_chains:
+        :param number_of_alternatives:
+        :param batch_size: number of samples of a chain in every batch
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size of RankingBatches has to be at least 1")
+
+        self.batch_size: int = batch_size
+
+        shape: Tuple[int, int, int] = (number_of_chains, number_of_alternatives, number_of_alternatives)
+        self.chain_position_counts: np.ndarray = np.zeros(shape, dtype=np.int64)
+        self.chain_pairwise_counts: np.ndarray = np.zeros(shape, dtype=np.int64)
+        self.chain_numbers_of_samples: np.ndarray = np.zeros(number_of_chains, dtype=np.int64)
+
+        # Counts of the full batches, the current batch of a chain is the rest of its counts
+        self.batch_position_counts: List[np.ndarray] = []
+        self.batch_pairwise_counts: List[np.ndarray] = []
+        self.batch_chains: List[int] = []
+        self.full_position_counts: np.ndarray = np.zeros(shape, dtype=np.int64)
+        self.full_pairwise_counts: np.ndarray = np.zeros(shape, dtype=np.int64)
+        self.full_numbers_of_samples: np.ndarray = np.zeros(number_of_chains, dtype=np.int64)
+
+    @property
+    def number_of_samples(self) -> int:
+        return int(self.chain_numbers_of_samples.sum())
+
+    def add(self, utilities: np.ndarray, chains: np.ndarray):
+        """
+        :param utilities: samples x alternatives, see SamplerUtils.calculate_utilities
+        :param chains: chain of every sample
+        """
+        for chain in np.unique(chains).tolist():
+            chain_utilities: np.ndarray = utilities[chains == chain]
+
+            start: int = 0
+            while start < len(chain_utilities):
+                number_of_current: int = int(self.chain_numbers_of_samples[chain] - self.full_numbers_of_samples[chain])
+                size: int = min(self.batch_size - number_of_current, len(chain_utilities) - start)
+
+                SamplerUtils.count_rankings(
+                    chain_utilities[start:start + size],
+                    np.full(size, chain),
+                    self.chain_position_counts,
+                    self.chain_pairwise_counts
+                )
+                self.chain_numbers_of_samples[chain] += size
+                start += size
+
+                if number_of_current + size == self.batch_size:
+                    self.batch_position_counts.append(self.chain_position_counts[chain] - self.full_position_counts[chain])
+                    self.batch_pairwise_counts.append(self.chain_pairwise_counts[chain] - self.full_pairwise_counts[chain])
+                    self.batch_chains.append(chain)
+                    self.full_position_counts[chain] = self.chain_position_counts[chain]
+                    self.full_pairwise_counts[chain] = self.chain_pairwise_counts[chain]
+                    self.full_numbers_of_samples[chain] = self.chain_numbers_of_samples[chain]
+
+    def get_batches(self, chain: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        :param chain: default None - batches of all chains
+
+        :return batch_position_counts, batch_pairwise_counts, batch_sizes: batches x alternatives x alternatives,
+        counts of every batch, with the current batch of every chain if it is not empty
+        """
+        position_counts: List[np.ndarray] = []
+        pairwise_counts: List[np.ndarray] = []
+        sizes: List[int] = []
+        for batch_chain, batch_position_counts, batch_pairwise_counts in zip(self.batch_chains, self.batch_position_counts, self.batch_pairwise_counts):
+            if chain is None or batch_chain == chain:
+                position_counts.append(batch_position_counts)
+                pairwise_counts.append(batch_pairwise_counts)
+                sizes.append(self.batch_size)
+
+        for current_chain in range(len(self.chain_numbers_of_samples)) if chain is None else [chain]:
+            number_of_current: int = int(self.chain_numbers_of_samples[current_chain] - self.full_numbers_of_samples[current_chain])
+            if number_of_current > 0:
+                position_counts.append(self.chain_position_counts[current_chain] - self.full_position_counts[current_chain])
+                pairwise_counts.append(self.chain_pairwise_counts[current_chain] - self.full_pairwise_counts[current_chain])
+                sizes.append(number_of_current)
+
+        number_of_alternatives: int = self.chain_position_counts.shape[1]
+        if not sizes:
+            empty: np.ndarray = np.zeros((0, number_of_alternatives, number_of_alternatives), dtype=np.int64)
+            return empty, empty, np.zeros(0, dtype=np.int64)
+
+        return np.stack(position_counts), np.stack(pairwise_counts), np.array(sizes, dtype=np.int64)
+
+
+class SampleStream:
+    """
+    Samples of one Sampler input drawn in batches, for consumers which do not know in advance how many samples
+    they need, ex. when some samples are rejected. The input is built once, by the caller.
+
+    'numpy' continues one chain between batches, run by the SamplerWorker if one is given. Every batch of
+    'polyrun' is a new run of Polyrun by this process, with seed increased by the number of the batch if a seed
+    is given, so that batches are not repeated.
+
+    With sampler_options['number_of_chains'] = k > 1 every batch is split between k independent chains run at
+    the same time, each 'numpy' chain by its own SamplerWorker process and each 'polyrun' chain by its own run
+    of Polyrun. Chain c starts from seed + c and draws every k-th sample of a batch. Workers are stopped and
+    the chain of the given worker is released by close.
+    """
+
+    def __init__(
+            self,
+            polytope: SamplerPolytope,
+            sampler: str = 'polyrun',
+            sampler_path: str = 'files/polyrun-1.1.0-jar-with-dependencies.jar',
+            sampler_options: Optional[Dict[str, int]] = None,
+            solver: Optional[LpSolver] = None,
+            worker: Optional['SamplerWorker'] = None
+    ):
+        """
+        :param polytope: see SamplerUtils.get_sampler_polytope
+        :param sampler: 'polyrun' or 'numpy', see SamplerUtils.sample
+        :param sampler_path: path of Polyrun JAR
+        :param sampler_options: 'seed', 'thinning', 'number_of_chains' and, for 'numpy', 'burn_in'
+        :param solver: PuLP solver of the starting point of a single 'numpy' chain
+        :param worker: long-lived process running a single 'numpy' chain, not used by 'polyrun', default None -
+        the chain is run by this process
+        """
+        SamplerUtils.check_sampler(sampler)
+
+        self.polytope: SamplerPolytope = polytope
+        self.sampler: str = sampler
+        self.sampler_path: str = sampler_path
+        self.sampler_options: Dict[str, int] = dict(sampler_options) if sampler_options is not None else {}
+        self.solver: Optional[LpSolver] = solver
+        self.worker: Optional['SamplerWorker'] = worker
+
+        self.number_of_chains: int = int(self.sampler_options.get('number_of_chains') or 1)
+        if self.number_of_chains < 1:
+            raise ValueError("number_of_chains of the sampler has to be at least 1")
+
+        self.hit_and_run: Optional[HitAndRunSampler] = None
+        self.error: str = ''
+        self.chain_workers: List['SamplerWorker'] = []
+        self.number_of_batches: int = 0
+        self.number_of_drawn: int = 0
+        # Number of samples drawn by every chain
+        self.chain_numbers_of_drawn: List[int] = [0] * self.number_of_chains
+
+    def __enter__(self) -> 'SampleStream':
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+
+    def close(self):
+        """
+        Method for stopping the workers of the chains and releasing the chain of the worker.
+        """
+        for worker in self.chain_workers:
+            worker.close()
+        self.chain_workers: List['SamplerWorker'] = []
+
+        if self.worker is not None and self.sampler == 'numpy':
+            self.worker.release(str(id(self)))
+
+    def get_chain_seed(self, chain: int) -> Optional[int]:
+        """
+        :param chain:
+
+        :return seed: seed of the chain, for 'polyrun' of its current batch, None if no seed is given
+        """
+        if self.sampler_options.get('seed') is None:
+            return None
+
+        if self.sampler == 'polyrun':
+            return self.sampler_options['seed'] + self.number_of_batches * self.number_of_chains + chain
+
+        return self.sampler_options['seed'] + chain
+
+    def draw(self, number_of_samples: int) -> Tuple[np.ndarray, str]:
+        """
+        :param number_of_samples:
+
+        :return samples, error: samples x variables of Sampler input, see SamplerUtils.run_polyrun and
+        SamplerUtils.run_hit_and_run
+        """
+        samples, _, error = self.draw_chains(number_of_samples)
+
+        return samples, error
+
+    def draw_chains(self, number_of_samples: int) -> Tuple[np.ndarray, np.ndarray, str]:
+        """
+        :param number_of_samples: at least number_of_samples samples are drawn, the same number by every chain
+
+        :return samples, chains, error: samples x variables of Sampler input, chain of every sample, errors of
+        the chains
+        """
+        chunks: List[Tuple[np.ndarray, np.ndarray]] = list(self.draw_chunks(number_of_samples))
+        if not chunks:
+            return np.empty((0, self.polytope.lhs.shape[1])), np.empty(0, dtype=np.int64), self.error
+
+        return np.vstack([samples for samples, _ in chunks]), np.concatenate([chains for _, chains in chunks]), self.error
+
+    def draw_chunks(self, number_of_samples: int, chunk_size: int = 1000) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Samples of a batch as soon as they are drawn. A single 'polyrun' chain yields chunk_size samples at a time
+        while Polyrun is still sampling, closing the generator before the end kills Polyrun. A single 'numpy' chain
+        is sampled chunk_size samples at a time, so a batch is never kept in memory at once. Parallel chains yield
+        the whole batch at once. Errors of the batch are in self.error after the last chunk.
+
+        :param number_of_samples: see draw_chains
+        :param chunk_size:
+
+        :return chunks: samples, chains, see draw_chains
+        """
+        self.error: str = ''
+        try:
+            if self.sampler == 'polyrun' and self.number_of_chains == 1:
+                sampler_options: Dict[str, int] = dict(self.sampler_options)
+                sampler_options['seed'] = self.get_chain_seed(0)
+
+                command: List[str] = SamplerUtils.get_polyrun_command(self.sampler_path, number_of_samples, sampler_options)
+                process, error_chunks, error_thread = SamplerUtils.start_polyrun(command)
+                with closing(SamplerUtils.stream_polyrun(self.polytope, process, error_chunks, error_thread, chunk_size)) as chunks:
+                    for samples in chunks:
+                        yield self.count_drawn(samples, np.zeros(len(samples), dtype=np.int64))
+
+                self.error: str = ''.join(error_chunks)
+            elif self.sampler == 'numpy' and self.number_of_chains == 1:
+                number_of_remaining: int = number_of_samples
+                while number_of_remaining > 0:
+                    samples, self.error = self.draw_single_chain(min(number_of_remaining, chunk_size))
+                    if len(samples) == 0:
+                        break
+
+                    number_of_remaining -= len(samples)
+                    yield self.count_drawn(samples, np.zeros(len(samples), dtype=np.int64))
+            else:
+                samples, chains, self.error = self.draw_parallel_chains(number_of_samples)
+                yield self.count_drawn(samples, chains)
+        finally:
+            self.number_of_batches += 1
+
+    def count_drawn(self, samples: np.ndarray, chains: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        :param samples:
+        :param chains: chain of every sample
+
+        :return samples, chains:
+        """
+        self.number_of_drawn += len(samples)
+        for chain, number_of_drawn in enumerate(np.bincount(chains, minlength=self.number_of_chains).tolist()):
+            self.chain_numbers_of_drawn[chain] += number_of_drawn
+
+        return samples, chains
+
+    def draw_single_chain(self, number_of_samples: int) -> Tuple[np.ndarray, str]:
+        """
+        :param number_of_samples:
+
+        :return samples, error: samples of the 'numpy' chain
+        """
+        if self.worker is not None:
+            return self.worker.sample(
+                self.polytope, number_of_samples, self.sampler_options, chain=str(id(self)), solver=self.solver
+            )
+
+        if self.hit_and_run is None:
+            self.hit_and_run: HitAndRunSampler = SamplerUtils.get_hit_and_run_sampler(
+                self.polytope, self.sampler_options, self.solver
+            )
+
+        samples: np.ndarray = self.hit_and_run.sample(number_of_samples)
+
+        return samples, SamplerUtils.NO_INTERIOR_ERROR if len(samples) == 0 else ''
+
+    def draw_parallel_chains(self, number_of_samples: int) -> Tuple[np.ndarray, np.ndarray, str]:
+        """
+        :param number_of_samples:
+
+        :return samples, chains, error: samples of the chains interleaved, so that any first samples come from
+        all chains evenly
+        """
+        # Imported here, sampler_worker depends on this module
+        from .sampler_worker import SamplerWorker
+
+        if self.sampler == 'numpy' and not self.chain_workers:
+            self.chain_workers: List['SamplerWorker'] = [SamplerWorker() for _ in range(self.number_of_chains)]
+
+        number_of_chain_samples: int = -(-number_of_samples // self.number_of_chains)
+
+        def draw_chain(chain: int) -> Tuple[np.ndarray, str]:
+            sampler_options: Dict[str, int] = dict(self.sampler_options)
+            sampler_options['seed'] = self.get_chain_seed(chain)
+
+            if self.sampler == 'polyrun':
+                return SamplerUtils.run_polyrun(self.polytope, self.sampler_path, number_of_chain_samples, sampler_options)
+
+            return self.chain_workers[chain].sample(
+                self.polytope, number_of_chain_samples, sampler_options, chain=str(id(self))
+            )
+
+        with ThreadPoolExecutor(max_workers=self.number_of_chains) as executor:
+            results: List[Tuple[np.ndarray, str]] = list(executor.map(draw_chain, range(self.number_of_chains)))
+
+        # Chains are cut to the shortest one, ex. when Polyrun of one of them failed
+        length: int = min(len(chain_samples) for chain_samples, _ in results)
+        samples: np.ndarray = np.stack([chain_samples[:length] for chain_samples, _ in results], axis=1)
+        chains: np.ndarray = np.tile(np.arange(self.number_of_chains), length)
+        error: str = "".join(chain_error for _, chain_error in results)
+
+        return samples.reshape(length * self.number_of_chains, self.polytope.lhs.shape[1]), chains, error
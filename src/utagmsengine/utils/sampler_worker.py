@@ -0,0 +1,306 @@
+import os
+import pickle
+import queue
+import struct
+import subprocess
+import sys
+import threading
+from typing import Any, BinaryIO, Dict, Optional, Tuple
+
+import numpy as np
+from pulp import LpSolver
+
+from .sampler_utils import HitAndRunSampler, SamplerPolytope, SamplerUtils
+
+
+class SamplerWorkerError(Exception):
+    """
+    Raised when the worker process of SamplerWorker dies or does not answer in time.
+    """
+
+
+# Every message is a 4-byte big-endian length followed by a pickle of that length
+HEADER: struct.Struct = struct.Struct('>I')
+
+
+def write_frame(output_stream: BinaryIO, message: Any):
+    """
+    :param output_stream:
+    :param message: picklable message
+    """
+    payload: bytes = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    output_stream.write(HEADER.pack(len(payload)) + payload)
+    output_stream.flush()
+
+
+def read_frame(input_stream: BinaryIO) -> Optional[Any]:
+    """
+    :param input_stream:
+
+    :return message: None at the end of the stream
+    """
+    header: bytes = input_stream.read(HEADER.size)
+    if len(header) < HEADER.size:
+        return None
+
+    length: int = HEADER.unpack(header)[0]
+    payload: bytes = input_stream.read(length)
+    if len(payload) < length:
+        return None
+
+    return pickle.loads(payload)
+
+
+def serve(input_stream: BinaryIO, output_stream: BinaryIO):
+    """
+    Loop of the worker process, answering messages until 'stop' or the end of the input:
+
+    - ('ping',) - ('pong', pid)
+    - ('sample', job) - ('ok', (samples, error)) or ('error', exception), job holds 'polytope', 'number_of_samples',
+      'sampler_options' and 'solver' of SamplerUtils.run_hit_and_run
+    - ('release', chain) - ('ok', None)
+
+    A job with 'chain' continues the chain of the previous job with the same 'chain' in this process, until it is
+    released, instead of starting a new one.
+
+    Only 'numpy' chains are run. Polyrun reads its input until the end of the stream and takes the number of
+    samples and the seed as arguments, so a JVM cannot be kept between its runs and the worker would only add
+    a process in front of every one of them.
+
+    :param input_stream:
+    :param output_stream:
+    """
+    # Chains continued between jobs
+    chains: Dict[str, HitAndRunSampler] = {}
+
+    while True:
+        message: Optional[Tuple[Any, ...]] = read_frame(input_stream)
+        if message is None or message[0] == 'stop':
+            break
+
+        if message[0] == 'ping':
+            write_frame(output_stream, ('pong', os.getpid()))
+            continue
+
+        if message[0] == 'release':
+            chains.pop(message[1], None)
+            write_frame(output_stream, ('ok', None))
+            continue
+
+        job: Dict[str, Any] = message[1]
+        try:
+            if job.get('chain') is not None:
+                if job['chain'] not in chains:
+                    chains[job['chain']] = SamplerUtils.get_hit_and_run_sampler(
+                        job['polytope'], job['sampler_options'], job.get('solver')
+                    )
+
+                samples: np.ndarray = chains[job['chain']].sample(job['number_of_samples'])
+                result: Tuple[np.ndarray, str] = (samples, SamplerUtils.NO_INTERIOR_ERROR if len(samples) == 0 else '')
+            else:
+                result: Tuple[np.ndarray, str] = SamplerUtils.run_hit_and_run(
+                    job['polytope'], job['number_of_samples'], job['sampler_options'], job.get('solver')
+                )
+
+            write_frame(output_stream, ('ok', result))
+        except Exception as exception:
+            write_frame(output_stream, ('error', exception))
+
+
+def main():
+    """
+    Entry point of the worker process, messages are read from the standard input and answers are written to
+    the standard output. Anything printed by the libraries goes to the standard error.
+    """
+    output_stream: BinaryIO = sys.stdout.buffer
+    sys.stdout = sys.stderr
+
+    serve(sys.stdin.buffer, output_stream)
+
+
+class SamplerWorker:
+    """
+    Long-lived process running 'numpy' sampling chains, started once (ex. per Solver) and reused by every call,
+    instead of a new process per chain. Jobs are sent over the standard input and output of the process,
+    see serve. Polyrun is not run by the worker.
+
+    The process is started on the first job. A process which died is started again before the next job and a job
+    interrupted by the death of the process is sent once more. A job which does not finish in timeout kills the
+    process and raises SamplerWorkerError.
+    """
+
+    def __init__(self, timeout: Optional[float] = None):
+        """
+        :param timeout: seconds to wait for the answer to a job, default None - no limit
+        """
+        self.timeout: Optional[float] = timeout
+
+        self.process: Optional[subprocess.Popen] = None
+        self.answers: Optional[queue.Queue] = None
+        self.lock: threading.Lock = threading.Lock()
+
+        # Number of times the process was started again after it died or timed out
+        self.number_of_restarts: int = 0
+
+    def __enter__(self) -> 'SamplerWorker':
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+
+    def __reduce__(self):
+        # A copy, ex. in a pickled Solver, starts its own process
+        return self.__class__, (self.timeout,)
+
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def start(self):
+        """
+        Method for starting the worker process, with the same sys.path as the current one.
+        """
+        environment: Dict[str, str] = dict(os.environ)
+        environment['PYTHONPATH'] = os.pathsep.join(os.path.abspath(path) for path in sys.path)
+
+        self.process: subprocess.Popen = subprocess.Popen(
+            [sys.executable, '-c', f'from {__package__}.sampler_worker import main; main()'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            env=environment
+        )
+        self.answers: queue.Queue = queue.Queue()
+
+        # Answers are read by a thread, so that waiting for them can time out
+        threading.Thread(
+            target=SamplerWorker.read_answers,
+            args=(self.process.stdout, self.answers),
+            daemon=True
+        ).start()
+
+    @staticmethod
+    def read_answers(input_stream: BinaryIO, answers: queue.Queue):
+        """
+        :param input_stream: standard output of the worker process
+        :param answers: every answer, then None at the end of the stream
+        """
+        while True:
+            answer: Optional[Any] = read_frame(input_stream)
+            answers.put(answer)
+            if answer is None:
+                break
+
+    def kill(self):
+        """
+        Method for stopping the worker process immediately, ex. after a timeout.
+        """
+        if self.process is None:
+            return
+
+        self.process.kill()
+        self.process.wait()
+        self.process.stdin.close()
+        self.process.stdout.close()
+        self.process = None
+
+    def close(self):
+        """
+        Method for stopping the worker process after its current job.
+        """
+        with self.lock:
+            if self.process is None:
+                return
+
+            if self.is_alive():
+                try:
+                    write_frame(self.process.stdin, ('stop',))
+                    self.process.wait(timeout=10)
+                except (OSError, subprocess.TimeoutExpired):
+                    pass
+
+            self.kill()
+
+    def request(self, message: Tuple[Any, ...], timeout: Optional[float] = None) -> Any:
+        """
+        :param message: see serve
+        :param timeout: default None - timeout of the worker
+
+        :return answer: see serve
+        """
+        timeout: Optional[float] = timeout if timeout is not None else self.timeout
+
+        with self.lock:
+            for attempt in range(2):
+                if not self.is_alive():
+                    if self.process is not None:
+                        self.kill()
+                        self.number_of_restarts += 1
+                    self.start()
+
+                try:
+                    write_frame(self.process.stdin, message)
+                    answer: Optional[Any] = self.answers.get(timeout=timeout)
+                except OSError:
+                    answer = None
+                except queue.Empty:
+                    self.kill()
+                    raise SamplerWorkerError(f"Sampler worker did not answer in {timeout} seconds")
+
+                if answer is not None:
+                    return answer
+
+                # The process died during the job
+                self.kill()
+
+        raise SamplerWorkerError("Sampler worker died twice during the same job")
+
+    def ping(self, timeout: float = 10) -> bool:
+        """
+        Health check of the worker process, started if it is not running.
+
+        :param timeout: seconds to wait for the answer
+
+        :return is_healthy:
+        """
+        try:
+            return self.request(('ping',), timeout=timeout)[0] == 'pong'
+        except SamplerWorkerError:
+            return False
+
+    def sample(
+            self,
+            polytope: SamplerPolytope,
+            number_of_samples: int,
+            sampler_options: Optional[Dict[str, int]] = None,
+            chain: Optional[str] = None,
+            solver: Optional[LpSolver] = None
+    ) -> Tuple[np.ndarray, str]:
+        """
+        :param polytope: see SamplerUtils.get_sampler_polytope
+        :param number_of_samples:
+        :param sampler_options: 'seed', 'thinning' and 'burn_in', see HitAndRunSampler
+        :param chain: name of a chain continued by every job with the same name, until it is released,
+        default None - a new chain
+        :param solver: PuLP solver of the starting point of a new chain, default None - CBC
+
+        :return samples, error: see SamplerUtils.run_hit_and_run
+
+        :raises Exception: error of the job, ex. ValueError for invalid sampler_options
+        """
+        status, result = self.request(('sample', {
+            'polytope': polytope,
+            'number_of_samples': number_of_samples,
+            'sampler_options': sampler_options,
+            'chain': chain,
+            'solver': solver
+        }))
+        if status == 'error':
+            raise result
+
+        return result
+
+    def release(self, chain: str):
+        """
+        :param chain: name of a chain which is not needed anymore, see sample
+        """
+        if self.is_alive():
+            self.request(('release', chain))
@@ -1,13 +1,25 @@
-from tempfile import TemporaryFile
-from typing import Tuple, List, Dict
-
-from pulp import LpVariable, LpProblem, LpMaximize, LpMinimize, lpSum, GLPK
 from collections import defaultdict
-import re
-import subprocess
+from contextlib import closing, nullcontext
+from typing import Tuple, List, Dict, Optional, Union
+
+from pulp import LpVariable, LpProblem, LpMaximize, LpMinimize, LpSolver, LpStatus, lpSum
+
+import numpy as np
+
+from .backend_utils import BackendUtils
+from .sampler_utils import RankingBatches, SamplerUtils, SampleStream
+from .sampler_worker import SamplerWorker
+from .sample_store import SampleStore
+from .analysis_context import AnalysisContext
+from .compiled_core import CompiledCore
+from .sparse_model import SparseModel
+from .utility_bounds import UtilityBounds
+from .variable_registry import VariableRegistry
 
 
 class SolverUtils:
+    # Batches needed for a batch means estimate of the precision of the sampler, see calculate_sampler_precision
+    MIN_NUMBER_OF_BATCHES: int = 10
 
     @staticmethod
     def calculate_solved_problem(
@@ -23,6 +35,8 @@ class SolverUtils:
             type_of_rank: int = -1,
             type_of_relation: int = 0,
             show_logs: bool = False,
+            backend: Union[str, LpSolver] = 'glpk',
+            backend_options: Optional[Dict[str, float]] = None,
     ) -> LpProblem:
         """
         Main calculation method for problem-solving.
@@ -40,295 +54,36 @@ class SolverUtils:
         :param alternative_id_1: used only in calculation for hasse graphs
         :param alternative_id_2: used only in calculation for hasse graphs
         :param show_logs: default None
+        :param backend: 'glpk', 'cbc', 'highs' or an instance of a PuLP solver, see BackendUtils.get_solver
+        :param backend_options: see BackendUtils.get_solver
 
         :return problem:
         """
-        type_of_model: int = LpMaximize
-        if alternative_id_extreme != -1:
-            type_of_model: int = LpMinimize
-
-        problem: LpProblem = LpProblem("UTA-GMS", type_of_model)
-
-        epsilon: LpVariable = LpVariable("epsilon")
-        if alternative_id_extreme != -1:
-            problem += epsilon == 0.0001
-
-        u_list, u_list_dict = SolverUtils.create_variables_list_and_dict(performance_table_list)
-
-        characteristic_points: List[List[float]] = SolverUtils.calculate_characteristic_points(
-            number_of_points, performance_table_list, u_list_dict, u_list
+        core: CompiledCore = CompiledCore(
+            performance_table_list=performance_table_list,
+            comparisons=comparisons,
+            criteria=criteria,
+            worst_best_position=worst_best_position,
+            number_of_points=number_of_points,
+            comprehensive_intensities=comprehensive_intensities,
+            # The problem itself is returned, so HiGHS is used through PuLP instead of the persistent model
+            backend=backend if backend != 'highs' else BackendUtils.get_solver('highs', show_logs, backend_options),
+            backend_options=backend_options
         )
 
-        u_list = [sorted(lp_var_list, key=lambda var: -float(var.name.split("_")[-1]) if len(var.name.split("_")) == 4 else float(var.name.split("_")[-1])) for lp_var_list in u_list]
-
-        # Normalization constraints
-        the_greatest_performance: List[LpVariable] = []
-        for i in range(len(u_list)):
-            if criteria[i]:
-                the_greatest_performance.append(u_list[i][-1])
-                problem += u_list[i][0] == 0
-            else:
-                the_greatest_performance.append(u_list[i][0])
-                problem += u_list[i][-1] == 0
-
-        problem += lpSum(the_greatest_performance) == 1
-
-        u_list_of_characteristic_points: List[List[LpVariable]] = []
-        for i in range(len(characteristic_points)):
-            pom = []
-            for j in range(len(characteristic_points[i])):
-                pom.append(u_list_dict[i][float(characteristic_points[i][j])])
-            u_list_of_characteristic_points.append(pom[:])
-
-        # Monotonicity constraint
-        for i in range(len(u_list_of_characteristic_points)):
-            for j in range(1, len(u_list_of_characteristic_points[i])):
-                if criteria[i]:
-                    problem += u_list_of_characteristic_points[i][j] >= u_list_of_characteristic_points[i][j - 1]
-                else:
-                    problem += u_list_of_characteristic_points[i][j - 1] >= u_list_of_characteristic_points[i][j]
-
-        # Bounds constraint
-        for i in range(len(u_list_of_characteristic_points)):
-            for j in range(1, len(u_list_of_characteristic_points[i]) - 1):
-                if criteria[i]:
-                    problem += u_list_of_characteristic_points[i][-1] >= u_list_of_characteristic_points[i][j]
-                    problem += u_list_of_characteristic_points[i][j] >= u_list_of_characteristic_points[i][0]
-                else:
-                    problem += u_list_of_characteristic_points[i][0] >= u_list_of_characteristic_points[i][j]
-                    problem += u_list_of_characteristic_points[i][j] >= u_list_of_characteristic_points[i][-1]
-
-        # Comparison constraint
-        for comparison in comparisons:
-            left_alternative: List[float] = performance_table_list[comparison[0]]
-            right_alternative: List[float] = performance_table_list[comparison[1]]
-
-            indices_to_keep: List[int] = comparison[2]
-            if indices_to_keep:
-                left_alternative: List[float] = [left_alternative[i] for i in indices_to_keep]
-                right_alternative: List[float] = [right_alternative[i] for i in indices_to_keep]
-                left_side: List[LpVariable] = []
-                right_side: List[LpVariable] = []
-                for i in range(len(indices_to_keep)):
-                    left_side.append(u_list_dict[indices_to_keep[i]][left_alternative[i]])
-                    right_side.append(u_list_dict[indices_to_keep[i]][right_alternative[i]])
-            else:
-                left_side: List[LpVariable] = []
-                right_side: List[LpVariable] = []
-                for i in range(len(left_alternative)):
-                    left_side.append(u_list_dict[i][left_alternative[i]])
-                    right_side.append(u_list_dict[i][right_alternative[i]])
-
-            if comparison[3] == '>':
-                problem += lpSum(left_side) >= lpSum(right_side) + epsilon
-            if comparison[3] == '=':
-                problem += lpSum(left_side) == lpSum(right_side)
-            if comparison[3] == '>=':
-                problem += lpSum(left_side) >= lpSum(right_side)
-
-        if alternative_id_1 >= 0 and alternative_id_2 >= 0:
-            left_alternative: List[float] = performance_table_list[alternative_id_2]
-            right_alternative: List[float] = performance_table_list[alternative_id_1]
-
-            left_side: List[LpVariable] = []
-            right_side: List[LpVariable] = []
-            for i in range(len(u_list_dict)):
-                left_side.append(u_list_dict[i][left_alternative[i]])
-                right_side.append(u_list_dict[i][right_alternative[i]])
-
-            if type_of_relation == 0:
-                problem += lpSum(left_side) >= lpSum(right_side) + epsilon
-            else:
-                problem += lpSum(left_side) >= lpSum(right_side)
-
-        # Worst and Best position
-        alternatives_variables: List[List[LpVariable]] = []
-        for i in range(len(performance_table_list)):
-            pom = []
-            for j in range(len(u_list_dict)):
-                pom.append(u_list_dict[j][performance_table_list[i][j]])
-            alternatives_variables.append(pom[:])
-
-        alternatives_binary_variables: Dict[int, List[Dict[int, LpVariable]]] = {}
-        all_binary_variables = {}
-        for i in worst_best_position:
-            pom_dict = {}
-            for j in range(len(performance_table_list)):
-                pom = []
-                if i[0] != j:
-                    variable_1_name: str = f"v_{i[0]}_{i[0]}_higher_than_{j}_criteria_{'_'.join(map(str, i[3]))}"
-                    if variable_1_name not in all_binary_variables:
-                        variable_1: LpVariable = LpVariable(variable_1_name, cat='Binary')
-                        pom.append(variable_1)
-                        all_binary_variables[variable_1_name] = variable_1
-                    else:
-                        pom.append(all_binary_variables[variable_1_name])
-
-                    variable_2_name: str = f"v_{i[0]}_{j}_higher_than_{i[0]}_criteria_{'_'.join(map(str, i[3]))}"
-                    if variable_2_name not in all_binary_variables:
-                        variable_2: LpVariable = LpVariable(variable_2_name, cat='Binary')
-                        pom.append(variable_2)
-                        all_binary_variables[variable_2_name] = variable_2
-                    else:
-                        pom.append(all_binary_variables[variable_2_name])
-
-                    pom_dict[j] = pom[:]
-
-            if i[0] not in alternatives_binary_variables:
-                alternatives_binary_variables[i[0]] = []
-
-            alternatives_binary_variables[i[0]].append(pom_dict)
-
-        big_M: int = 1e20
-        dict_with_worst_best_iterations = {}
-        for i in range(len(performance_table_list)):
-            dict_with_worst_best_iterations[i] = 0
-
-        for worst_best in worst_best_position:
-            x = dict_with_worst_best_iterations[worst_best[0]]
-
-            for i in range(len(performance_table_list)):
-                if i != worst_best[0]:
-                    position_constraints: List[LpVariable] = alternatives_variables[worst_best[0]]
-                    compared_constraints: List[LpVariable] = alternatives_variables[i]
-
-                    indices_to_keep: List[int] = worst_best[3]
-                    if indices_to_keep:
-                        position_constraints: List[LpVariable] = [position_constraints[i] for i in indices_to_keep]
-                        compared_constraints: List[LpVariable] = [compared_constraints[i] for i in indices_to_keep]
-
-                    problem += lpSum(position_constraints) - lpSum(compared_constraints) + big_M * alternatives_binary_variables[worst_best[0]][x][i][0] >= 0
-
-                    problem += lpSum(compared_constraints) - lpSum(position_constraints) + big_M * alternatives_binary_variables[worst_best[0]][x][i][1] >= epsilon
-
-                    problem += alternatives_binary_variables[worst_best[0]][x][i][0] + alternatives_binary_variables[worst_best[0]][x][i][1] <= 1
-
-            pom_higher = []
-            pom_lower = []
-            for j in alternatives_binary_variables[worst_best[0]][x]:
-                pom_higher.append(alternatives_binary_variables[worst_best[0]][x][j][0])
-                pom_lower.append(alternatives_binary_variables[worst_best[0]][x][j][1])
-            problem += lpSum(pom_higher) <= worst_best[1] - 1
-            problem += lpSum(pom_lower) <= len(performance_table_list) - worst_best[2]
-
-            dict_with_worst_best_iterations[worst_best[0]] = dict_with_worst_best_iterations[worst_best[0]] + 1
-
-        # Use linear interpolation to create constraints
-        for i in range(len(u_list_of_characteristic_points)):
-            for j in u_list_dict[i]:
-                if_characteristic = 0
-
-                for z in range(len(u_list_of_characteristic_points[i])):
-                    if u_list_dict[i][j].name == u_list_of_characteristic_points[i][z].name:
-                        if_characteristic = 1
-                        break
-
-                if if_characteristic == 0:
-                    point_before = 0
-                    point_after = 1
-
-                    if len(u_list_dict[i][j].name.split("_")) == 4:
-                        val = -float(u_list_dict[i][j].name.split("_")[-1])
-                    else:
-                        val = float(u_list_dict[i][j].name.split("_")[-1])
-                    while characteristic_points[i][point_before] > val or val > characteristic_points[i][point_after]:
-                        point_before += 1
-                        point_after += 1
-                    value = SolverUtils.linear_interpolation(val, characteristic_points[i][point_before],
-                                                             u_list_dict[i][
-                                                                 float(characteristic_points[i][point_before])],
-                                                             characteristic_points[i][point_after], u_list_dict[i][
-                                                                 float(characteristic_points[i][point_after])])
-
-                    problem += u_list_dict[i][j] == value
-
-        # comprehensive comparisons of intensities of preference
-        for intensity in comprehensive_intensities:
-            left_alternative_1: List[float] = performance_table_list[intensity[0]]
-            left_alternative_2: List[float] = performance_table_list[intensity[2]]
-            right_alternative_1: List[float] = performance_table_list[intensity[4]]
-            right_alternative_2: List[float] = performance_table_list[intensity[6]]
-
-            left_side_1: List[LpVariable] = []
-            left_side_2: List[LpVariable] = []
-            right_side_1: List[LpVariable] = []
-            right_side_2: List[LpVariable] = []
-
-            indices_to_keep: List[List[int]] = [intensity[1], intensity[3], intensity[5], intensity[7]]
-
-            if indices_to_keep[0]:
-                left_alternative_1: List[float] = [left_alternative_1[i] for i in indices_to_keep[0]]
-                for i in range(len(indices_to_keep[0])):
-                    left_side_1.append(u_list_dict[indices_to_keep[0][i]][left_alternative_1[i]])
-            else:
-                for i in range(len(left_alternative_1)):
-                    left_side_1.append(u_list_dict[i][left_alternative_1[i]])
-
-            if indices_to_keep[1]:
-                left_alternative_2: List[float] = [left_alternative_2[i] for i in indices_to_keep[1]]
-                for i in range(len(indices_to_keep[1])):
-                    left_side_2.append(u_list_dict[indices_to_keep[1][i]][left_alternative_2[i]])
-            else:
-                for i in range(len(left_alternative_2)):
-                    left_side_2.append(u_list_dict[i][left_alternative_2[i]])
-
-            if indices_to_keep[2]:
-                right_alternative_1: List[float] = [right_alternative_1[i] for i in indices_to_keep[2]]
-                for i in range(len(indices_to_keep[2])):
-                    right_side_1.append(u_list_dict[indices_to_keep[2][i]][right_alternative_1[i]])
-            else:
-                for i in range(len(right_alternative_1)):
-                    right_side_1.append(u_list_dict[i][right_alternative_1[i]])
-
-            if indices_to_keep[3]:
-                right_alternative_2: List[float] = [right_alternative_2[i] for i in indices_to_keep[3]]
-                for i in range(len(indices_to_keep[3])):
-                    right_side_2.append(u_list_dict[indices_to_keep[3][i]][right_alternative_2[i]])
-            else:
-                for i in range(len(right_alternative_2)):
-                    right_side_2.append(u_list_dict[i][right_alternative_2[i]])
-
-            if intensity[-1] == '>':
-                problem += lpSum(left_side_1) - lpSum(left_side_2) >= lpSum(right_side_1) - lpSum(
-                    right_side_2) + epsilon
-            elif intensity[-1] == '>=':
-                problem += lpSum(left_side_1) - lpSum(left_side_2) >= lpSum(right_side_1) - lpSum(right_side_2)
-            else:
-                problem += lpSum(left_side_1) - lpSum(left_side_2) == lpSum(right_side_1) - lpSum(right_side_2)
-
-        # extreme ranking
-        binary_variables_rank_dict = {}
-        binary_variables_rank = []
         if alternative_id_extreme >= 0:
-            for i in range(len(performance_table_list)):
-                if i != alternative_id_extreme:
-                    left_alternative: List[float] = performance_table_list[alternative_id_extreme]
-                    right_alternative: List[float] = performance_table_list[i]
-                    left_side: List[LpVariable] = []
-                    right_side: List[LpVariable] = []
-                    for j in range(len(left_alternative)):
-                        left_side.append(u_list_dict[j][left_alternative[j]])
-                        right_side.append(u_list_dict[j][right_alternative[j]])
-
-                    variable: str = f"vrank_{i}"
-                    if variable not in binary_variables_rank_dict:
-                        variable_1: LpVariable = LpVariable(variable, cat='Binary')
-                        binary_variables_rank_dict[variable] = variable_1
-                        binary_variables_rank.append(variable_1)
-                    if type_of_rank == 0:
-                        problem += lpSum(left_side) - lpSum(right_side) + big_M * variable_1 >= 0
-                    elif type_of_rank == 1:
-                        problem += lpSum(left_side) - lpSum(right_side) + big_M * variable_1 >= epsilon
-                    elif type_of_rank == 2:
-                        problem += lpSum(right_side) - lpSum(left_side) + big_M * variable_1 >= epsilon
-                    elif type_of_rank == 3:
-                        problem += lpSum(right_side) - lpSum(left_side) + big_M * variable_1 >= 0
-
-            problem += lpSum(binary_variables_rank)
+            problem: LpProblem = core.solve_extreme_rank(
+                alternative_id_extreme=alternative_id_extreme,
+                type_of_rank=type_of_rank,
+                show_logs=show_logs
+            )
         else:
-            problem += epsilon
-
-        problem.solve(solver=GLPK(msg=show_logs))
+            problem: LpProblem = core.solve_relation(
+                alternative_id_1=alternative_id_1,
+                alternative_id_2=alternative_id_2,
+                type_of_relation=type_of_relation,
+                show_logs=show_logs
+            )
 
         return problem
 
@@ -344,8 +99,18 @@ class SolverUtils:
             show_logs: bool = False,
             sampler_path: str = 'files/polyrun-1.1.0-jar-with-dependencies.jar',
             number_of_samples: str = '100',
-            sampler_on: bool = True
-    ) -> Tuple[LpProblem, Dict[str, List[float]], Dict[str, Dict[str, float]], int, str]:
+            sampler_on: bool = True,
+            backend: Union[str, LpSolver] = 'glpk',
+            backend_options: Optional[Dict[str, float]] = None,
+            max_workers: Optional[int] = None,
+            executor: str = 'thread',
+            necessary_preference: Optional[Dict[str, List[str]]] = None,
+            sampler: str = 'polyrun',
+            sampler_options: Optional[Dict[str, int]] = None,
+            sampler_worker: Optional[SamplerWorker] = None,
+            tolerance: Optional[float] = None,
+            sample_store: Optional[SampleStore] = None
+    ) -> Tuple[LpProblem, Dict[str, List[float]], Dict[str, Dict[str, float]], int, float, List[Dict[str, float]], str]:
         """
         Main method used in getting the most representative value function.
 
@@ -360,29 +125,37 @@ class SolverUtils:
         :param sampler_path:
         :param number_of_samples:
         :param sampler_on:
+        :param backend: 'glpk', 'cbc', 'highs' or an instance of a PuLP solver, see BackendUtils.get_solver
+        :param backend_options: see BackendUtils.get_solver
+        :param max_workers: number of problems of the necessary relation solved at once, see ParallelExecutor
+        :param executor: 'thread' or 'process', see ParallelExecutor
+        :param necessary_preference: necessary relation if it is already known, ex. from AnalysisContext,
+        default None - calculated with get_necessary_relations
+        :param sampler: 'polyrun' or 'numpy', see SamplerUtils.sample
+        :param sampler_options: 'seed', 'thinning', 'number_of_chains' and, for 'numpy', 'burn_in', default None
+        :param sampler_worker: long-lived process running a single 'numpy' chain, see SampleStream, default None
+        :param tolerance: maximum standard error of the percentages, estimated with batch means, number_of_samples
+        is the maximum number of samples, see get_sampler_metrics, default None
+        :param sample_store: store of the accepted samples, see get_sampler_metrics, default None
 
         :return problem:
         """
         problem: LpProblem = LpProblem("UTA-GMS", LpMaximize)
 
-        epsilon: LpVariable = LpVariable("epsilon")
+        # Epsilon is bounded by 1, the greatest difference of utilities, big-Ms of position constraints rely on it
+        epsilon: LpVariable = LpVariable("epsilon", upBound=1)
 
         delta: LpVariable = LpVariable("delta")
 
-        u_list, u_list_dict = SolverUtils.create_variables_list_and_dict(performance_table_list)
+        registry: VariableRegistry = VariableRegistry.from_performance_table(performance_table_list, number_of_points)
 
-        characteristic_points: List[List[float]] = SolverUtils.calculate_characteristic_points(
-            number_of_points, performance_table_list, u_list_dict, u_list
-        )
+        u_list_dict: List[Dict[float, LpVariable]] = registry.get_u_list_dict()
 
-        u_list = [sorted(lp_var_list, key=lambda var: -float(var.name.split("_")[-1]) if len(var.name.split("_")) == 4 else float(var.name.split("_")[-1])) for lp_var_list in u_list]
+        u_list = [registry.get_criterion_variables(i) for i in range(len(u_list_dict))]
 
-        u_list_of_characteristic_points: List[List[LpVariable]] = []
-        for i in range(len(characteristic_points)):
-            pom = []
-            for j in range(len(characteristic_points[i])):
-                pom.append(u_list_dict[i][float(characteristic_points[i][j])])
-            u_list_of_characteristic_points.append(pom[:])
+        u_list_of_characteristic_points: List[List[LpVariable]] = [
+            registry.get_characteristic_variables(i) for i in range(len(u_list_dict))
+        ]
 
         # Normalization constraints
         the_greatest_performance: List[LpVariable] = []
@@ -493,21 +266,38 @@ class SolverUtils:
                 problem += lpSum(left_side_1) - lpSum(left_side_2) >= lpSum(right_side_1) - lpSum(right_side_2)
 
         if sampler_on:
-            position_percentage, pairwise_percentage, number_of_samples_used, sampler_error = SolverUtils.get_sampler_metrics(
-                problem=problem,
+            # Value functions are sampled from the rows of a core with the constraints above, without positions,
+            # which are checked on the samples, over epsilon and the characteristic points only
+            sampler_core: CompiledCore = CompiledCore(
+                performance_table_list=performance_table_list,
+                comparisons=[comparison for comparison in comparisons if comparison[3] in ('>', '>=')],
+                criteria=criteria,
+                worst_best_position=[],
+                number_of_points=number_of_points,
+                comprehensive_intensities=[intensity for intensity in comprehensive_intensities if intensity[-1] in ('>', '>=')],
+                substitute_interpolated=True
+            )
+            position_percentage, pairwise_percentage, number_of_samples_used, sampler_precision, chain_diagnostics, sampler_error = SolverUtils.get_sampler_metrics(
+                model=sampler_core.model,
                 performance_table_list=performance_table_list,
                 alternatives_id_list=alternatives_id_list,
                 sampler_path=sampler_path,
                 number_of_samples=number_of_samples,
-                u_list_of_characteristic_points=u_list_of_characteristic_points,
-                u_list_dict=u_list_dict,
-                characteristic_points=characteristic_points,
+                registry=registry,
                 positions=worst_best_position,
+                sampler=sampler,
+                sampler_options=sampler_options,
+                solver=BackendUtils.get_solver(backend, False, backend_options),
+                sampler_worker=sampler_worker,
+                tolerance=tolerance,
+                sample_store=sample_store
             )
         else:
             position_percentage = None
             pairwise_percentage = None
             number_of_samples_used = None
+            sampler_precision = None
+            chain_diagnostics = None
             sampler_error = None
 
         # Comparison constraint, only indifference
@@ -584,39 +374,23 @@ class SolverUtils:
                 problem += lpSum(left_side_1) - lpSum(left_side_2) == lpSum(right_side_1) - lpSum(right_side_2)
 
         # Use linear interpolation to create constraints
-        for i in range(len(u_list_of_characteristic_points)):
-            for j in u_list_dict[i]:
-                if_characteristic = 0
-
-                for z in range(len(u_list_of_characteristic_points[i])):
-                    if u_list_dict[i][j].name == u_list_of_characteristic_points[i][z].name:
-                        if_characteristic = 1
-                        break
+        for constraint in registry.get_interpolation_constraints():
+            problem += constraint
 
-                if if_characteristic == 0:
-                    point_before = 0
-                    point_after = 1
-
-                    if len(u_list_dict[i][j].name.split("_")) == 4:
-                        val = -float(u_list_dict[i][j].name.split("_")[-1])
-                    else:
-                        val = float(u_list_dict[i][j].name.split("_")[-1])
-                    while characteristic_points[i][point_before] > val or val > characteristic_points[i][point_after]:
-                        point_before += 1
-                        point_after += 1
-                    value = SolverUtils.linear_interpolation(val, characteristic_points[i][point_before], u_list_dict[i][float(characteristic_points[i][point_before])], characteristic_points[i][point_after], u_list_dict[i][float(characteristic_points[i][point_after])])
-
-                    problem += u_list_dict[i][j] == value
-
-        necessary_preference: Dict[str, List[str]] = SolverUtils.get_necessary_relations(
-            performance_table_list=performance_table_list,
-            alternatives_id_list=alternatives_id_list,
-            comparisons=comparisons,
-            criteria=criteria,
-            worst_best_position=worst_best_position,
-            number_of_points=number_of_points,
-            comprehensive_intensities=comprehensive_intensities
-        )
+        if necessary_preference is None:
+            necessary_preference: Dict[str, List[str]] = SolverUtils.get_necessary_relations(
+                performance_table_list=performance_table_list,
+                alternatives_id_list=alternatives_id_list,
+                comparisons=comparisons,
+                criteria=criteria,
+                worst_best_position=worst_best_position,
+                number_of_points=number_of_points,
+                comprehensive_intensities=comprehensive_intensities,
+                backend=backend,
+                backend_options=backend_options,
+                max_workers=max_workers,
+                executor=executor
+            )
 
         # Representative value
         for i in range(len(alternatives_id_list) - 1):
@@ -689,7 +463,8 @@ class SolverUtils:
 
             alternatives_binary_variables[i[0]].append(pom_dict)
 
-        big_M: int = 1e20
+        # Big-M of every constraint switched off by a binary variable, see UtilityBounds
+        utility_bounds: UtilityBounds = UtilityBounds(registry, performance_table_list, criteria)
         dict_with_worst_best_iterations = {}
         for i in range(len(performance_table_list)):
             dict_with_worst_best_iterations[i] = 0
@@ -707,9 +482,13 @@ class SolverUtils:
                         position_constraints: List[LpVariable] = [position_constraints[i] for i in indices_to_keep]
                         compared_constraints: List[LpVariable] = [compared_constraints[i] for i in indices_to_keep]
 
-                    problem += lpSum(position_constraints) - lpSum(compared_constraints) + big_M * alternatives_binary_variables[worst_best[0]][x][i][0] >= 0
+                    # Epsilon is at most 1, its upper bound
+                    big_M_0: float = utility_bounds.get_big_m([(1.0, worst_best[0], worst_best[3]), (-1.0, i, worst_best[3])])
+                    big_M_1: float = utility_bounds.get_big_m([(1.0, i, worst_best[3]), (-1.0, worst_best[0], worst_best[3])], epsilon=1.0)
+
+                    problem += lpSum(position_constraints) - lpSum(compared_constraints) + big_M_0 * alternatives_binary_variables[worst_best[0]][x][i][0] >= 0
 
-                    problem += lpSum(compared_constraints) - lpSum(position_constraints) + big_M * alternatives_binary_variables[worst_best[0]][x][i][1] >= epsilon
+                    problem += lpSum(compared_constraints) - lpSum(position_constraints) + big_M_1 * alternatives_binary_variables[worst_best[0]][x][i][1] >= epsilon
 
                     problem += alternatives_binary_variables[worst_best[0]][x][i][0] + alternatives_binary_variables[worst_best[0]][x][i][1] <= 1
 
@@ -723,14 +502,15 @@ class SolverUtils:
 
             dict_with_worst_best_iterations[worst_best[0]] = dict_with_worst_best_iterations[worst_best[0]] + 1
 
+        # Epsilon is maximized first, delta only breaks ties
         if 'delta' in problem.variablesDict():
-            problem += big_M * epsilon - delta
+            problem += 1e20 * epsilon - delta
         else:
-            problem += big_M * epsilon
+            problem += 1e20 * epsilon
 
-        problem.solve(solver=GLPK(msg=show_logs))
+        problem.solve(solver=BackendUtils.get_solver(backend, show_logs, backend_options))
 
-        return problem, position_percentage, pairwise_percentage, number_of_samples_used, sampler_error
+        return problem, position_percentage, pairwise_percentage, number_of_samples_used, sampler_precision, chain_diagnostics, sampler_error
 
     @staticmethod
     def get_necessary_relations(
@@ -741,7 +521,11 @@ class SolverUtils:
             worst_best_position: List[List[int]],
             number_of_points: List[int],
             comprehensive_intensities: List[List[int]],
-            show_logs: bool = False
+            show_logs: bool = False,
+            backend: Union[str, LpSolver] = 'glpk',
+            backend_options: Optional[Dict[str, float]] = None,
+            max_workers: Optional[int] = None,
+            executor: str = 'thread'
     ) -> Dict[str, List[str]]:
         """
         Method used for getting necessary relations.
@@ -754,33 +538,28 @@ class SolverUtils:
         :param worst_best_position:
         :param number_of_points:
         :param show_logs: default None
+        :param backend: 'glpk', 'cbc', 'highs' (persistent HiGHS model) or an instance of a PuLP solver, see CompiledCore
+        :param backend_options: see BackendUtils.get_solver
+        :param max_workers: number of problems solved at once, default None - one by one, see ParallelExecutor
+        :param executor: 'thread' or 'process', see ParallelExecutor
 
         :return necessary:
         """
-        necessary: Dict[str, List[str]] = {}
-        for i in range(len(performance_table_list)):
-            for j in range(len(performance_table_list)):
-                if i == j:
-                    continue
-
-                problem: LpProblem = SolverUtils.calculate_solved_problem(
-                    performance_table_list=performance_table_list,
-                    comparisons=comparisons,
-                    criteria=criteria,
-                    worst_best_position=worst_best_position,
-                    number_of_points=number_of_points,
-                    comprehensive_intensities=comprehensive_intensities,
-                    alternative_id_1=i,
-                    alternative_id_2=j,
-                    show_logs=show_logs
-                )
-
-                if problem.variables()[0].varValue <= 0:
-                    if alternatives_id_list[i] not in necessary:
-                        necessary[alternatives_id_list[i]] = []
-                    necessary[alternatives_id_list[i]].append(alternatives_id_list[j])
-
-        return necessary
+        with AnalysisContext(
+                performance_table_list=performance_table_list,
+                alternatives_id_list=alternatives_id_list,
+                comparisons=comparisons,
+                criteria=criteria,
+                worst_best_position=worst_best_position,
+                number_of_points=number_of_points,
+                comprehensive_intensities=comprehensive_intensities,
+                show_logs=show_logs,
+                backend=backend,
+                backend_options=backend_options,
+                max_workers=max_workers,
+                executor=executor
+        ) as context:
+            return context.get_necessary_relations()
 
     @staticmethod
     def create_variables_list_and_dict(performance_table: List[list]) -> Tuple[List[list], List[dict]]:
@@ -792,31 +571,10 @@ class SolverUtils:
 
         :return u_list, u_list_dict: ex. Tuple([[u_0_0.0, u_0_2.0], [u_1_2.0, u_1_9.0]], [{26.0: u_0_26.0, 2.0: u_0_2.0}, {40.0: u_1_40.0, 2.0: u_1_2.0}])
         """
-        u_list: List[List[LpVariable]] = []
-        u_list_dict: List[Dict[float, LpVariable]] = []
-
-        for i in range(len(performance_table[0])):
-            row: List[LpVariable] = []
-            row_dict: Dict[float, LpVariable] = {}
-
-            for j in range(len(performance_table)):
-                variable_name: str = f"u_{i}_{float(performance_table[j][i])}"
-                variable: LpVariable = LpVariable(variable_name)
-
-                if performance_table[j][i] not in row_dict:
-                    row_dict[float(performance_table[j][i])] = variable
+        registry: VariableRegistry = VariableRegistry.from_performance_table(performance_table)
 
-                flag: int = 1
-                for var in row:
-                    if str(var) == variable_name:
-                        flag: int = 0
-                if flag:
-                    row.append(variable)
-
-            u_list_dict.append(row_dict)
-
-            row = sorted(row, key=lambda var: -float(var.name.split("_")[-1]) if len(var.name.split("_")) == 4 else float(var.name.split("_")[-1]))
-            u_list.append(row)
+        u_list: List[List[LpVariable]] = [registry.get_criterion_variables(i) for i in range(len(registry.scales))]
+        u_list_dict: List[Dict[float, LpVariable]] = registry.get_u_list_dict()
 
         return u_list, u_list_dict
 
@@ -850,6 +608,7 @@ class SolverUtils:
             variables_and_values_dict,
             performance_table_list,
             alternatives_id_list,
+            registry: Optional[VariableRegistry] = None
     ) -> Dict[str, float]:
         """
         Method for getting alternatives_and_utilities_dict
@@ -857,18 +616,39 @@ class SolverUtils:
         :param variables_and_values_dict:
         :param performance_table_list:
         :param alternatives_id_list:
+        :param registry: default None - registry of the values in performance_table_list
 
         :return sorted_dict:
         """
+        if registry is None:
+            registry: VariableRegistry = VariableRegistry.from_performance_table(performance_table_list)
 
+        return SolverUtils.calculate_alternatives_utilities(
+            column_values=registry.get_column_values(variables_and_values_dict),
+            alternatives_columns=registry.get_alternatives_columns(),
+            alternatives_id_list=alternatives_id_list
+        )
+
+    @staticmethod
+    def calculate_alternatives_utilities(
+            column_values: List[float],
+            alternatives_columns: List[List[int]],
+            alternatives_id_list: List[str]
+    ) -> Dict[str, float]:
+        """
+        Method for getting alternatives_and_utilities_dict from values of the columns of VariableRegistry
+
+        :param column_values: value of every column of the registry
+        :param alternatives_columns: see VariableRegistry.get_alternatives_columns
+        :param alternatives_id_list:
+
+        :return sorted_dict:
+        """
         utilities: List[float] = []
-        for i in range(len(performance_table_list)):
+        for i in range(len(alternatives_columns)):
             utility: float = 0.0
-            for j in range(len(performance_table_list[i])):
-                variable_name: str = f"u_{j}_{performance_table_list[i][j]}"
-                if '-' in variable_name:
-                    variable_name: str = variable_name.replace('-', '_')
-                utility += round(variables_and_values_dict[variable_name], 4)
+            for column in alternatives_columns[i]:
+                utility += round(column_values[column], 4)
 
             utilities.append(round(utility, 4))
 
@@ -880,49 +660,6 @@ class SolverUtils:
 
         return sorted_dict
 
-    @staticmethod
-    def calculate_characteristic_points(
-            number_of_points,
-            performance_table_list,
-            u_list_dict,
-            u_list
-    ) -> List[List[float]]:
-        """
-        Method for calculating characteristic points
-
-        :param number_of_points:
-        :param performance_table_list:
-        :param u_list_dict:
-        :param u_list:
-
-        :return characteristic_points:
-        """
-        columns: List[Tuple[float]] = list(zip(*performance_table_list))
-        worst_values: List[float] = [min(col) for col in columns]
-        best_values: List[float] = [max(col) for col in columns]
-        characteristic_points: List[List[float]] = []
-
-        for i in range(len(worst_values)):
-            pom = []
-            if number_of_points[i] != 0:
-                for j in range(number_of_points[i]):
-                    x = round(worst_values[i] + (j / (number_of_points[i] - 1)) * (best_values[i] - worst_values[i]), 4)
-                    if x not in u_list_dict[i]:
-                        new: str = f"u_{i}_{x}"
-                        variable: LpVariable = LpVariable(new)
-                        new: Dict[float, LpVariable] = {x: variable}
-                        u_list_dict[i].update(new)
-                        u_list[i].append(variable)
-                    pom.append(x)
-                characteristic_points.append(pom[:])
-            else:
-                for j in range(len(performance_table_list)):
-                    if float(performance_table_list[j][i]) not in pom:
-                        pom.append(float(performance_table_list[j][i]))
-                pom.sort()
-                characteristic_points.append(pom[:])
-        return characteristic_points
-
     @staticmethod
     def linear_interpolation(x, x1, y1, x2, y2) -> float:
         """Perform linear interpolation to estimate a value at a specific point on a straight line"""
@@ -932,11 +669,45 @@ class SolverUtils:
     @staticmethod
     def get_criterion_functions(
             variables_and_values_dict,
-            criteria
+            criteria,
+            registry: Optional[VariableRegistry] = None
     ) -> Dict[str, List[Tuple[float, float]]]:
         """
         Method responsible for getting criterion functions
 
+        :param variables_and_values_dict:
+        :param criteria:
+        :param registry: registry of the variables of the problem, see VariableRegistry.from_performance_table,
+        default None - criteria and values are read from the names of the variables u_{criterion}_{value}
+        :return:
+        """
+        if registry is None:
+            return SolverUtils.get_criterion_functions_from_names(variables_and_values_dict, criteria)
+
+        criterion_functions: Dict[str, List[Tuple[float, float]]] = {}
+
+        column_values: List[Optional[float]] = registry.get_column_values(variables_and_values_dict)
+        for i in range(len(registry.values)):
+            points: List[Tuple[float, float]] = []
+            for value in registry.values[i]:
+                column: int = registry.get_column(i, value)
+                if column_values[column] is not None:
+                    points.append((value, column_values[column]))
+
+            if points:
+                criterion_functions[criteria[i].criterion_id] = points
+
+        return criterion_functions
+
+    @staticmethod
+    def get_criterion_functions_from_names(
+            variables_and_values_dict,
+            criteria
+    ) -> Dict[str, List[Tuple[float, float]]]:
+        """
+        Method for getting criterion functions from the names of the variables, negative values are written with
+        a double underscore, ex. u_0__7.0
+
         :param variables_and_values_dict:
         :param criteria:
         :return:
@@ -965,265 +736,289 @@ class SolverUtils:
 
     @staticmethod
     def get_sampler_metrics(
-            problem,
+            model: SparseModel,
             performance_table_list,
             alternatives_id_list,
             sampler_path,
             number_of_samples,
-            u_list_of_characteristic_points,
-            u_list_dict,
-            characteristic_points,
-            positions
-    ) -> Tuple[Dict[str, List[float]], Dict[str, Dict[str, float]], int, str]:
-        refined_number_of_samples: str = SolverUtils.calculate_rejected_ratio(
-            problem=problem,
-            performance_table_list=performance_table_list,
-            alternatives_id_list=alternatives_id_list,
-            sampler_path=sampler_path,
-            number_of_samples=number_of_samples,
-            u_list_of_characteristic_points=u_list_of_characteristic_points,
-            u_list_dict=u_list_dict,
-            characteristic_points=characteristic_points,
-            positions=positions
-        )
+            registry,
+            positions,
+            sampler: str = 'polyrun',
+            sampler_options: Optional[Dict[str, int]] = None,
+            solver: Optional[LpSolver] = None,
+            max_number_of_drawn: Optional[int] = None,
+            sampler_worker: Optional[SamplerWorker] = None,
+            tolerance: Optional[float] = None,
+            batch_size: int = 100,
+            sample_store: Optional[SampleStore] = None
+    ) -> Tuple[Dict[str, List[float]], Dict[str, Dict[str, float]], int, float, List[Dict[str, float]], str]:
+        """
+        Method for sampling value functions until number_of_samples of them satisfy the positions, samples which
+        do not are rejected. Samples are drawn in batches sized by the acceptance rate seen so far, all from one
+        Sampler input, the rows of the model, see SamplerUtils.get_sampler_polytope.
 
-        if refined_number_of_samples == 'Rejection ratio to high':
-            return None, None, None, refined_number_of_samples
+        With tolerance, sampling stops earlier, after the first batch of batch_size accepted samples after which
+        the standard error of every position and pairwise percentage is at most tolerance. Standard errors are
+        estimated with batch means over batches of batch_size accepted samples of one chain, see
+        calculate_sampler_precision, so sampling never stops before MIN_NUMBER_OF_BATCHES batches.
 
-        precision = 5
-        worst_variants = []
-        characteristic_points_in_one_list = {}
-        for i in range(len(u_list_of_characteristic_points)):
-            for j in range(len(u_list_of_characteristic_points[i])):
-                if j == 0:
-                    worst_variants.append(u_list_of_characteristic_points[i][j].name)
-                characteristic_points_in_one_list[u_list_of_characteristic_points[i][j].name] = 1
-
-        # Write input file for Sampler
-        with TemporaryFile("w+") as input_file, TemporaryFile("w+") as output_file, TemporaryFile("w+") as error_file:
-            positions_of_the_worst = []
-            # Write header, useful only for testing
-            variable_names = [var.name for var in problem.variables()]
-
-            for constraint in problem.constraints.values():
-                pom = []
-                constraint_values = []
-                for var in problem.variables():
-                    if var in constraint:
+        With sampler_options['number_of_chains'] = k > 1 samples are drawn by k independent chains at the same time,
+        see SampleStream, and merged into the same percentages.
 
-                        if var.name in characteristic_points_in_one_list or var.name == 'epsilon':
-                            constraint_values.append(str(round(constraint[var], precision)))
+        :param model: ex. the model of a CompiledCore without positions
+        :param performance_table_list:
+        :param alternatives_id_list:
+        :param sampler_path:
+        :param number_of_samples:
+        :param registry:
+        :param positions:
+        :param sampler: 'polyrun' or 'numpy', see SamplerUtils.sample
+        :param sampler_options: 'seed', 'thinning', 'number_of_chains' and, for 'numpy', 'burn_in', default None
+        :param solver: PuLP solver of the starting point of a single 'numpy' chain
+        :param max_number_of_drawn: number of drawn samples after which sampling stops, default None -
+        10 * number_of_samples, so that at most 90% of samples can be rejected
+        :param sampler_worker: long-lived process running a single 'numpy' chain, not used by 'polyrun', default None -
+        the chain is run by this process
+        :param tolerance: maximum standard error of a percentage, in percentage points, estimated with batch means,
+        default None - exactly number_of_samples samples are used
+        :param batch_size: number of accepted samples between checks of the tolerance and of a chain in every batch
+        of the batch means
+        :param sample_store: store of the accepted samples, written as they are counted and closed at the end,
+        see SampleStore, default None - samples are not kept
+
+        :return position_percentage, pairwise_percentage, number_of_samples_used, sampler_precision, chain_diagnostics,
+        sampler_error: sampler_precision - the greatest standard error of a percentage, chain_diagnostics - 'seed',
+        'number_of_drawn', 'number_of_accepted', 'precision' and 'max_difference' (the greatest difference between
+        a percentage of the chain and the merged one, in percentage points) of every chain
+        """
+        number_of_samples: int = int(number_of_samples)
+        if max_number_of_drawn is None:
+            max_number_of_drawn = 10 * number_of_samples
+
+        polytope, sampled_columns = SamplerUtils.get_sampler_polytope(model, registry)
+        with SampleStream(
+                polytope=polytope,
+                sampler=sampler,
+                sampler_path=sampler_path,
+                sampler_options=sampler_options,
+                solver=solver,
+                worker=sampler_worker
+        ) as stream, sample_store if sample_store is not None else nullcontext():
+            utilities_matrix: np.ndarray = SamplerUtils.get_utilities_matrix(sampled_columns, registry)
+            number_of_alternatives: int = len(alternatives_id_list)
+
+            if sample_store is not None:
+                sample_store.create(
+                    capacity=number_of_samples,
+                    utilities_matrix=utilities_matrix,
+                    alternatives_id_list=alternatives_id_list,
+                    variables=[
+                        {'criterion': int(registry.column_criterion[column]), 'point': float(registry.column_value[column])}
+                        if column >= 0 else {'criterion': None, 'point': None}
+                        for column in sampled_columns
+                    ],
+                    number_of_chains=stream.number_of_chains
+                )
 
-                        else:
-                            point_before = 0
-                            point_after = 1
-                            if len(var.name.split("_")) == 4:
-                                val = -float(var.name.split("_")[-1])
-                            else:
-                                val = float(var.name.split("_")[-1])
-
-                            while characteristic_points[int(var.name.split("_")[1])][point_before] > val or val > \
-                                    characteristic_points[int(var.name.split("_")[1])][point_after]:
-                                point_before += 1
-                                point_after += 1
-
-                            value = SolverUtils.linear_interpolation(val, characteristic_points[int(var.name.split("_")[1])][point_before], u_list_dict[int(var.name.split("_")[1])][float(characteristic_points[int(var.name.split("_")[1])][point_before])], characteristic_points[int(var.name.split("_")[1])][point_after], u_list_dict[int(var.name.split("_")[1])][float(characteristic_points[int(var.name.split("_")[1])][point_after])])
-                            for variable in value:
-                                i = 0
-                                for var1 in problem.variables():
-
-                                    if var1.name != variable.name:
-                                        if var1.name in characteristic_points_in_one_list or var1.name == 'epsilon':
-                                            i += 1
-                                            if var.name in worst_variants and i not in positions_of_the_worst:
-                                                positions_of_the_worst.append(iteration)
-                                    else:
-                                        break
-                                if round(constraint[var], 4) >= 0:
-                                    pom.append([i, str(round(value[variable], precision))])
-                                else:
-                                    pom.append([i, str(round(-value[variable], precision))])
+            # Number of samples of every chain, and of its batches, in which an alternative is on a position and
+            # in which it is better than another one
+            batches: RankingBatches = RankingBatches(stream.number_of_chains, number_of_alternatives, batch_size)
+
+            number_of_accepted = 0
+            error: str = ''
+            is_converged: bool = False
+            while number_of_accepted < number_of_samples and stream.number_of_drawn < max_number_of_drawn:
+                number_of_wanted: int = number_of_samples
+                if tolerance is not None:
+                    number_of_wanted = min(number_of_samples, number_of_accepted + batch_size)
+
+                # Expected number of samples needed, assuming at least 10% of them are accepted
+                acceptance_rate: float = 1.0
+                if stream.number_of_drawn > 0:
+                    acceptance_rate = max(number_of_accepted / stream.number_of_drawn, 0.1)
+                number_of_needed: int = int(np.ceil((number_of_wanted - number_of_accepted) / acceptance_rate))
+
+                number_of_drawn: int = stream.number_of_drawn
+
+                # Chunks of Polyrun output are counted while Polyrun is still sampling, it is stopped as soon as
+                # enough samples are accepted
+                with closing(stream.draw_chunks(min(number_of_needed, max_number_of_drawn - stream.number_of_drawn))) as chunks:
+                    for samples, chains in chunks:
+                        utilities: np.ndarray = SamplerUtils.calculate_utilities(samples, utilities_matrix, number_of_alternatives)
+
+                        is_accepted: np.ndarray = np.ones(len(samples), dtype=bool)
+                        if positions:
+                            ranking_positions: np.ndarray = SamplerUtils.calculate_positions(utilities)
+                            for position in positions:
+                                is_accepted &= (ranking_positions[:, position[0]] <= position[1]) & (ranking_positions[:, position[0]] >= position[2])
+
+                        # Samples of the chains are interleaved, so the ones cut off are spread evenly between chains
+                        utilities = utilities[is_accepted][:number_of_wanted - number_of_accepted]
+                        chains = chains[is_accepted][:number_of_wanted - number_of_accepted]
+                        number_of_accepted += len(utilities)
+
+                        batches.add(utilities, chains)
+                        if sample_store is not None:
+                            sample_store.append(samples[is_accepted][:len(utilities)], chains)
+
+                        if number_of_accepted == number_of_wanted:
+                            break
+                error = stream.error
 
-                    else:
-                        if var.name in characteristic_points_in_one_list or var.name == 'epsilon':
-                            constraint_values.append("0")
-
-                iteration = 0
-                for var1 in problem.variables():
-                    if var1.name in characteristic_points_in_one_list or var1.name == 'epsilon':
-                        if var1.name in worst_variants and iteration not in positions_of_the_worst:
-                            positions_of_the_worst.append(iteration)
-                        iteration += 1
-
-                constraint_values.append(re.search(r'([<>=]=?)', str(constraint)).group(1))
-                if str(constraint.constant) == '0.0':
-                    constraint_values.append(str(0))
-                else:
-                    constraint_values.append(str(-constraint.constant))
+                if stream.number_of_drawn == number_of_drawn:
+                    break
 
-                for k in range(len(pom)):
-                    if pom[k][0] in positions_of_the_worst:
-                        continue
-                    else:
-                        if constraint_values[pom[k][0]] != '0':
-                            constraint_values[pom[k][0]] = str(round(float(pom[k][1]) + float(constraint_values[pom[k][0]]), precision))
-                        else:
-                            constraint_values[pom[k][0]] = str(round(float(pom[k][1]), precision))
-
-                input_file.write(" ".join(constraint_values) + "\n")
-
-            epsilon_constraint = ["1"]
-            if 'epsilon' in variable_names:
-                epsilon_constraint.extend(["0"] * (len(constraint_values) - 3))
-                epsilon_constraint.append(">=")
-                epsilon_constraint.append("0.0000001")
-
-                input_file.write(" ".join(epsilon_constraint) + "\n")
-
-            input_file.seek(0)
-            error_file.seek(0)
-            # Write Sampler output file
-            number_of_rejected = 0
-            subprocess.call(
-                ['java', '-jar', sampler_path, '-n', refined_number_of_samples],
-                stdin=input_file,
-                stdout=output_file,
-                stderr=error_file
-            )
-            error_file.seek(0)
-            error: str = error_file.read()
-
-            points_in_constrtaints_file = []
-            for i in range(len(u_list_of_characteristic_points)):
-                for j in range(len(u_list_of_characteristic_points[i])):
-                    points_in_constrtaints_file.append(u_list_of_characteristic_points[i][j].name)
-            points_in_constrtaints_file.sort()
-
-            output: Dict[str, List[float]] = {}
-            for alternative in alternatives_id_list:
-                output[alternative] = [0] * len(alternatives_id_list)
-
-            output2: Dict[str, Dict[str, float]] = {}
-            for alternative in alternatives_id_list:
-                output2[alternative] = {}
-            for alternative1 in alternatives_id_list:
-                for alternative2 in alternatives_id_list:
-                    if alternative1 != alternative2:
-                        output2[alternative1][alternative2] = 0
-
-            output_file.seek(0)
-            for line in output_file:
-                variables_and_values_dict: Dict[str, float] = {}
-
-                if 'epsilon' in variable_names:
-                    var_names = variable_names[1:]
-                    values = line.strip().split('\t')[1:]
-                else:
-                    var_names = variable_names
-                    values = line.strip().split('\t')
-
-                number_of_value = 0
-                for var_name in var_names:
-                    if var_name in points_in_constrtaints_file:
-                        variables_and_values_dict[var_name] = float(values[number_of_value])
-                        number_of_value += 1
-                    else:
-                        variables_and_values_dict[var_name] = float(10000)
-
-                for i in range(len(performance_table_list)):
-                    for j in range(len(performance_table_list[i])):
-                        variable_name: str = f"u_{j}_{performance_table_list[i][j]}"
-                        if '-' in variable_name:
-                            variable_name: str = variable_name.replace('-', '_')
-                        if variable_name not in variables_and_values_dict:
-                            variables_and_values_dict[variable_name] = float(10000)
-
-                for var_name in variables_and_values_dict:
-                    if variables_and_values_dict[var_name] == 10000.0:
-                        point_before = 0
-                        point_after = 1
-
-                        if len(var_name.split("_")) == 4:
-                            val = -float(var_name.split("_")[-1])
-                        else:
-                            val = float(var_name.split("_")[-1])
+                if tolerance is not None and number_of_accepted == number_of_wanted:
+                    precision: float = SolverUtils.calculate_sampler_precision(*batches.get_batches())
+                    if precision <= tolerance:
+                        is_converged = True
+                        break
 
-                        while characteristic_points[int(var_name.split("_")[1])][point_before] > val or val > \
-                                characteristic_points[int(var_name.split("_")[1])][point_after]:
-                            point_before += 1
-                            point_after += 1
+            chain_numbers_of_drawn: List[int] = stream.chain_numbers_of_drawn
+            chain_seeds: List[Optional[int]] = [stream.get_chain_seed(chain) for chain in range(stream.number_of_chains)]
 
-                        value = SolverUtils.linear_interpolation(val, characteristic_points[int(var_name.split("_")[1])][point_before], variables_and_values_dict[str(u_list_dict[int(var_name.split("_")[1])][float(characteristic_points[int(var_name.split("_")[1])][point_before])])], characteristic_points[int(var_name.split("_")[1])][point_after], variables_and_values_dict[str(u_list_dict[int(var_name.split("_")[1])][float(characteristic_points[int(var_name.split("_")[1])][point_after])])])
+        if not is_converged and number_of_accepted < number_of_samples and stream.number_of_drawn >= max_number_of_drawn:
+            return None, None, None, None, None, 'Rejection ratio to high'
 
-                        variables_and_values_dict[var_name] = float(value)
+        chain_position_counts: np.ndarray = batches.chain_position_counts
+        chain_pairwise_counts: np.ndarray = batches.chain_pairwise_counts
+        position_counts: np.ndarray = chain_position_counts.sum(axis=0)
+        pairwise_counts: np.ndarray = chain_pairwise_counts.sum(axis=0)
+        precision: float = SolverUtils.calculate_sampler_precision(*batches.get_batches())
 
-                alternatives_and_utilities_dict: Dict[str, float] = SolverUtils.get_alternatives_and_utilities_dict(
-                    variables_and_values_dict=variables_and_values_dict,
-                    performance_table_list=performance_table_list,
-                    alternatives_id_list=alternatives_id_list,
-                )
+        chain_diagnostics: List[Dict[str, float]] = []
+        for chain in range(stream.number_of_chains):
+            chain_number_of_accepted: int = int(batches.chain_numbers_of_samples[chain])
 
-                to_continue: bool = False
-                for position in positions:
-                    alternative = alternatives_id_list[position[0]]
-                    ranking = list(alternatives_and_utilities_dict.keys())
-                    position_in_ranking = len(performance_table_list) - ranking.index(alternative)
+            max_difference: float = 0.0
+            if chain_number_of_accepted > 0:
+                max_difference = float(100 * np.max(np.abs(np.concatenate([
+                    (chain_position_counts[chain] / chain_number_of_accepted - position_counts / number_of_accepted).ravel(),
+                    (chain_pairwise_counts[chain] / chain_number_of_accepted - pairwise_counts / number_of_accepted).ravel()
+                ]))))
 
-                    if position_in_ranking > position[1] or position_in_ranking < position[2]:
-                        number_of_rejected += 1
-                        to_continue: bool = True
-                        break
+            chain_diagnostics.append({
+                'seed': chain_seeds[chain],
+                'number_of_drawn': chain_numbers_of_drawn[chain],
+                'number_of_accepted': chain_number_of_accepted,
+                'precision': SolverUtils.calculate_sampler_precision(*batches.get_batches(chain)),
+                'max_difference': max_difference
+            })
 
-                if to_continue:
-                    continue
+        output, output2 = SolverUtils.get_sampler_percentages(position_counts, pairwise_counts, alternatives_id_list)
 
-                letter_value_pairs = [(letter, value) for letter, value in alternatives_and_utilities_dict.items()]
+        return output, output2, number_of_accepted, precision, chain_diagnostics, error
 
-                letter_value_pairs.sort(key=lambda x: x[1], reverse=True)
+    @staticmethod
+    def get_sampler_percentages(
+            position_counts: np.ndarray,
+            pairwise_counts: np.ndarray,
+            alternatives_id_list: List[str]
+    ) -> Tuple[Dict[str, List[float]], Dict[str, Dict[str, float]]]:
+        """
+        :param position_counts: alternatives x positions, number of samples with an alternative on a position
+        :param pairwise_counts: alternatives x alternatives, number of samples with an alternative better than another
+        :param alternatives_id_list:
 
-                # Calculate the pairwise percentage
-                for i in range(len(letter_value_pairs)):
-                    for j in range(len(letter_value_pairs)):
-                        if i != j:
-                            letter1, value1 = letter_value_pairs[i]
-                            letter2, value2 = letter_value_pairs[j]
+        :return position_percentage, pairwise_percentage:
+        """
+        output: Dict[str, List[float]] = {}
+        for i, alternative in enumerate(alternatives_id_list):
+            output[alternative] = [int(count) for count in position_counts[i]]
+
+        output2: Dict[str, Dict[str, float]] = {}
+        for i, alternative1 in enumerate(alternatives_id_list):
+            output2[alternative1] = {}
+            for j, alternative2 in enumerate(alternatives_id_list):
+                if i != j:
+                    output2[alternative1][alternative2] = int(pairwise_counts[i, j])
+
+        for alternative1, alternative_dict in output2.items():
+            for alternative2, value in alternative_dict.items():
+                try:
+                    output2[alternative1][alternative2] = output2[alternative1][alternative2] * 100 / sum(output[alternative1])
+                except:
+                    output2[alternative1][alternative2] = -1
 
-                            if value1 > value2:
-                                output2[letter1][letter2] += 1
+        for key, value in output.items():
+            try:
+                output[key] = [round(val / sum(output[key]) * 100, 10) for val in value]
+            except:
+                output[key] = []
 
-                # Calculate the percentage on each position
-                single_ranking = {}
-                place = 1
-                for i in range(len(letter_value_pairs)):
-                    letter, value = letter_value_pairs[i]
+        return output, output2
 
-                    # Check if the current value is the same as the previous value
-                    if i > 0 and value == letter_value_pairs[i - 1][1]:
-                        single_ranking[letter] = single_ranking[letter_value_pairs[i - 1][0]]
-                    else:
-                        single_ranking[letter] = place
+    @staticmethod
+    def get_sample_store_metrics(
+            sample_store: SampleStore,
+            chunk_size: int = 100000,
+            batch_size: int = 100
+    ) -> Tuple[Dict[str, List[float]], Dict[str, Dict[str, float]], int, float]:
+        """
+        Method for calculating the metrics of get_sampler_metrics again from the samples of a store, without
+        sampling, reading chunk_size samples at a time.
 
-                    place += 1
+        :param sample_store: see SampleStore.open
+        :param chunk_size: number of samples read into memory at once
+        :param batch_size: number of samples of a chain in every batch of the batch means, see get_sampler_metrics
 
-                for key, value in single_ranking.items():
-                    output[key][value - 1] = output[key][value - 1] + 1
+        :return position_percentage, pairwise_percentage, number_of_samples_used, sampler_precision:
+        """
+        batches: RankingBatches = sample_store.count_rankings(chunk_size, batch_size)
+        position_counts: np.ndarray = batches.chain_position_counts.sum(axis=0)
+        pairwise_counts: np.ndarray = batches.chain_pairwise_counts.sum(axis=0)
 
-            for alternative1, alternative_dict in output2.items():
-                for alternative2, value in alternative_dict.items():
-                    try:
-                        output2[alternative1][alternative2] = output2[alternative1][alternative2] * 100 / sum(output[alternative1])
-                    except:
-                        output2[alternative1][alternative2] = -1
+        output, output2 = SolverUtils.get_sampler_percentages(position_counts, pairwise_counts, sample_store.alternatives_id_list)
+        precision: float = SolverUtils.calculate_sampler_precision(*batches.get_batches())
 
-            for key, value in output.items():
-                try:
-                    output[key] = [round(val / sum(output[key]) * 100, 10) for val in value]
-                except:
-                    output[key] = []
+        return output, output2, sample_store.number_of_samples, precision
+
+    @staticmethod
+    def calculate_sampler_precision(
+            batch_position_counts: np.ndarray,
+            batch_pairwise_counts: np.ndarray,
+            batch_sizes: np.ndarray
+    ) -> float:
+        """
+        Method for estimating the precision of position and pairwise percentages from batches of consecutive
+        samples of a chain, see RankingBatches. Samples of a Markov chain are correlated, so the variance of
+        a percentage p from n samples in B batches is estimated with batch means,
+        B / (B - 1) * sum over batches of (count_b - n_b p)^2 / n^2, which grows with the autocorrelation.
+        It is not taken below p (1 - p) / n of independent samples, with p = (count + 1) / (n + 2), so that
+        a percentage of 0 or 100 in every batch is not taken as exact. The standard error is 100 * sqrt(variance).
+
+        :param batch_position_counts: batches x alternatives x positions, number of samples of a batch with
+        an alternative on a position
+        :param batch_pairwise_counts: batches x alternatives x alternatives, number of samples of a batch with
+        an alternative better than another
+        :param batch_sizes: number of samples of every batch
+
+        :return precision: the greatest standard error, in percentage points, infinity with fewer than
+        MIN_NUMBER_OF_BATCHES batches
+        """
+        batch_sizes: np.ndarray = np.asarray(batch_sizes, dtype=np.float64)
+        number_of_batches: int = len(batch_sizes)
+        if number_of_batches < SolverUtils.MIN_NUMBER_OF_BATCHES:
+            return float('inf')
+
+        batch_counts: np.ndarray = np.concatenate([
+            np.reshape(batch_position_counts, (number_of_batches, -1)),
+            np.reshape(batch_pairwise_counts, (number_of_batches, -1))
+        ], axis=1)
+        number_of_samples: float = batch_sizes.sum()
+        counts: np.ndarray = batch_counts.sum(axis=0)
+
+        percentages: np.ndarray = counts / number_of_samples
+        batch_variances: np.ndarray = (
+            number_of_batches / (number_of_batches - 1)
+            * np.sum((batch_counts - batch_sizes[:, np.newaxis] * percentages) ** 2, axis=0)
+            / number_of_samples ** 2
+        )
 
-            number_of_samples_used: int = int(refined_number_of_samples) - number_of_rejected
+        smoothed_percentages: np.ndarray = (counts + 1) / (number_of_samples + 2)
+        independent_variances: np.ndarray = smoothed_percentages * (1 - smoothed_percentages) / number_of_samples
 
-            return output, output2, number_of_samples_used, error
+        return float(100 * np.sqrt(np.max(np.maximum(batch_variances, independent_variances))))
 
     @staticmethod
     def resolve_incosistency(
@@ -1235,6 +1030,8 @@ class SolverUtils:
             comprehensive_intensities: List[List[int]],
             subsets_to_remove: List[List[List[List[int]]]],
             show_logs: bool = False,
+            backend: Union[str, LpSolver] = 'glpk',
+            backend_options: Optional[Dict[str, float]] = None,
     ):
         """
         Main calculation method for problem-solving.
@@ -1248,6 +1045,8 @@ class SolverUtils:
         :param number_of_points:
         :param comprehensive_intensities:
         :param show_logs: default None
+        :param backend: 'glpk', 'cbc', 'highs' or an instance of a PuLP solver, see BackendUtils.get_solver
+        :param backend_options: see BackendUtils.get_solver
 
         :return problem:
         """
@@ -1255,22 +1054,15 @@ class SolverUtils:
 
         epsilon: LpVariable = LpVariable("epsilon")
 
-        u_list, u_list_dict = SolverUtils.create_variables_list_and_dict(performance_table_list)
+        registry: VariableRegistry = VariableRegistry.from_performance_table(performance_table_list, number_of_points)
 
-        characteristic_points: List[List[float]] = SolverUtils.calculate_characteristic_points(
-            number_of_points, performance_table_list, u_list_dict, u_list
-        )
+        u_list_dict: List[Dict[float, LpVariable]] = registry.get_u_list_dict()
 
-        u_list = [sorted(lp_var_list,
-                         key=lambda var: -float(var.name.split("_")[-1]) if len(var.name.split("_")) == 4 else float(
-                             var.name.split("_")[-1])) for lp_var_list in u_list]
+        u_list = [registry.get_criterion_variables(i) for i in range(len(u_list_dict))]
 
-        u_list_of_characteristic_points: List[List[LpVariable]] = []
-        for i in range(len(characteristic_points)):
-            pom = []
-            for j in range(len(characteristic_points[i])):
-                pom.append(u_list_dict[i][float(characteristic_points[i][j])])
-            u_list_of_characteristic_points.append(pom[:])
+        u_list_of_characteristic_points: List[List[LpVariable]] = [
+            registry.get_characteristic_variables(i) for i in range(len(u_list_dict))
+        ]
 
         problem += epsilon == 0.0001
 
@@ -1346,7 +1138,8 @@ class SolverUtils:
 
             alternatives_binary_variables[i[0]].append(pom_dict)
 
-        big_M: int = 1e20
+        # Big-M of every constraint switched off by a binary variable, see UtilityBounds
+        utility_bounds: UtilityBounds = UtilityBounds(registry, performance_table_list, criteria)
         dict_with_worst_best_iterations = {}
         for i in range(len(performance_table_list)):
             dict_with_worst_best_iterations[i] = 0
@@ -1370,9 +1163,12 @@ class SolverUtils:
                         binary_variables_inconsistency_dict[variable] = variable_1
                         binary_variables_inconsistency_list_worst_best.append(variable_1)
 
-                    problem += lpSum(position_constraints) - lpSum(compared_constraints) + big_M * alternatives_binary_variables[worst_best[0]][x][i][0] >= 0
+                    big_M_0: float = utility_bounds.get_big_m([(1.0, worst_best[0], worst_best[3]), (-1.0, i, worst_best[3])])
+                    big_M_1: float = utility_bounds.get_big_m([(1.0, i, worst_best[3]), (-1.0, worst_best[0], worst_best[3])], epsilon=0.0001)
+
+                    problem += lpSum(position_constraints) - lpSum(compared_constraints) + big_M_0 * alternatives_binary_variables[worst_best[0]][x][i][0] >= 0
 
-                    problem += lpSum(compared_constraints) - lpSum(position_constraints) + big_M * alternatives_binary_variables[worst_best[0]][x][i][1] >= epsilon
+                    problem += lpSum(compared_constraints) - lpSum(position_constraints) + big_M_1 * alternatives_binary_variables[worst_best[0]][x][i][1] >= epsilon
 
                     problem += alternatives_binary_variables[worst_best[0]][x][i][0] + alternatives_binary_variables[worst_best[0]][x][i][1] <= 1
 
@@ -1381,8 +1177,9 @@ class SolverUtils:
             for j in alternatives_binary_variables[worst_best[0]][x]:
                 pom_higher.append(alternatives_binary_variables[worst_best[0]][x][j][0])
                 pom_lower.append(alternatives_binary_variables[worst_best[0]][x][j][1])
-            problem += lpSum(pom_higher) <= worst_best[1] - 1 + big_M * variable_1
-            problem += lpSum(pom_lower) <= len(performance_table_list) - worst_best[2] + big_M * variable_1
+            # Relaxed position allows every binary variable to be 1
+            problem += lpSum(pom_higher) <= worst_best[1] - 1 + max(0, len(pom_higher) - worst_best[1] + 1) * variable_1
+            problem += lpSum(pom_lower) <= len(performance_table_list) - worst_best[2] + max(0, len(pom_lower) - len(performance_table_list) + worst_best[2]) * variable_1
 
             dict_with_worst_best_iterations[worst_best[0]] = dict_with_worst_best_iterations[worst_best[0]] + 1
 
@@ -1408,6 +1205,9 @@ class SolverUtils:
                     left_side.append(u_list_dict[i][left_alternative[i]])
                     right_side.append(u_list_dict[i][right_alternative[i]])
 
+            # U(left) - U(right)
+            terms: List[Tuple[float, int, List[int]]] = [(1.0, comparison[0], comparison[2]), (-1.0, comparison[1], comparison[2])]
+
             if comparison[3] == '>':
                 variable: str = f"vp_{comparison[0]}_{comparison[1]}_criteria_{'_'.join(map(str, comparison[2]))}"
                 if variable not in binary_variables_inconsistency_dict:
@@ -1415,6 +1215,7 @@ class SolverUtils:
                     binary_variables_inconsistency_dict[variable] = variable_1
                     binary_variables_inconsistency_list_comparisons.append(variable_1)
 
+                big_M: float = utility_bounds.get_big_m(terms, epsilon=0.0001)
                 if comparison[0] == comparison[1]:
                     problem += lpSum(left_side) >= lpSum(right_side) + epsilon - big_M * variable_1
                     problem += variable_1 == 1
@@ -1428,8 +1229,8 @@ class SolverUtils:
                     binary_variables_inconsistency_dict[variable] = variable_1
                     binary_variables_inconsistency_list_comparisons.append(variable_1)
 
-                problem += lpSum(left_side) + big_M * variable_1 >= lpSum(right_side)
-                problem += lpSum(right_side) + big_M * variable_1 >= lpSum(left_side)
+                problem += lpSum(left_side) + utility_bounds.get_big_m(terms) * variable_1 >= lpSum(right_side)
+                problem += lpSum(right_side) + utility_bounds.get_big_m(UtilityBounds.negate(terms)) * variable_1 >= lpSum(left_side)
 
             if comparison[3] == '>=':
                 variable: str = f"vx_{comparison[0]}_{comparison[1]}_criteria_{'_'.join(map(str, comparison[2]))}"
@@ -1438,6 +1239,7 @@ class SolverUtils:
                     binary_variables_inconsistency_dict[variable] = variable_1
                     binary_variables_inconsistency_list_comparisons.append(variable_1)
 
+                big_M: float = utility_bounds.get_big_m(terms)
                 if comparison[0] == comparison[1]:
                     problem += lpSum(left_side) >= lpSum(right_side) - big_M * variable_1
                     problem += variable_1 == 1
@@ -1504,7 +1306,16 @@ class SolverUtils:
                 binary_variables_inconsistency_dict[variable] = variable_1
                 binary_variables_inconsistency_list_comprehensive_intensities.append(variable_1)
 
+            # U(left_1) - U(left_2) - U(right_1) + U(right_2)
+            terms: List[Tuple[float, int, List[int]]] = [
+                (1.0, intensity[0], intensity[1]),
+                (-1.0, intensity[2], intensity[3]),
+                (-1.0, intensity[4], intensity[5]),
+                (1.0, intensity[6], intensity[7])
+            ]
+
             if intensity[-1] == '>':
+                big_M: float = utility_bounds.get_big_m(terms, epsilon=0.0001)
                 if (intensity[0] == intensity[2] and intensity[1] == intensity[3] and intensity[4] == intensity[6] and
                     intensity[5] == intensity[7]) or (
                         intensity[0] == intensity[4] and intensity[1] == intensity[5] and intensity[2] == intensity[
@@ -1516,42 +1327,20 @@ class SolverUtils:
                     problem += lpSum(left_side_1) - lpSum(left_side_2) >= lpSum(right_side_1) - lpSum(
                         right_side_2) + epsilon - big_M * variable_1
             elif intensity[-1] == '>=':
+                big_M: float = utility_bounds.get_big_m(terms)
                 problem += lpSum(left_side_1) - lpSum(left_side_2) + big_M * variable_1 >= lpSum(right_side_1) - lpSum(
                     right_side_2)
             else:
+                big_M: float = utility_bounds.get_big_m(terms)
                 problem += lpSum(left_side_1) - lpSum(left_side_2) + big_M * variable_1 >= lpSum(right_side_1) - lpSum(
                     right_side_2)
+                big_M: float = utility_bounds.get_big_m(UtilityBounds.negate(terms))
                 problem += lpSum(left_side_1) - lpSum(left_side_2) <= lpSum(right_side_1) - lpSum(
                     right_side_2) + big_M * variable_1
 
         # Use linear interpolation to create constraints
-        for i in range(len(u_list_of_characteristic_points)):
-            for j in u_list_dict[i]:
-                if_characteristic = 0
-
-                for z in range(len(u_list_of_characteristic_points[i])):
-                    if u_list_dict[i][j].name == u_list_of_characteristic_points[i][z].name:
-                        if_characteristic = 1
-                        break
-
-                if if_characteristic == 0:
-                    point_before = 0
-                    point_after = 1
-
-                    if len(u_list_dict[i][j].name.split("_")) == 4:
-                        val = -float(u_list_dict[i][j].name.split("_")[-1])
-                    else:
-                        val = float(u_list_dict[i][j].name.split("_")[-1])
-                    while characteristic_points[i][point_before] > val or val > characteristic_points[i][point_after]:
-                        point_before += 1
-                        point_after += 1
-                    value = SolverUtils.linear_interpolation(val, characteristic_points[i][point_before],
-                                                             u_list_dict[i][
-                                                                 float(characteristic_points[i][point_before])],
-                                                             characteristic_points[i][point_after], u_list_dict[i][
-                                                                 float(characteristic_points[i][point_after])])
-
-                    problem += u_list_dict[i][j] == value
+        for constraint in registry.get_interpolation_constraints():
+            problem += constraint
 
         if subsets_to_remove != []:
             for i in range(len(subsets_to_remove)):
@@ -1591,7 +1380,12 @@ class SolverUtils:
             binary_variables_inconsistency_list_comprehensive_intensities)
         problem += v
 
-        problem.solve(solver=GLPK(msg=show_logs))
+        problem.solve(solver=BackendUtils.get_solver(backend, show_logs, backend_options))
+
+        # Without an optimum there is no other subset to remove
+        if LpStatus[problem.status] != 'Optimal':
+            subsets_to_remove.append([[], [], []])
+            return subsets_to_remove
 
         result = []
         resultc = []
@@ -1709,7 +1503,9 @@ class SolverUtils:
                 worst_best_position,
                 number_of_points,
                 comprehensive_intensities,
-                subsets_to_remove
+                subsets_to_remove,
+                backend=backend,
+                backend_options=backend_options
             )
 
     @staticmethod
@@ -1721,49 +1517,26 @@ class SolverUtils:
             number_of_points: List[int],
             comprehensive_intensities: List[List[int]],
             show_logs: bool = False,
+            backend: Union[str, LpSolver] = 'glpk',
+            backend_options: Optional[Dict[str, float]] = None,
+            max_workers: Optional[int] = None,
+            executor: str = 'thread'
     ):
-
-        results = []
-
-        for j in range(len(performance_table_list)):
-            problem_max_position_optimistic = SolverUtils.calculate_solved_problem(performance_table_list, comparisons, criteria, worst_best_position, number_of_points, comprehensive_intensities, alternative_id_extreme=j, type_of_rank=0)
-            problem_max_position_pessimistic = SolverUtils.calculate_solved_problem(performance_table_list, comparisons, criteria, worst_best_position, number_of_points, comprehensive_intensities, alternative_id_extreme=j, type_of_rank=1)
-            problem_min_position_optimistic = SolverUtils.calculate_solved_problem(performance_table_list, comparisons, criteria, worst_best_position, number_of_points, comprehensive_intensities, alternative_id_extreme=j, type_of_rank=2)
-            problem_min_position_pessimistic = SolverUtils.calculate_solved_problem(performance_table_list, comparisons, criteria, worst_best_position, number_of_points, comprehensive_intensities, alternative_id_extreme=j, type_of_rank=3)
-
-            count_from_max_optimistic = 0
-            for i in problem_max_position_optimistic.variables():
-                name = i.name
-                name = name.split("_")
-                if name[0] == 'vrank' and i.varValue == 1:
-                    count_from_max_optimistic = count_from_max_optimistic + 1
-
-            count_from_max_pessimistic = 0
-            for i in problem_max_position_pessimistic.variables():
-                name = i.name
-                name = name.split("_")
-                if name[0] == 'vrank' and i.varValue == 1:
-                    count_from_max_pessimistic = count_from_max_pessimistic + 1
-
-            count_from_min_optimistic = 0
-            for i in problem_min_position_optimistic.variables():
-                name = i.name
-                name = name.split("_")
-                if name[0] == 'vrank' and i.varValue == 1:
-                    count_from_min_optimistic = count_from_min_optimistic + 1
-
-            count_from_min_pessimistic = 0
-            for i in problem_min_position_pessimistic.variables():
-                name = i.name
-                name = name.split("_")
-                if name[0] == 'vrank' and i.varValue == 1:
-                    count_from_min_pessimistic = count_from_min_pessimistic + 1
-
-            pom = [j, len(performance_table_list) - count_from_min_pessimistic, len(performance_table_list) - count_from_min_optimistic, count_from_max_pessimistic + 1, count_from_max_optimistic + 1]
-
-            results.append(pom)
-
-        return results
+        with AnalysisContext(
+                performance_table_list=performance_table_list,
+                alternatives_id_list=[str(i) for i in range(len(performance_table_list))],
+                comparisons=comparisons,
+                criteria=criteria,
+                worst_best_position=worst_best_position,
+                number_of_points=number_of_points,
+                comprehensive_intensities=comprehensive_intensities,
+                show_logs=show_logs,
+                backend=backend,
+                backend_options=backend_options,
+                max_workers=max_workers,
+                executor=executor
+        ) as context:
+            return context.get_extreme_ranking()
 
     @staticmethod
     def calculate_necessary_and_possible_relation_matrix(
@@ -1774,7 +1547,11 @@ class SolverUtils:
             worst_best_position: List[List[int]],
             number_of_points: List[int],
             comprehensive_intensities: List[List[int]],
-            show_logs: bool = False
+            show_logs: bool = False,
+            backend: Union[str, LpSolver] = 'glpk',
+            backend_options: Optional[Dict[str, float]] = None,
+            max_workers: Optional[int] = None,
+            executor: str = 'thread'
     ):
         """
         Method used for getting relation_matrix.
@@ -1787,269 +1564,110 @@ class SolverUtils:
         :param worst_best_position:
         :param number_of_points:
         :param show_logs: default None
+        :param backend: 'glpk', 'cbc', 'highs' (persistent HiGHS model) or an instance of a PuLP solver, see CompiledCore
+        :param backend_options: see BackendUtils.get_solver
+        :param max_workers: number of problems solved at once, default None - one by one, see ParallelExecutor
+        :param executor: 'thread' or 'process', see ParallelExecutor
 
         :return necessary, possible:
         """
+        with AnalysisContext(
+                performance_table_list=performance_table_list,
+                alternatives_id_list=alternatives_id_list,
+                comparisons=comparisons,
+                criteria=criteria,
+                worst_best_position=worst_best_position,
+                number_of_points=number_of_points,
+                comprehensive_intensities=comprehensive_intensities,
+                show_logs=show_logs,
+                backend=backend,
+                backend_options=backend_options,
+                max_workers=max_workers,
+                executor=executor
+        ) as context:
+            return context.get_necessary_and_possible_relations()
+
+    @staticmethod
+    def calculate_necessary_and_possible_relation_intervals(
+            performance_table_list: List[List[float]],
+            alternatives_id_list: List[str],
+            comparisons: List[List[int]],
+            criteria: List[bool],
+            worst_best_position: List[List[int]],
+            number_of_points: List[int],
+            comprehensive_intensities: List[List[int]],
+            epsilon: float = 0.0001,
+            show_logs: bool = False,
+            backend: Union[str, LpSolver] = 'glpk',
+            backend_options: Optional[Dict[str, float]] = None,
+            max_workers: Optional[int] = None,
+            executor: str = 'thread'
+    ) -> Tuple[Dict[str, List[str]], Dict[str, List[str]], Dict[str, Dict[str, Tuple[Optional[float], Optional[float]]]]]:
+        """
+        Method used for getting relation_matrix from the range of U(a) - U(b) of every unordered pair of
+        alternatives, two problems per pair instead of four:
+        a is necessarily at least as good as b if the minimum is >= 0, possibly if the maximum is >= 0.
+        Strict preferences are satisfied with epsilon at least equal to the given one (or the greatest possible
+        epsilon, if it is lower).
+
+        :param comprehensive_intensities:
+        :param performance_table_list:
+        :param alternatives_id_list:
+        :param comparisons:
+        :param criteria:
+        :param worst_best_position:
+        :param number_of_points:
+        :param epsilon: default 0.0001
+        :param show_logs: default None
+        :param backend: 'glpk', 'cbc', 'highs' (persistent HiGHS model) or an instance of a PuLP solver, see CompiledCore
+        :param backend_options: see BackendUtils.get_solver
+        :param max_workers: number of problems solved at once, default None - one by one, see ParallelExecutor
+        :param executor: 'thread' or 'process', see ParallelExecutor
+
+        :return necessary, possible, intervals: intervals[a][b] - minimum and maximum of U(a) - U(b),
+        None, None if the preference information is inconsistent
+        """
+        with AnalysisContext(
+                performance_table_list=performance_table_list,
+                alternatives_id_list=alternatives_id_list,
+                comparisons=comparisons,
+                criteria=criteria,
+                worst_best_position=worst_best_position,
+                number_of_points=number_of_points,
+                comprehensive_intensities=comprehensive_intensities,
+                show_logs=show_logs,
+                backend=backend,
+                backend_options=backend_options,
+                max_workers=max_workers,
+                executor=executor
+        ) as context:
+            minimum, maximum = context.get_utility_difference_ranges(epsilon)
+
+        number_of_alternatives: int = len(performance_table_list)
+
         necessary: Dict[str, List[str]] = {}
         possible: Dict[str, List[str]] = {}
-        for i in range(len(performance_table_list)):
-            for j in range(len(performance_table_list)):
+        intervals: Dict[str, Dict[str, Tuple[Optional[float], Optional[float]]]] = {}
+        for i in range(number_of_alternatives):
+            intervals[alternatives_id_list[i]] = {}
+            for j in range(number_of_alternatives):
                 if i == j:
                     continue
 
-                problem_necessary: LpProblem = SolverUtils.calculate_solved_problem(
-                    performance_table_list=performance_table_list,
-                    comparisons=comparisons,
-                    criteria=criteria,
-                    worst_best_position=worst_best_position,
-                    number_of_points=number_of_points,
-                    comprehensive_intensities=comprehensive_intensities,
-                    alternative_id_1=i,
-                    alternative_id_2=j,
-                    type_of_relation=0,
-                    show_logs=show_logs
-                )
+                if np.isnan(minimum[i, j]):
+                    intervals[alternatives_id_list[i]][alternatives_id_list[j]] = (None, None)
+                    continue
 
-                problem_possible: LpProblem = SolverUtils.calculate_solved_problem(
-                    performance_table_list=performance_table_list,
-                    comparisons=comparisons,
-                    criteria=criteria,
-                    worst_best_position=worst_best_position,
-                    number_of_points=number_of_points,
-                    comprehensive_intensities=comprehensive_intensities,
-                    alternative_id_1=j,
-                    alternative_id_2=i,
-                    type_of_relation=1,
-                    show_logs=show_logs
-                )
+                intervals[alternatives_id_list[i]][alternatives_id_list[j]] = (float(minimum[i, j]), float(maximum[i, j]))
 
-                if problem_necessary.variables()[0].varValue <= 0:
+                if minimum[i, j] >= 0:
                     if alternatives_id_list[i] not in necessary:
                         necessary[alternatives_id_list[i]] = []
                     necessary[alternatives_id_list[i]].append(alternatives_id_list[j])
 
-                if problem_possible.variables()[0].varValue > 0:
+                if maximum[i, j] >= 0:
                     if alternatives_id_list[i] not in possible:
                         possible[alternatives_id_list[i]] = []
                     possible[alternatives_id_list[i]].append(alternatives_id_list[j])
 
-        return necessary, possible
-
-    @staticmethod
-    def calculate_rejected_ratio(
-            problem,
-            performance_table_list,
-            alternatives_id_list,
-            sampler_path,
-            number_of_samples,
-            u_list_of_characteristic_points,
-            u_list_dict,
-            characteristic_points,
-            positions
-    ) -> str:
-        precision: int = 5
-        worst_variants = []
-        characteristic_points_in_one_list = {}
-        for i in range(len(u_list_of_characteristic_points)):
-            for j in range(len(u_list_of_characteristic_points[i])):
-                if j == 0:
-                    worst_variants.append(u_list_of_characteristic_points[i][j].name)
-                characteristic_points_in_one_list[u_list_of_characteristic_points[i][j].name] = 1
-
-        # Write input file for Sampler
-        with TemporaryFile("w+") as input_file2, TemporaryFile("w+") as output_file2:
-            positions_of_the_worst = []
-            # Write header, useful only for testing
-            variable_names = [var.name for var in problem.variables()]
-
-            for constraint in problem.constraints.values():
-                pom = []
-                constraint_values = []
-                for var in problem.variables():
-                    if var in constraint:
-
-                        if var.name in characteristic_points_in_one_list or var.name == 'epsilon':
-                            constraint_values.append(str(round(constraint[var], precision)))
-
-                        else:
-                            point_before = 0
-                            point_after = 1
-                            if len(var.name.split("_")) == 4:
-                                val = -float(var.name.split("_")[-1])
-                            else:
-                                val = float(var.name.split("_")[-1])
-
-                            while characteristic_points[int(var.name.split("_")[1])][point_before] > val or val > characteristic_points[int(var.name.split("_")[1])][point_after]:
-                                point_before += 1
-                                point_after += 1
-
-                            value = SolverUtils.linear_interpolation(val,
-                                                                     characteristic_points[int(var.name.split("_")[1])][
-                                                                         point_before],
-                                                                     u_list_dict[int(var.name.split("_")[1])][float(
-                                                                         characteristic_points[
-                                                                             int(var.name.split("_")[1])][
-                                                                             point_before])],
-                                                                     characteristic_points[int(var.name.split("_")[1])][
-                                                                         point_after],
-                                                                     u_list_dict[int(var.name.split("_")[1])][float(
-                                                                         characteristic_points[
-                                                                             int(var.name.split("_")[1])][
-                                                                             point_after])])
-                            for variable in value:
-                                i = 0
-                                for var1 in problem.variables():
-
-                                    if var1.name != variable.name:
-                                        if var1.name in characteristic_points_in_one_list or var1.name == 'epsilon':
-                                            i += 1
-                                            if var.name in worst_variants and i not in positions_of_the_worst:
-                                                positions_of_the_worst.append(iteration)
-                                    else:
-                                        break
-                                if round(constraint[var], 4) >= 0:
-                                    pom.append([i, str(round(value[variable], precision))])
-                                else:
-                                    pom.append([i, str(round(-value[variable], precision))])
-
-                    else:
-                        if var.name in characteristic_points_in_one_list or var.name == 'epsilon':
-                            constraint_values.append("0")
-
-                iteration = 0
-                for var1 in problem.variables():
-                    if var1.name in characteristic_points_in_one_list or var1.name == 'epsilon':
-                        if var1.name in worst_variants and iteration not in positions_of_the_worst:
-                            positions_of_the_worst.append(iteration)
-                        iteration += 1
-
-                constraint_values.append(re.search(r'([<>=]=?)', str(constraint)).group(1))
-                if str(constraint.constant) == '0.0':
-                    constraint_values.append(str(0))
-                else:
-                    constraint_values.append(str(-constraint.constant))
-
-                for k in range(len(pom)):
-                    if pom[k][0] in positions_of_the_worst:
-                        continue
-                    else:
-                        if constraint_values[pom[k][0]] != '0':
-                            constraint_values[pom[k][0]] = str(
-                                round(float(pom[k][1]) + float(constraint_values[pom[k][0]]), precision))
-                        else:
-                            constraint_values[pom[k][0]] = str(round(float(pom[k][1]), precision))
-
-                input_file2.write(" ".join(constraint_values) + "\n")
-
-            epsilon_constraint = ["1"]
-            if 'epsilon' in variable_names:
-                epsilon_constraint.extend(["0"] * (len(constraint_values) - 3))
-                epsilon_constraint.append(">=")
-                epsilon_constraint.append("0.0000001")
-
-                input_file2.write(" ".join(epsilon_constraint) + "\n")
-
-            input_file2.seek(0)
-            # Write Sampler output file
-            number_of_rejected = 0
-
-            subprocess.call(
-                ['java', '-jar', sampler_path, '-n', '1000'],
-                stdin=input_file2,
-                stdout=output_file2
-            )
-
-            points_in_constrtaints_file = []
-            for i in range(len(u_list_of_characteristic_points)):
-                for j in range(len(u_list_of_characteristic_points[i])):
-                    points_in_constrtaints_file.append(u_list_of_characteristic_points[i][j].name)
-            points_in_constrtaints_file.sort()
-
-            output: Dict[str, List[float]] = {}
-            for alternative in alternatives_id_list:
-                output[alternative] = [0] * len(alternatives_id_list)
-
-            output2: Dict[str, Dict[str, float]] = {}
-            for alternative in alternatives_id_list:
-                output2[alternative] = {}
-            for alternative1 in alternatives_id_list:
-                for alternative2 in alternatives_id_list:
-                    if alternative1 != alternative2:
-                        output2[alternative1][alternative2] = 0
-
-            output_file2.seek(0)
-            for line in output_file2:
-                variables_and_values_dict: Dict[str, float] = {}
-
-                if 'epsilon' in variable_names:
-                    var_names = variable_names[1:]
-                    values = line.strip().split('\t')[1:]
-                else:
-                    var_names = variable_names
-                    values = line.strip().split('\t')
-
-                number_of_value = 0
-                for var_name in var_names:
-                    if var_name in points_in_constrtaints_file:
-                        variables_and_values_dict[var_name] = float(values[number_of_value])
-                        number_of_value += 1
-                    else:
-                        variables_and_values_dict[var_name] = float(10000)
-
-                for i in range(len(performance_table_list)):
-                    for j in range(len(performance_table_list[i])):
-                        variable_name: str = f"u_{j}_{performance_table_list[i][j]}"
-                        if '-' in variable_name:
-                            variable_name: str = variable_name.replace('-', '_')
-                        if variable_name not in variables_and_values_dict:
-                            variables_and_values_dict[variable_name] = float(10000)
-
-                for var_name in variables_and_values_dict:
-                    if variables_and_values_dict[var_name] == 10000.0:
-                        point_before = 0
-                        point_after = 1
-
-                        if len(var_name.split("_")) == 4:
-                            val = -float(var_name.split("_")[-1])
-                        else:
-                            val = float(var_name.split("_")[-1])
-
-                        while characteristic_points[int(var_name.split("_")[1])][point_before] > val or val > \
-                                characteristic_points[int(var_name.split("_")[1])][point_after]:
-                            point_before += 1
-                            point_after += 1
-
-                        value = SolverUtils.linear_interpolation(val,
-                                                                 characteristic_points[int(var_name.split("_")[1])][
-                                                                     point_before], variables_and_values_dict[str(
-                                u_list_dict[int(var_name.split("_")[1])][
-                                    float(characteristic_points[int(var_name.split("_")[1])][point_before])])],
-                                                                 characteristic_points[int(var_name.split("_")[1])][
-                                                                     point_after], variables_and_values_dict[str(
-                                u_list_dict[int(var_name.split("_")[1])][
-                                    float(characteristic_points[int(var_name.split("_")[1])][point_after])])])
-
-                        variables_and_values_dict[var_name] = float(value)
-
-                alternatives_and_utilities_dict: Dict[str, float] = SolverUtils.get_alternatives_and_utilities_dict(
-                    variables_and_values_dict=variables_and_values_dict,
-                    performance_table_list=performance_table_list,
-                    alternatives_id_list=alternatives_id_list,
-                )
-
-                for position in positions:
-                    alternative = alternatives_id_list[position[0]]
-                    ranking = list(alternatives_and_utilities_dict.keys())
-                    position_in_ranking = len(performance_table_list) - ranking.index(alternative)
-
-                    if position_in_ranking > position[1] or position_in_ranking < position[2]:
-                        number_of_rejected += 1
-
-            ratio = 1 - (number_of_rejected/1000)
-
-            if ratio <= 0.1:
-                return 'Rejection ratio to high'
-
-            refined_number_of_samples = str(round(int(number_of_samples) / ratio))
-
-            return refined_number_of_samples
+        return necessary, possible, intervals
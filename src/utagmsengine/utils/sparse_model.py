@@ -0,0 +1,218 @@
+from typing import List, Dict, Tuple, Optional, Union
+
+import numpy as np
+from pulp import LpVariable, LpConstraint, LpAffineExpression, LpConstraintEQ, LpConstraintGE, LpConstraintLE
+
+
+class SparseModel:
+    """
+    Linear model stored as a sparse matrix over integer column indices.
+
+    Constraints are added in families, each family being COO arrays (row within the family, column, coefficient)
+    with lower and upper bounds of its rows, without building PuLP expressions. The same representation is
+    passed to HiGHS directly, converted to PuLP constraints for the solvers called through PuLP and used by
+    anything else that needs the constraint matrix.
+    """
+
+    def __init__(self):
+        self.column_names: List[str] = []
+        self.column_index: Dict[str, int] = {}
+        self.column_lower: List[float] = []
+        self.column_upper: List[float] = []
+        self.column_integer: List[bool] = []
+
+        self.number_of_rows: int = 0
+        self.row_chunks: List[np.ndarray] = []
+        self.column_chunks: List[np.ndarray] = []
+        self.value_chunks: List[np.ndarray] = []
+        self.lower_chunks: List[np.ndarray] = []
+        self.upper_chunks: List[np.ndarray] = []
+
+        self.csr: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+
+    @property
+    def number_of_columns(self) -> int:
+        return len(self.column_names)
+
+    def add_column(self, name: str, lower: Optional[float] = None, upper: Optional[float] = None, integer: bool = False) -> int:
+        """
+        Add a column, unless a column with the same name already exists.
+
+        :param name:
+        :param lower: default None - no lower bound
+        :param upper: default None - no upper bound
+        :param integer: default False
+
+        :return column:
+        """
+        if name in self.column_index:
+            return self.column_index[name]
+
+        column: int = len(self.column_names)
+        self.column_names.append(name)
+        self.column_index[name] = column
+        self.column_lower.append(-np.inf if lower is None else lower)
+        self.column_upper.append(np.inf if upper is None else upper)
+        self.column_integer.append(integer)
+
+        return column
+
+    def add_lp_variable(self, variable: LpVariable) -> int:
+        """
+        :param variable:
+
+        :return column:
+        """
+        return self.add_column(variable.name, variable.lowBound, variable.upBound, variable.cat != 'Continuous')
+
+    def add_rows(
+            self,
+            rows: Union[np.ndarray, List[int]],
+            columns: Union[np.ndarray, List[int]],
+            values: Union[np.ndarray, List[float]],
+            lower: Union[np.ndarray, List[float], float],
+            upper: Union[np.ndarray, List[float], float],
+            number_of_rows: int = -1
+    ) -> int:
+        """
+        Add a family of rows given as COO arrays. Duplicated entries are summed.
+
+        :param rows: row of each entry, counted from 0 within the family
+        :param columns: column of each entry
+        :param values: coefficient of each entry
+        :param lower: lower bounds of the rows, -np.inf for none
+        :param upper: upper bounds of the rows, np.inf for none
+        :param number_of_rows: default -1 - max(rows) + 1, needed only for families ending with empty rows
+
+        :return first_row: index of the first row of the family in the model
+        """
+        rows: np.ndarray = np.asarray(rows, dtype=np.int64)
+        if number_of_rows < 0:
+            number_of_rows: int = int(rows.max()) + 1 if len(rows) else 0
+
+        first_row: int = self.number_of_rows
+        self.row_chunks.append(rows + first_row)
+        self.column_chunks.append(np.asarray(columns, dtype=np.int64))
+        self.value_chunks.append(np.asarray(values, dtype=np.float64))
+        self.lower_chunks.append(np.broadcast_to(np.asarray(lower, dtype=np.float64), (number_of_rows,)))
+        self.upper_chunks.append(np.broadcast_to(np.asarray(upper, dtype=np.float64), (number_of_rows,)))
+        self.number_of_rows += number_of_rows
+        self.csr = None
+
+        return first_row
+
+    def add_row(self, coefficients: Dict[int, float], lower: float, upper: float) -> int:
+        """
+        :param coefficients: column -> coefficient
+        :param lower: -np.inf for none
+        :param upper: np.inf for none
+
+        :return row:
+        """
+        return self.add_rows(
+            np.zeros(len(coefficients), dtype=np.int64),
+            list(coefficients.keys()),
+            list(coefficients.values()),
+            lower,
+            upper,
+            number_of_rows=1
+        )
+
+    def add_lp_constraint(self, constraint: LpConstraint) -> int:
+        """
+        Add a PuLP constraint, its variables are added as columns if needed.
+
+        :param constraint:
+
+        :return row:
+        """
+        coefficients: Dict[int, float] = {}
+        for variable, coefficient in constraint.items():
+            coefficients[self.add_lp_variable(variable)] = coefficient
+
+        bound: float = -constraint.constant
+        if constraint.sense == LpConstraintEQ:
+            return self.add_row(coefficients, bound, bound)
+        elif constraint.sense == LpConstraintLE:
+            return self.add_row(coefficients, -np.inf, bound)
+        else:
+            return self.add_row(coefficients, bound, np.inf)
+
+    def get_row_bounds(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        :return lower, upper:
+        """
+        if not self.lower_chunks:
+            return np.zeros(0), np.zeros(0)
+
+        return np.concatenate(self.lower_chunks), np.concatenate(self.upper_chunks)
+
+    def to_csr(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Constraint matrix in CSR format, with duplicated entries summed and columns sorted within rows.
+        Entries summed to zero are kept, so the rows have the same structure as the PuLP expressions they replace.
+
+        :return indptr, indices, data:
+        """
+        if self.csr is not None:
+            return self.csr
+
+        if not self.row_chunks:
+            self.csr = (np.zeros(self.number_of_rows + 1, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0))
+            return self.csr
+
+        rows: np.ndarray = np.concatenate(self.row_chunks)
+        columns: np.ndarray = np.concatenate(self.column_chunks)
+        values: np.ndarray = np.concatenate(self.value_chunks)
+
+        order: np.ndarray = np.lexsort((columns, rows))
+        rows, columns, values = rows[order], columns[order], values[order]
+
+        if len(rows):
+            is_new: np.ndarray = np.ones(len(rows), dtype=bool)
+            is_new[1:] = (rows[1:] != rows[:-1]) | (columns[1:] != columns[:-1])
+            starts: np.ndarray = np.flatnonzero(is_new)
+            values = np.add.reduceat(values, starts)
+            rows, columns = rows[starts], columns[starts]
+
+        indptr: np.ndarray = np.zeros(self.number_of_rows + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=self.number_of_rows), out=indptr[1:])
+
+        self.csr = (indptr, columns, values)
+
+        return self.csr
+
+    def to_lp_constraints(self, variables: List[LpVariable], first_row: int = 0, last_row: int = -1) -> List[LpConstraint]:
+        """
+        Convert rows to PuLP constraints.
+
+        :param variables: PuLP variable of each column
+        :param first_row: default 0
+        :param last_row: exclusive, default -1 - number of rows
+
+        :return constraints:
+        """
+        if last_row < 0:
+            last_row: int = self.number_of_rows
+
+        indptr, indices, data = self.to_csr()
+        lower, upper = self.get_row_bounds()
+
+        constraints: List[LpConstraint] = []
+        for row in range(first_row, last_row):
+            start, end = indptr[row], indptr[row + 1]
+            expression: LpAffineExpression = LpAffineExpression(
+                [(variables[column], value) for column, value in zip(indices[start:end].tolist(), data[start:end].tolist())]
+            )
+
+            if lower[row] == upper[row]:
+                sense, rhs = LpConstraintEQ, float(lower[row])
+            elif np.isinf(upper[row]):
+                sense, rhs = LpConstraintGE, float(lower[row])
+            else:
+                sense, rhs = LpConstraintLE, float(upper[row])
+
+            # Zero right-hand side is left out, so the constant stays 0 as in constraints built by PuLP
+            constraints.append(LpConstraint(expression, sense, rhs=rhs if rhs != 0 else None))
+
+        return constraints
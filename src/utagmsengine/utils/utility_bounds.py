@@ -0,0 +1,93 @@
+from typing import List, Tuple
+
+import numpy as np
+
+from .variable_registry import VariableRegistry
+
+
+class UtilityBounds:
+    """
+    Maximum of linear combinations of utilities of alternatives over all normalized monotonic value functions, used
+    as tight big-M constants of the constraints switched off by binary variables.
+
+    Such value functions form a polytope whose vertices put the whole weight on one criterion and change from 0 to 1
+    at one characteristic point of it, with values between characteristic points interpolated. A linear combination
+    of utilities is maximal at a vertex, so its maximum is the greatest of its values for these step functions.
+    """
+
+    def __init__(self, registry: VariableRegistry, performance_table_list: List[List[float]], criteria: List[bool]):
+        """
+        :param registry:
+        :param performance_table_list:
+        :param criteria: see DataclassesUtils.refine_gains
+        """
+        step_utilities: List[np.ndarray] = []
+        step_criteria: List[int] = []
+        for i in range(len(registry.values)):
+            characteristic_points: np.ndarray = np.array(registry.characteristic_points[i])
+            columns: np.ndarray = np.array([registry.get_column(i, alternative[i]) for alternative in performance_table_list], dtype=np.int64)
+
+            lower_points: np.ndarray = np.searchsorted(characteristic_points, registry.column_values[registry.lower_columns[columns]])
+            upper_points: np.ndarray = np.searchsorted(characteristic_points, registry.column_values[registry.upper_columns[columns]])
+
+            if criteria[i]:
+                steps: range = range(1, len(characteristic_points))
+            else:
+                steps: range = range(len(characteristic_points) - 1)
+
+            for step in steps:
+                if criteria[i]:
+                    lower_utilities: np.ndarray = lower_points >= step
+                    upper_utilities: np.ndarray = upper_points >= step
+                else:
+                    lower_utilities: np.ndarray = lower_points <= step
+                    upper_utilities: np.ndarray = upper_points <= step
+
+                step_utilities.append(
+                    registry.lower_weights[columns] * lower_utilities + registry.upper_weights[columns] * upper_utilities
+                )
+                step_criteria.append(i)
+
+        # Utility of every alternative for every step function, step functions are rows
+        self.step_utilities: np.ndarray = np.array(step_utilities).reshape(len(step_criteria), len(performance_table_list))
+        self.step_criteria: np.ndarray = np.array(step_criteria, dtype=np.int64)
+
+    def get_maximum(self, terms: List[Tuple[float, int, List[int]]]) -> float:
+        """
+        :param terms: coefficient, alternative and criteria of every utility in the combination, empty list of
+        criteria - all criteria, ex. [(1.0, 3, []), (-1.0, 5, [])] for U(3) - U(5)
+
+        :return maximum: 0 if there is no step function, when there is no normalized value function at all
+        """
+        combination: np.ndarray = np.zeros(len(self.step_criteria))
+        for coefficient, alternative_id, criteria_indices in terms:
+            if criteria_indices:
+                combination += coefficient * self.step_utilities[:, alternative_id] * np.isin(self.step_criteria, criteria_indices)
+            else:
+                combination += coefficient * self.step_utilities[:, alternative_id]
+
+        if len(combination) == 0:
+            return 0.0
+
+        return float(np.max(combination))
+
+    def get_big_m(self, terms: List[Tuple[float, int, List[int]]], epsilon: float = 0.0) -> float:
+        """
+        Smallest big-M switching off the constraint sum of terms + big_M * binary >= epsilon for every normalized
+        monotonic value function.
+
+        :param terms: see get_maximum
+        :param epsilon: greatest value of the right side, ex. the upper bound of the epsilon variable
+
+        :return big_M: 0 if the constraint holds for every value function
+        """
+        return max(0.0, self.get_maximum(UtilityBounds.negate(terms)) + epsilon)
+
+    @staticmethod
+    def negate(terms: List[Tuple[float, int, List[int]]]) -> List[Tuple[float, int, List[int]]]:
+        """
+        :param terms: see get_maximum
+
+        :return terms: of the opposite combination
+        """
+        return [(-coefficient, alternative_id, criteria_indices) for coefficient, alternative_id, criteria_indices in terms]
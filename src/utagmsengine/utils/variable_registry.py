@@ -0,0 +1,217 @@
+from typing import List, Dict, Tuple, Optional, Union
+
+import numpy as np
+from pulp import LpVariable, LpAffineExpression, LpConstraint
+
+from .criterion_scale import CriterionScale
+
+
+class VariableRegistry:
+    """
+    Registry of the value function variables u_{criterion}_{value}.
+
+    Every (criterion index, value index) pair, with values of a criterion sorted in ascending order as in its
+    CriterionScale, is mapped to a dense integer column, criterion after criterion. Criterion and value of a variable
+    are read from the registry instead of being parsed back from the variable name, which PuLP changes for negative
+    values ('u_0_-7.0' is named 'u_0__7.0').
+    """
+
+    def __init__(self, scales: List[CriterionScale]):
+        """
+        :param scales: scale of every criterion
+        """
+        self.scales: List[CriterionScale] = scales
+
+        self.values: List[List[float]] = []
+        self.value_index: List[Dict[float, int]] = []
+        self.first_column: List[int] = []
+        self.characteristic_points: List[List[float]] = []
+
+        self.variables: List[LpVariable] = []
+        self.column_criterion: List[int] = []
+        self.column_value: List[float] = []
+        self.column_index: Dict[str, int] = {}
+
+        for i in range(len(scales)):
+            values: List[float] = scales[i].values.tolist()
+
+            self.values.append(values)
+            self.value_index.append({value: k for k, value in enumerate(values)})
+            self.first_column.append(len(self.variables))
+            self.characteristic_points.append(scales[i].characteristic_points.tolist())
+
+            for value in values:
+                variable: LpVariable = LpVariable(f"u_{i}_{value}")
+                self.column_index[variable.name] = len(self.variables)
+                self.variables.append(variable)
+                self.column_criterion.append(i)
+                self.column_value.append(value)
+
+        self.characteristic: List[bool] = np.concatenate(
+            [scale.is_characteristic for scale in scales] + [np.zeros(0, dtype=bool)]
+        ).tolist()
+
+        # Segment of every column as the columns of its characteristic points with the interpolation weights,
+        # characteristic points are their own segment with weights 1 and 0
+        self.column_values: np.ndarray = np.array(self.column_value, dtype=np.float64)
+        self.lower_columns: np.ndarray = np.concatenate(
+            [self.first_column[i] + scales[i].characteristic_indices[scales[i].lower_points] for i in range(len(scales))]
+            + [np.zeros(0, dtype=np.int64)]
+        )
+        self.upper_columns: np.ndarray = np.concatenate(
+            [self.first_column[i] + scales[i].characteristic_indices[scales[i].upper_points] for i in range(len(scales))]
+            + [np.zeros(0, dtype=np.int64)]
+        )
+        self.lower_weights: np.ndarray = np.concatenate([scale.lower_weights for scale in scales] + [np.zeros(0)])
+        self.upper_weights: np.ndarray = np.concatenate([scale.upper_weights for scale in scales] + [np.zeros(0)])
+
+        # Columns which are not characteristic points, in the order of CriterionScale.order
+        self.interpolated_columns: np.ndarray = np.concatenate(
+            [self.first_column[i] + scales[i].order[~scales[i].is_characteristic[scales[i].order]] for i in range(len(scales))]
+            + [np.zeros(0, dtype=np.int64)]
+        )
+
+    @staticmethod
+    def from_performance_table(performance_table_list: List[List[float]], number_of_points: Optional[List[int]] = None) -> 'VariableRegistry':
+        """
+        :param performance_table_list:
+        :param number_of_points: number of characteristic points of every criterion, default None - every
+        performance is a characteristic point
+
+        :return registry:
+        """
+        number_of_criteria: int = len(performance_table_list[0]) if performance_table_list else 0
+        if number_of_points is None:
+            number_of_points: List[int] = [0] * number_of_criteria
+
+        return VariableRegistry([
+            CriterionScale([alternative[i] for alternative in performance_table_list], number_of_points[i])
+            for i in range(number_of_criteria)
+        ])
+
+    @property
+    def number_of_columns(self) -> int:
+        return len(self.variables)
+
+    def get_column(self, criterion: int, value: float) -> int:
+        """
+        :param criterion:
+        :param value:
+
+        :return column:
+        """
+        return self.first_column[criterion] + self.value_index[criterion][float(value)]
+
+    def get_variable(self, criterion: int, value: float) -> LpVariable:
+        """
+        :param criterion:
+        :param value:
+
+        :return variable:
+        """
+        return self.variables[self.get_column(criterion, value)]
+
+    def get_criterion_variables(self, criterion: int) -> List[LpVariable]:
+        """
+        :param criterion:
+
+        :return variables: variables of the criterion sorted by value
+        """
+        first_column: int = self.first_column[criterion]
+
+        return self.variables[first_column:first_column + len(self.values[criterion])]
+
+    def get_characteristic_variables(self, criterion: int) -> List[LpVariable]:
+        """
+        :param criterion:
+
+        :return variables: variables of the characteristic points of the criterion
+        """
+        return [self.get_variable(criterion, point) for point in self.characteristic_points[criterion]]
+
+    def get_u_list_dict(self) -> List[Dict[float, LpVariable]]:
+        """
+        :return u_list_dict: variables of every criterion by value, in the order of CriterionScale.order,
+        ex. [{26.0: u_0_26.0, 2.0: u_0_2.0}, {40.0: u_1_40.0, 2.0: u_1_2.0}]
+        """
+        return [
+            {self.values[i][k]: self.variables[self.first_column[i] + k] for k in self.scales[i].order.tolist()}
+            for i in range(len(self.scales))
+        ]
+
+    def get_alternatives_columns(self) -> List[List[int]]:
+        """
+        :return alternatives_columns: column of the value of every alternative on every criterion
+        """
+        if not self.scales:
+            return []
+
+        return np.column_stack(
+            [self.first_column[i] + self.scales[i].inverse for i in range(len(self.scales))]
+        ).tolist()
+
+    def get_surrounding_points(self, column: int) -> Tuple[float, float]:
+        """
+        Characteristic points of the criterion of the column, between which its value lies.
+
+        :param column:
+
+        :return point_before, point_after:
+        """
+        criterion: int = self.column_criterion[column]
+        scale: CriterionScale = self.scales[criterion]
+        k: int = column - self.first_column[criterion]
+
+        return self.characteristic_points[criterion][scale.lower_points[k]], self.characteristic_points[criterion][scale.upper_points[k]]
+
+    def get_interpolation_constraints(self) -> List[LpConstraint]:
+        """
+        Constraints u = w_before * u(point_before) + w_after * u(point_after) of the interpolated columns, with the
+        same coefficients as the ones built from SolverUtils.linear_interpolation on PuLP variables.
+
+        :return constraints:
+        """
+        lower_columns: List[int] = self.lower_columns[self.interpolated_columns].tolist()
+        upper_columns: List[int] = self.upper_columns[self.interpolated_columns].tolist()
+        lower_weights: List[float] = self.lower_weights[self.interpolated_columns].tolist()
+        upper_weights: List[float] = self.upper_weights[self.interpolated_columns].tolist()
+
+        return [
+            self.variables[column] == LpAffineExpression([
+                (self.variables[lower_column], lower_weight), (self.variables[upper_column], upper_weight)
+            ])
+            for column, lower_column, upper_column, lower_weight, upper_weight
+            in zip(self.interpolated_columns.tolist(), lower_columns, upper_columns, lower_weights, upper_weights)
+        ]
+
+    def interpolate(self, column_values: Union[np.ndarray, List[Optional[float]]]) -> np.ndarray:
+        """
+        Fill the values of the interpolated columns from the values of the characteristic points, with the same
+        floating point operations as SolverUtils.linear_interpolation.
+
+        :param column_values: value of every column, values of the interpolated columns are ignored
+
+        :return column_values:
+        """
+        column_values: np.ndarray = np.array(
+            [np.nan if value is None else value for value in column_values] if isinstance(column_values, list) else column_values,
+            dtype=np.float64
+        )
+
+        columns: np.ndarray = self.interpolated_columns
+        x: np.ndarray = self.column_values[columns]
+        x1: np.ndarray = self.column_values[self.lower_columns[columns]]
+        x2: np.ndarray = self.column_values[self.upper_columns[columns]]
+        y1: np.ndarray = column_values[self.lower_columns[columns]]
+        y2: np.ndarray = column_values[self.upper_columns[columns]]
+        column_values[columns] = y1 + ((x - x1) * (y2 - y1)) / (x2 - x1)
+
+        return column_values
+
+    def get_column_values(self, variables_and_values_dict: Dict[str, float]) -> List[Optional[float]]:
+        """
+        :param variables_and_values_dict: variable name -> value, ex. values of the variables of a solved problem
+
+        :return column_values: value of every column, None for the variables missing in variables_and_values_dict
+        """
+        return [variables_and_values_dict.get(variable.name) for variable in self.variables]
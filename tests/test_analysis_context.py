@@ -0,0 +1,113 @@
+import numpy as np
+import pytest
+
+from src.utagmsengine.utils.analysis_context import AnalysisContext
+from src.utagmsengine.utils.solver_utils import SolverUtils
+
+
+@pytest.fixture()
+def performance_table_list_dummy():
+    return [[26.0, 40.0, 44.0],
+            [2.0, 2.0, 68.0],
+            [18.0, 17.0, 14.0],
+            [35.0, 62.0, 25.0],
+            [7.0, 55.0, 12.0],
+            [25.0, 30.0, 12.0],
+            [9.0, 62.0, 88.0],
+            [0.0, 24.0, 73.0],
+            [6.0, 15.0, 100.0],
+            [16.0, 9.0, 0.0],
+            [26.0, 17.0, 17.0],
+            [62.0, 43.0, 0.0]]
+
+
+@pytest.fixture()
+def alternatives_id_list_dummy():
+    return ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L']
+
+
+@pytest.fixture()
+def analysis_arguments_dummy(performance_table_list_dummy, alternatives_id_list_dummy):
+    return {
+        'performance_table_list': performance_table_list_dummy,
+        'alternatives_id_list': alternatives_id_list_dummy,
+        'comparisons': [[6, 5, [], '>'], [5, 4, [], '>'], [3, 6, [], '=']],
+        'criteria': [1, 1, 1],
+        'worst_best_position': [],
+        'number_of_points': [0, 0, 0],
+        'comprehensive_intensities': [],
+        'backend': 'highs'
+    }
+
+
+def test_calculate_dominance_matrix():
+    performance_table_list = [[1.0, 5.0], [2.0, 5.0], [2.0, 3.0], [1.0, 5.0]]
+
+    dominance = AnalysisContext.calculate_dominance_matrix(performance_table_list, [True, False])
+
+    assert dominance.tolist() == [
+        [True, False, False, True],
+        [True, True, False, True],
+        [True, True, True, True],
+        [True, False, False, True]
+    ]
+
+
+def test_artifacts_are_computed_once(analysis_arguments_dummy):
+    pytest.importorskip('highspy')
+
+    with AnalysisContext(**analysis_arguments_dummy) as context:
+        necessary_sweep = context.get_necessary_sweep()
+        possible = context.get_possible_relation()
+        extreme_ranking = context.get_extreme_ranking()
+
+        assert context.get_necessary_sweep() is necessary_sweep
+        assert context.get_possible_relation() is possible
+        assert context.get_extreme_ranking() is extreme_ranking
+
+
+def test_context_matches_solver_utils(analysis_arguments_dummy):
+    pytest.importorskip('highspy')
+
+    with AnalysisContext(**analysis_arguments_dummy) as context:
+        necessary, possible = context.get_necessary_and_possible_relations()
+        extreme_ranking = context.get_extreme_ranking()
+
+    assert (necessary, possible) == SolverUtils.calculate_necessary_and_possible_relation_matrix(**analysis_arguments_dummy)
+    assert necessary == SolverUtils.get_necessary_relations(**analysis_arguments_dummy)
+
+    extreme_ranking_arguments = dict(analysis_arguments_dummy)
+    del extreme_ranking_arguments['alternatives_id_list']
+    assert extreme_ranking == SolverUtils.calculate_extreme_ranking_analysis(**extreme_ranking_arguments)
+
+
+def test_context_requires_with(analysis_arguments_dummy):
+    context = AnalysisContext(**analysis_arguments_dummy)
+
+    with pytest.raises(RuntimeError):
+        context.get_necessary_relations()
+
+
+def test_necessary_lower_bound_is_closed():
+    pytest.importorskip('highspy')
+
+    # A dominates B and B >= C is known from the previous necessary relation, so A >= C is settled without solving
+    lower_bound = np.eye(3, dtype=bool)
+    lower_bound[1, 2] = True
+
+    with AnalysisContext(
+        performance_table_list=[[3.0, 3.0], [2.0, 2.0], [1.0, 4.0]],
+        alternatives_id_list=['A', 'B', 'C'],
+        comparisons=[[1, 2, [], '>']],
+        criteria=[1, 1],
+        worst_best_position=[],
+        number_of_points=[0, 0],
+        comprehensive_intensities=[],
+        backend='highs',
+        necessary_bounds=(lower_bound, None)
+    ) as context:
+        necessary = context.get_necessary_relations()
+
+        assert context.number_of_solved == 2
+
+    assert necessary == {'A': ['B', 'C'], 'B': ['C']}
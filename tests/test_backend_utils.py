@@ -0,0 +1,98 @@
+import pytest
+from pulp import LpProblem, LpVariable, LpMaximize, LpStatus, GLPK, PULP_CBC_CMD, value
+
+from src.utagmsengine.utils.backend_utils import BackendUtils, HiGHS
+
+
+@pytest.fixture()
+def backend_options_dummy():
+    return {'time_limit': 30, 'mip_gap': 0.01, 'threads': 2}
+
+
+@pytest.fixture()
+def problem_dummy():
+    problem = LpProblem("UTA-GMS", LpMaximize)
+    x = LpVariable('x', 0, 10)
+    y = LpVariable('y', 0, 10, cat='Integer')
+    problem += x + y <= 7.5
+    problem += x - y >= -2
+    problem += x + 2 * y
+
+    return problem
+
+
+def test_get_solver(backend_options_dummy):
+    glpk = BackendUtils.get_solver('glpk', backend_options=backend_options_dummy)
+    assert isinstance(glpk, GLPK)
+    assert glpk.timeLimit == 30
+    assert glpk.options == ['--mipgap', '0.01']
+
+    cbc = BackendUtils.get_solver('cbc', backend_options=backend_options_dummy)
+    assert isinstance(cbc, PULP_CBC_CMD)
+    assert cbc.timeLimit == 30
+    assert cbc.optionsDict['gapRel'] == 0.01
+    assert cbc.optionsDict['threads'] == 2
+
+    highs = BackendUtils.get_solver('highs', backend_options=backend_options_dummy)
+    assert isinstance(highs, HiGHS)
+    assert highs.optionsDict == {'gapRel': 0.01, 'threads': 2}
+
+
+def test_get_solver_custom():
+    solver = PULP_CBC_CMD(msg=False)
+
+    assert BackendUtils.get_solver(solver, backend_options={'time_limit': 30}) is solver
+
+
+def test_get_solver_unknown():
+    with pytest.raises(ValueError):
+        BackendUtils.get_solver('gurobi')
+
+    # A misspelled option is not ignored
+    with pytest.raises(ValueError):
+        BackendUtils.get_solver('glpk', backend_options={'timelimit': 30})
+
+
+def test_highs_solve(problem_dummy):
+    pytest.importorskip('highspy')
+
+    problem_dummy.solve(solver=HiGHS(msg=False))
+
+    assert LpStatus[problem_dummy.status] == 'Optimal'
+    assert value(problem_dummy.objective) == pytest.approx(11.5)
+    assert [variable.varValue for variable in problem_dummy.variables()] == pytest.approx([3.5, 4.0])
+
+
+def test_highs_solve_lexicographic():
+    pytest.importorskip('highspy')
+
+    problem = LpProblem("UTA-GMS", LpMaximize)
+    epsilon = LpVariable('epsilon')
+    delta = LpVariable('delta', 0)
+    problem += epsilon <= 0.5
+    problem += delta >= epsilon - 0.25
+    problem += 1e20 * epsilon - delta
+
+    problem.solve(solver=HiGHS(msg=False))
+
+    assert LpStatus[problem.status] == 'Optimal'
+    assert epsilon.varValue == pytest.approx(0.5)
+    assert delta.varValue == pytest.approx(0.25)
+
+
+def test_highs_solve_lexicographic_infeasible():
+    pytest.importorskip('highspy')
+
+    problem = LpProblem("UTA-GMS", LpMaximize)
+    epsilon = LpVariable('epsilon')
+    delta = LpVariable('delta', 0)
+    problem += epsilon >= 1
+    problem += epsilon + delta <= 0
+    problem += 1e20 * epsilon - delta
+
+    # Values of an earlier solve are not left behind
+    epsilon.varValue = 0.5
+    problem.solve(solver=HiGHS(msg=False))
+
+    assert LpStatus[problem.status] == 'Infeasible'
+    assert epsilon.varValue is None and delta.varValue is None
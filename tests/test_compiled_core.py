@@ -0,0 +1,260 @@
+import pytest
+from pulp import LpProblem, value
+from src.utagmsengine.utils.compiled_core import CompiledCore
+from src.utagmsengine.utils.solver_utils import SolverUtils
+
+
+@pytest.fixture()
+def performance_table_list_dummy():
+    return [[26.0, 40.0, 44.0],
+            [2.0, 2.0, 68.0],
+            [18.0, 17.0, 14.0],
+            [35.0, 62.0, 25.0],
+            [7.0, 55.0, 12.0],
+            [25.0, 30.0, 12.0],
+            [9.0, 62.0, 88.0],
+            [0.0, 24.0, 73.0],
+            [6.0, 15.0, 100.0],
+            [16.0, 9.0, 0.0],
+            [26.0, 17.0, 17.0],
+            [62.0, 43.0, 0.0]]
+
+
+@pytest.fixture()
+def comparisons_list_dummy():
+    return [
+        [6, 5, [], '>'],
+        [5, 4, [], '>'],
+        [3, 6, [], '=']
+    ]
+
+
+@pytest.fixture()
+def criteria_list_dummy():
+    return [1, 1, 1]
+
+
+@pytest.fixture()
+def number_of_points_dummy():
+    return [0, 0, 0]
+
+
+@pytest.fixture()
+def problem_variable_values_dummy():
+    return [0.5, 0.0, 0.5, 0.5, 0.0, 0.5, 0.5, 0.5, 0.0, 0.5, 0.0, 0.5, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.5, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0]
+
+
+@pytest.fixture()
+def compiled_core_dummy(
+        performance_table_list_dummy,
+        comparisons_list_dummy,
+        criteria_list_dummy,
+        number_of_points_dummy
+):
+    return CompiledCore(
+        performance_table_list=performance_table_list_dummy,
+        comparisons=comparisons_list_dummy,
+        criteria=criteria_list_dummy,
+        worst_best_position=[],
+        number_of_points=number_of_points_dummy,
+        comprehensive_intensities=[]
+    )
+
+
+def test_solve_relation(compiled_core_dummy, problem_variable_values_dummy):
+    problem: LpProblem = compiled_core_dummy.solve_relation(alternative_id_1=1, alternative_id_2=2)
+
+    variable_values = []
+    for var in problem.variables():
+        variable_values.append(value(var))
+
+    assert variable_values == problem_variable_values_dummy
+
+
+def test_solve_relation_reuses_core(
+        compiled_core_dummy,
+        performance_table_list_dummy,
+        comparisons_list_dummy,
+        criteria_list_dummy,
+        number_of_points_dummy
+):
+    number_of_constraints: int = len(compiled_core_dummy.constraints_before_pair) + len(compiled_core_dummy.constraints_after_pair)
+
+    for alternative_id_1, alternative_id_2 in [(0, 2), (3, 1), (6, 3)]:
+        problem: LpProblem = compiled_core_dummy.solve_relation(alternative_id_1=alternative_id_1, alternative_id_2=alternative_id_2)
+        core_epsilon: float = problem.variables()[0].varValue
+
+        problem_from_scratch: LpProblem = SolverUtils.calculate_solved_problem(
+            performance_table_list=performance_table_list_dummy,
+            comparisons=comparisons_list_dummy,
+            criteria=criteria_list_dummy,
+            worst_best_position=[],
+            number_of_points=number_of_points_dummy,
+            comprehensive_intensities=[],
+            alternative_id_1=alternative_id_1,
+            alternative_id_2=alternative_id_2
+        )
+
+        assert len(problem.constraints) == number_of_constraints + 1
+        assert core_epsilon == problem_from_scratch.variables()[0].varValue
+
+    assert len(compiled_core_dummy.constraints_before_pair) + len(compiled_core_dummy.constraints_after_pair) == number_of_constraints
+
+
+def test_highs_backend(
+        performance_table_list_dummy,
+        comparisons_list_dummy,
+        criteria_list_dummy,
+        number_of_points_dummy,
+        compiled_core_dummy
+):
+    pytest.importorskip('highspy')
+
+    compiled_core_highs = CompiledCore(
+        performance_table_list=performance_table_list_dummy,
+        comparisons=comparisons_list_dummy,
+        criteria=criteria_list_dummy,
+        worst_best_position=[],
+        number_of_points=number_of_points_dummy,
+        comprehensive_intensities=[],
+        backend='highs'
+    )
+
+    for alternative_id_1, alternative_id_2 in [(0, 2), (3, 1), (6, 3), (1, 2)]:
+        for type_of_relation in [0, 1]:
+            assert compiled_core_highs.get_relation_epsilon(
+                alternative_id_1, alternative_id_2, type_of_relation
+            ) == pytest.approx(compiled_core_dummy.get_relation_epsilon(
+                alternative_id_1, alternative_id_2, type_of_relation
+            ), abs=1e-6)
+
+    rank_counts = []
+    for alternative_id_extreme in [0, 5, 11]:
+        rank_counts.append([compiled_core_highs.get_extreme_rank_count(alternative_id_extreme, type_of_rank) for type_of_rank in range(4)])
+
+    assert rank_counts == [[0, 0, 5, 1], [2, 3, 2, 1], [0, 0, 1, 0]]
+
+
+def test_unknown_backend(
+        performance_table_list_dummy,
+        comparisons_list_dummy,
+        criteria_list_dummy,
+        number_of_points_dummy
+):
+    with pytest.raises(ValueError):
+        CompiledCore(
+            performance_table_list=performance_table_list_dummy,
+            comparisons=comparisons_list_dummy,
+            criteria=criteria_list_dummy,
+            worst_best_position=[],
+            number_of_points=number_of_points_dummy,
+            comprehensive_intensities=[],
+            backend='unknown'
+        )
+
+
+def test_substitute_interpolated(
+        performance_table_list_dummy,
+        comparisons_list_dummy,
+        criteria_list_dummy
+):
+    cores = [
+        CompiledCore(
+            performance_table_list=performance_table_list_dummy,
+            comparisons=comparisons_list_dummy,
+            criteria=criteria_list_dummy,
+            worst_best_position=[],
+            number_of_points=[3, 3, 0],
+            comprehensive_intensities=[],
+            substitute_interpolated=substitute_interpolated
+        )
+        for substitute_interpolated in [False, True]
+    ]
+
+    # Only epsilon and characteristic points are left, without interpolation constraints
+    assert cores[1].model.number_of_columns == 1 + 3 + 3 + 10
+    assert cores[1].model.number_of_rows == cores[0].model.number_of_rows - (cores[0].model.number_of_columns - cores[1].model.number_of_columns)
+
+    for alternative_id_1, alternative_id_2 in [(0, 2), (3, 1), (6, 3), (1, 2)]:
+        assert cores[1].get_relation_epsilon(alternative_id_1, alternative_id_2) == pytest.approx(
+            cores[0].get_relation_epsilon(alternative_id_1, alternative_id_2), abs=1e-6
+        )
+
+
+def test_get_core_epsilon(compiled_core_dummy):
+    # Alternative 3 dominates alternative 2, so the weak pair constraint does not change the problem
+    assert compiled_core_dummy.get_core_epsilon() == compiled_core_dummy.get_relation_epsilon(2, 3, type_of_relation=1)
+
+
+def test_get_core_epsilon_position(
+        performance_table_list_dummy,
+        criteria_list_dummy,
+        number_of_points_dummy
+):
+    pytest.importorskip('highspy')
+
+    # Without comparisons only position constraints, whose big-Ms assume that epsilon is at most 1, bound epsilon
+    for backend in ['glpk', 'highs']:
+        compiled_core = CompiledCore(
+            performance_table_list=performance_table_list_dummy,
+            comparisons=[],
+            criteria=criteria_list_dummy,
+            worst_best_position=[[0, 1, 1, []]],
+            number_of_points=number_of_points_dummy,
+            comprehensive_intensities=[],
+            backend=backend
+        )
+
+        assert compiled_core.get_core_epsilon() == pytest.approx(1.0, abs=1e-6)
+
+
+def test_get_extreme_rank_count_not_optimal(
+        performance_table_list_dummy,
+        criteria_list_dummy,
+        number_of_points_dummy
+):
+    pytest.importorskip('highspy')
+
+    # A > B and B > A, no value function satisfies the preference information
+    for backend in ['glpk', 'highs']:
+        compiled_core = CompiledCore(
+            performance_table_list=performance_table_list_dummy,
+            comparisons=[[0, 1, [], '>'], [1, 0, [], '>']],
+            criteria=criteria_list_dummy,
+            worst_best_position=[],
+            number_of_points=number_of_points_dummy,
+            comprehensive_intensities=[],
+            backend=backend
+        )
+
+        with pytest.raises(RuntimeError):
+            compiled_core.get_extreme_rank_count(0, 0)
+
+
+def test_create_highs_model_presolve_rules_off(
+        performance_table_list_dummy,
+        comparisons_list_dummy,
+        criteria_list_dummy,
+        number_of_points_dummy
+):
+    pytest.importorskip('highspy')
+    from src.utagmsengine.utils.highs_model import HighsModel
+
+    # Presolve rules are switched off only for MIPs with big-M rows of position or rank binaries
+    presolve_rules_off = []
+    for worst_best_position in [[], [[0, 1, 1, []]]]:
+        compiled_core = CompiledCore(
+            performance_table_list=performance_table_list_dummy,
+            comparisons=comparisons_list_dummy,
+            criteria=criteria_list_dummy,
+            worst_best_position=worst_best_position,
+            number_of_points=number_of_points_dummy,
+            comprehensive_intensities=[],
+            backend='highs'
+        )
+        presolve_rules_off.append(compiled_core.create_highs_model().presolve_rules_off)
+
+        compiled_core.get_extreme_rank_count(0, 0)
+        presolve_rules_off.append(compiled_core.extreme_model.presolve_rules_off)
+
+    assert presolve_rules_off == [0] + [HighsModel.BIG_M_PRESOLVE_RULES_OFF] * 3
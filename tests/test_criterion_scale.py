@@ -0,0 +1,46 @@
+import pytest
+
+from src.utagmsengine.utils.criterion_scale import CriterionScale
+
+
+@pytest.fixture()
+def performances_dummy():
+    return [26.0, 2.0, -7.5, 26.0, 14.0]
+
+
+@pytest.fixture()
+def criterion_scale_dummy(performances_dummy):
+    return CriterionScale(performances_dummy, 3)
+
+
+def test_values(criterion_scale_dummy):
+    assert criterion_scale_dummy.values.tolist() == [-7.5, 2.0, 9.25, 14.0, 26.0]
+    assert criterion_scale_dummy.inverse.tolist() == [4, 1, 0, 4, 3]
+    assert criterion_scale_dummy.characteristic_points.tolist() == [-7.5, 9.25, 26.0]
+    assert criterion_scale_dummy.is_characteristic.tolist() == [True, False, True, False, True]
+
+
+def test_order(criterion_scale_dummy):
+    # Performances in the order of their first appearance, then added characteristic points
+    assert criterion_scale_dummy.values[criterion_scale_dummy.order].tolist() == [26.0, 2.0, -7.5, 14.0, 9.25]
+
+
+def test_segments(criterion_scale_dummy):
+    assert criterion_scale_dummy.lower_points.tolist() == [0, 0, 1, 1, 2]
+    assert criterion_scale_dummy.upper_points.tolist() == [0, 1, 1, 2, 2]
+
+
+def test_weights(criterion_scale_dummy):
+    lower_weights = criterion_scale_dummy.lower_weights.tolist()
+    upper_weights = criterion_scale_dummy.upper_weights.tolist()
+
+    assert lower_weights[0] == 1 and upper_weights[0] == 0
+    assert upper_weights[1] == pytest.approx(9.5 / 16.75)
+    assert lower_weights[3] + upper_weights[3] == pytest.approx(1)
+
+
+def test_without_number_of_points(performances_dummy):
+    criterion_scale = CriterionScale(performances_dummy)
+
+    assert criterion_scale.characteristic_points.tolist() == [-7.5, 2.0, 14.0, 26.0]
+    assert criterion_scale.is_characteristic.all()
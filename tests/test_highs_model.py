@@ -0,0 +1,160 @@
+import importlib.metadata
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+pytest.importorskip('highspy')
+
+from src.utagmsengine.utils.highs_model import HighsModel
+from src.utagmsengine.utils.sparse_model import SparseModel
+
+
+@pytest.fixture()
+def sparse_model_dummy():
+    model = SparseModel()
+    model.add_column('x', 0, 10)
+    model.add_column('y', 0, 10)
+    # x + y <= 8, x - y >= -2
+    model.add_rows([0, 0, 1, 1], [0, 1, 0, 1], [1.0, 1.0, 1.0, -1.0], [-np.inf, -2], [8, np.inf])
+
+    return model
+
+
+@pytest.fixture()
+def highs_model_dummy(sparse_model_dummy):
+    return HighsModel(sparse_model_dummy)
+
+
+def test_solve(highs_model_dummy):
+    highs_model_dummy.set_objective({0: 1.0, 1: 2.0}, maximize=True)
+
+    status, values = highs_model_dummy.solve()
+
+    assert status == 'Optimal'
+    assert values.tolist() == pytest.approx([3.0, 5.0])
+
+
+def test_set_row(highs_model_dummy):
+    row = highs_model_dummy.add_row()
+    highs_model_dummy.set_objective({0: 1.0}, maximize=True)
+
+    highs_model_dummy.set_row(row, {0: 1.0}, -np.inf, 1)
+    status, values = highs_model_dummy.solve()
+    assert status == 'Optimal'
+    assert values[0] == pytest.approx(1.0)
+
+    highs_model_dummy.set_row(row, {1: 1.0}, 4, np.inf)
+    status, values = highs_model_dummy.solve()
+    assert values[0] == pytest.approx(4.0)
+
+    highs_model_dummy.set_row(row, {}, -np.inf, np.inf)
+    status, values = highs_model_dummy.solve()
+    assert values[0] == pytest.approx(8.0)
+
+    highs_model_dummy.set_row(row, {0: 1.0, 1: 1.0}, 9, np.inf)
+    status, values = highs_model_dummy.solve()
+    assert status == 'Infeasible'
+
+
+def test_too_large_coefficients():
+    model = SparseModel()
+    model.add_column('x', 0, 1)
+    model.add_column('b', 0, 1, integer=True)
+    model.add_row({0: 1.0, 1: 1e20}, 0, np.inf)
+
+    with pytest.raises(ValueError):
+        HighsModel(model)
+
+
+class AmbiguousPresolveHighs:
+    # Reports every model as unbounded or infeasible while presolve is on, as presolve of HiGHS can
+    def __init__(self, highs, highspy):
+        self.highs = highs
+        self.highspy = highspy
+        self.presolve = 'choose'
+        self.number_of_runs = 0
+
+    def setOptionValue(self, name, value):
+        if name == 'presolve':
+            self.presolve = value
+        return self.highs.setOptionValue(name, value)
+
+    def run(self):
+        self.number_of_runs += 1
+        return self.highs.run()
+
+    def getModelStatus(self):
+        if self.presolve != 'off':
+            return self.highspy.HighsModelStatus.kUnboundedOrInfeasible
+        return self.highs.getModelStatus()
+
+    def __getattr__(self, name):
+        return getattr(self.highs, name)
+
+
+@pytest.mark.parametrize('upper, status', [(10, 'Infeasible'), (np.inf, 'Unbounded')])
+def test_solve_unbounded_or_infeasible(upper, status):
+    model = SparseModel()
+    model.add_column('x', 0, upper)
+    model.add_column('b', 0, 1, integer=True)
+    # x + b >= 20 cannot hold with x <= 10
+    model.add_row({0: 1.0, 1: 1.0}, 20, np.inf)
+
+    highs_model = HighsModel(model)
+    highs_model.highs = AmbiguousPresolveHighs(highs_model.highs, highs_model.highspy)
+    highs_model.set_objective({0: 1.0}, maximize=True)
+
+    # The model is solved again without presolve, which is then switched back on
+    assert highs_model.solve()[0] == status
+    assert highs_model.highs.number_of_runs == 2
+    assert highs_model.highs.presolve == 'choose'
+
+
+PRESOLVE_CRASH_SCRIPT = '''
+import sys
+import numpy as np
+from src.utagmsengine.utils.highs_model import HighsModel
+from src.utagmsengine.utils.sparse_model import SparseModel
+
+data = np.load('tests/files/highs_presolve_crash.npz')
+model = SparseModel()
+for column, (lower, upper, integer) in enumerate(zip(data['column_lower'], data['column_upper'], data['column_integer'])):
+    model.add_column(f'x_{column}', lower, upper, bool(integer))
+model.add_rows(data['rows'], data['columns'], data['values'], data['row_lower'], data['row_upper'], len(data['row_lower']))
+
+highs_model = HighsModel(model, presolve_rules_off=int(sys.argv[1]))
+highs_model.set_options(mip_feasibility_tolerance=1e-9)
+highs_model.set_objective(dict(enumerate(data['objective'])), maximize=bool(data['maximize']))
+print(highs_model.solve()[0])
+'''
+
+
+@pytest.mark.skipif(
+    importlib.metadata.version('highspy') != '1.15.1',
+    reason='the crash is reproduced with highspy 1.15.1, pinned in setup.cfg'
+)
+def test_big_m_presolve_rules_off():
+    # Position MIP of a normalized value function on which presolve of HiGHS crashes, solved in a subprocess
+    def solve(presolve_rules_off):
+        return subprocess.run(
+            [sys.executable, '-c', PRESOLVE_CRASH_SCRIPT, str(presolve_rules_off)],
+            capture_output=True, text=True, timeout=120
+        )
+
+    # Killed by a signal (segmentation fault) with all presolve rules
+    assert solve(0).returncode < 0
+
+    result = solve(HighsModel.BIG_M_PRESOLVE_RULES_OFF)
+    assert result.returncode == 0
+    assert result.stdout.strip() == 'Optimal'
+
+
+def test_presolve_rules_off_only_for_mip(sparse_model_dummy):
+    highs_model = HighsModel(sparse_model_dummy, presolve_rules_off=HighsModel.BIG_M_PRESOLVE_RULES_OFF)
+    assert highs_model.highs.getOptionValue('presolve_rule_off')[1] == 0
+
+    highs_model.add_column(0, 1, integer=True)
+    highs_model.update_presolve()
+    assert highs_model.highs.getOptionValue('presolve_rule_off')[1] == HighsModel.BIG_M_PRESOLVE_RULES_OFF
@@ -0,0 +1,89 @@
+from functools import partial
+
+import pytest
+
+from src.utagmsengine.utils.compiled_core import CompiledCore
+from src.utagmsengine.utils.parallel_executor import ParallelExecutor, TaskError
+
+
+@pytest.fixture()
+def performance_table_list_dummy():
+    return [[26.0, 40.0, 44.0],
+            [2.0, 2.0, 68.0],
+            [18.0, 17.0, 14.0],
+            [35.0, 62.0, 25.0],
+            [7.0, 55.0, 12.0],
+            [25.0, 30.0, 12.0],
+            [9.0, 62.0, 88.0],
+            [0.0, 24.0, 73.0],
+            [6.0, 15.0, 100.0],
+            [16.0, 9.0, 0.0],
+            [26.0, 17.0, 17.0],
+            [62.0, 43.0, 0.0]]
+
+
+@pytest.fixture()
+def create_core_dummy(performance_table_list_dummy):
+    return partial(
+        CompiledCore,
+        performance_table_list=performance_table_list_dummy,
+        comparisons=[[6, 5, [], '>'], [5, 4, [], '>'], [3, 6, [], '=']],
+        criteria=[1, 1, 1],
+        worst_best_position=[],
+        number_of_points=[0, 0, 0],
+        comprehensive_intensities=[],
+        backend='highs'
+    )
+
+
+def divide(state, number):
+    return state / number
+
+
+def test_map_keeps_order():
+    tasks = [{'number': number} for number in range(1, 20)]
+
+    with ParallelExecutor(lambda: 60.0) as sequential_executor:
+        sequential_results = sequential_executor.map(divide, tasks)
+
+    with ParallelExecutor(lambda: 60.0, max_workers=4) as thread_executor:
+        thread_results = thread_executor.map(divide, tasks)
+
+    assert sequential_results == [60.0 / number for number in range(1, 20)]
+    assert thread_results == sequential_results
+
+
+def test_map_captures_errors():
+    with ParallelExecutor(lambda: 60.0, max_workers=2) as parallel_executor:
+        with pytest.raises(TaskError) as error:
+            parallel_executor.map(divide, [{'number': 1}, {'number': 0}, {'number': 2}, {'number': 0}])
+
+        # The pool is still usable after failed tasks
+        assert parallel_executor.map(divide, [{'number': 3}]) == [20.0]
+
+    assert sorted(error.value.data.keys()) == [1, 3]
+    assert 'ZeroDivisionError' in error.value.data[1]
+
+
+def test_map_requires_context_manager():
+    with pytest.raises(RuntimeError):
+        ParallelExecutor(lambda: 60.0).map(divide, [{'number': 1}])
+
+
+def test_unknown_executor():
+    with pytest.raises(ValueError):
+        ParallelExecutor(lambda: 60.0, executor='fiber')
+
+
+@pytest.mark.parametrize('executor', ['thread', 'process'])
+def test_relation_epsilons(create_core_dummy, executor):
+    tasks = [{'alternative_id_1': i, 'alternative_id_2': j} for i in range(4) for j in range(4) if i != j]
+
+    with ParallelExecutor(create_core_dummy) as sequential_executor:
+        sequential_epsilons = sequential_executor.map(CompiledCore.get_relation_epsilon, tasks)
+
+    with ParallelExecutor(create_core_dummy, max_workers=3, executor=executor) as parallel_executor:
+        parallel_epsilons = parallel_executor.map(CompiledCore.get_relation_epsilon, tasks)
+
+    # Warm starts of the persistent HiGHS models depend on the tasks solved before, so only the last digits may differ
+    assert parallel_epsilons == pytest.approx(sequential_epsilons)
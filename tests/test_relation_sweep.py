@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from src.utagmsengine.utils.relation_sweep import RelationSweep
+
+
+@pytest.fixture()
+def relation_sweep_dummy():
+    # Alternative 0 dominates alternative 1
+    dominance = np.eye(4, dtype=bool)
+    dominance[0, 1] = True
+
+    return RelationSweep(dominance)
+
+
+def test_add_relation(relation_sweep_dummy):
+    relation_sweep_dummy.add_relation(1, 2)
+    relation_sweep_dummy.add_relation(2, 3)
+
+    assert relation_sweep_dummy.relation[0].tolist() == [True, True, True, True]
+    assert relation_sweep_dummy.relation[1].tolist() == [False, True, True, True]
+
+
+def test_add_not_relation(relation_sweep_dummy):
+    relation_sweep_dummy.add_relation(2, 3)
+    relation_sweep_dummy.add_not_relation(0, 3)
+
+    # 0 >= 1 and 2 >= 3, so neither 1 >= 3 nor 1 >= 2 nor 0 >= 2
+    assert relation_sweep_dummy.not_relation[:, 2:].tolist() == [[True, True], [True, True], [False, False], [False, False]]
+
+    # Adding 1 >= 0 keeps the known pairs closed
+    relation_sweep_dummy.add_relation(1, 0)
+    assert relation_sweep_dummy.not_relation[1, 3]
+    assert not (relation_sweep_dummy.relation & relation_sweep_dummy.not_relation).any()
+
+
+def test_get_next_pair(relation_sweep_dummy):
+    for alternative_id_1 in range(4):
+        for alternative_id_2 in range(4):
+            relation_sweep_dummy.add_answer(alternative_id_1, alternative_id_2, alternative_id_1 <= alternative_id_2)
+
+    assert relation_sweep_dummy.get_next_pair() is None
+
+
+def test_sweep_is_complete():
+    # Random total preorder given by utilities, every pair has to end up settled with the right answer
+    utilities = np.random.default_rng(0).integers(0, 4, size=8)
+    sweep = RelationSweep(np.eye(8, dtype=bool))
+
+    pair = sweep.get_next_pair()
+    while pair is not None:
+        sweep.add_answer(pair[0], pair[1], utilities[pair[0]] >= utilities[pair[1]])
+        pair = sweep.get_next_pair()
+
+    assert (sweep.relation == (utilities[:, np.newaxis] >= utilities[np.newaxis, :])).all()
+    assert sweep.number_of_solved < 8 * 7
+
+
+def test_get_next_pairs(relation_sweep_dummy):
+    pairs = relation_sweep_dummy.get_next_pairs(3)
+
+    assert len(pairs) == 3
+    assert pairs[0] == relation_sweep_dummy.get_next_pair()
+    assert all(not relation_sweep_dummy.is_settled(*pair) for pair in pairs)
+
+    # Never more pairs than the unsettled ones
+    assert len(relation_sweep_dummy.get_next_pairs(100)) == 16 - 4 - 1
+
+
+def test_get_transitive_closure():
+    # 0 >= 1, 1 >= 2 and 2 >= 3
+    relation = np.eye(4, dtype=bool)
+    relation[[0, 1, 2], [1, 2, 3]] = True
+
+    closure = RelationSweep.get_transitive_closure(relation)
+
+    assert (closure == np.triu(np.ones((4, 4), dtype=bool))).all()
+    assert not relation[0, 3]
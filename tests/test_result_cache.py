@@ -0,0 +1,106 @@
+import pytest
+
+from src.utagmsengine.solver import Inconsistency
+from src.utagmsengine.utils import result_cache
+from src.utagmsengine.utils.result_cache import ResultCache
+from src.utagmsengine.dataclasses import Comparison
+
+
+@pytest.fixture()
+def performance_table_dict_dummy():
+    return {
+        'A': {'g1': 26.0, 'g2': 40.0},
+        'B': {'g1': 2.0, 'g2': 2.0},
+        'C': {'g1': 18.0, 'g2': 17.0}
+    }
+
+
+def test_get_key(performance_table_dict_dummy):
+    key = ResultCache.get_key(
+        'get_hasse_diagram_dict',
+        performance_table_dict=performance_table_dict_dummy,
+        comparisons=[Comparison(alternative_1='A', alternative_2='B')]
+    )
+
+    integer_performance_table_dict = {
+        alternative: {criterion: int(value) for criterion, value in performances.items()}
+        for alternative, performances in performance_table_dict_dummy.items()
+    }
+
+    # Order of keyword arguments and type of numbers do not matter
+    assert key == ResultCache.get_key(
+        'get_hasse_diagram_dict',
+        comparisons=[Comparison(alternative_1='A', alternative_2='B')],
+        performance_table_dict=integer_performance_table_dict
+    )
+    assert key != ResultCache.get_key(
+        'get_hasse_diagram_dict',
+        performance_table_dict=performance_table_dict_dummy,
+        comparisons=[Comparison(alternative_1='A', alternative_2='B', sign='>=')]
+    )
+    assert key != ResultCache.get_key(
+        'get_relation_intervals_dict',
+        performance_table_dict=performance_table_dict_dummy,
+        comparisons=[Comparison(alternative_1='A', alternative_2='B')]
+    )
+
+
+def test_get_key_versions(performance_table_dict_dummy, monkeypatch):
+    key = ResultCache.get_key('get_hasse_diagram_dict', performance_table_dict=performance_table_dict_dummy)
+
+    # Results of another version of the package or of the stored format are not returned
+    monkeypatch.setattr(result_cache, '__version__', '0.0.0')
+    assert key != ResultCache.get_key('get_hasse_diagram_dict', performance_table_dict=performance_table_dict_dummy)
+    monkeypatch.undo()
+
+    monkeypatch.setattr(ResultCache, 'FORMAT_VERSION', ResultCache.FORMAT_VERSION + 1)
+    assert key != ResultCache.get_key('get_hasse_diagram_dict', performance_table_dict=performance_table_dict_dummy)
+
+
+def test_least_recently_used_is_evicted():
+    cache = ResultCache(max_size=2)
+
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == (True, 1)
+    cache.put('c', 3)
+
+    assert len(cache) == 2
+    assert cache.get('b') == (False, None)
+    assert cache.get('a') == (True, 1)
+    assert cache.get('c') == (True, 3)
+
+
+def test_cached_result_is_copied():
+    cache = ResultCache()
+
+    result = {'A': ['B']}
+    cache.put('a', result)
+    result['A'].append('C')
+    cache.get('a')[1]['A'].append('D')
+
+    assert cache.get('a') == (True, {'A': ['B']})
+
+
+def test_disk_store(tmp_path):
+    path = str(tmp_path / 'results.sqlite')
+
+    cache = ResultCache(max_size=1, path=path)
+    cache.put('a', ({'A': ['B']}, {'A': ((2, 1), (1, 1))}))
+    cache.put('b', Inconsistency("Found inconsistencies", [[[], [], [], []]]))
+
+    # A new cache, ex. after a restart, reads results from the disk store
+    restarted_cache = ResultCache(max_size=1, path=path)
+    is_cached, inconsistency = restarted_cache.get('b')
+
+    assert restarted_cache.get('a') == (True, ({'A': ['B']}, {'A': ((2, 1), (1, 1))}))
+    assert is_cached and inconsistency.data == [[[], [], [], []]]
+
+    restarted_cache.clear()
+
+    assert ResultCache(path=path).get('a') == (False, None)
+
+
+def test_max_size_has_to_be_positive():
+    with pytest.raises(ValueError):
+        ResultCache(max_size=0)
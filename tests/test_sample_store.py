@@ -0,0 +1,65 @@
+import os
+
+import numpy as np
+import pytest
+
+from src.utagmsengine.utils.sample_store import SampleStore
+from src.utagmsengine.utils.sampler_utils import SamplerUtils
+
+
+@pytest.fixture()
+def utilities_matrix_dummy():
+    # Two alternatives on one criterion, the first one valued by the first variable, the second one by the second
+    return np.array([[1.0, 0.0], [0.0, 1.0], [0.0, 0.0]])
+
+
+@pytest.fixture()
+def variables_dummy():
+    return [{'criterion': 0, 'point': 1.0}, {'criterion': 0, 'point': 2.0}, {'criterion': None, 'point': None}]
+
+
+def test_sample_store(tmp_path, utilities_matrix_dummy, variables_dummy):
+    samples = np.array([[0.1, 0.2, 0.0], [0.3, 0.2, 0.0], [0.5, 0.6, 0.0]])
+
+    with SampleStore(str(tmp_path / 'store'), dtype='float32') as sample_store:
+        sample_store.create(10, utilities_matrix_dummy, ['A', 'B'], variables_dummy, number_of_chains=2)
+        sample_store.append(samples[:2], np.array([0, 1]))
+        sample_store.append(samples[2:], np.array([0]))
+
+        with pytest.raises(ValueError):
+            sample_store.append(np.zeros((8, 3)), np.zeros(8))
+
+    # Files are cut to the written samples
+    assert os.path.getsize(tmp_path / 'store' / SampleStore.SAMPLES_FILE) == 3 * 3 * 4
+
+    sample_store = SampleStore.open(str(tmp_path / 'store'))
+
+    assert sample_store.number_of_samples == 3
+    assert sample_store.samples.dtype == np.float32
+    assert np.allclose(sample_store.samples, samples)
+    assert sample_store.chains.tolist() == [0, 1, 0]
+    assert sample_store.metadata['variables'] == variables_dummy
+    assert sample_store.alternatives_id_list == ['A', 'B']
+
+    batches = sample_store.count_rankings(chunk_size=2, batch_size=1)
+
+    # B is better than A in the first and the third sample, both from the first chain
+    assert batches.chain_pairwise_counts[:, 1, 0].tolist() == [2, 0]
+    assert batches.chain_pairwise_counts[:, 0, 1].tolist() == [0, 1]
+    assert batches.chain_position_counts.sum(axis=0).tolist() == [[1, 2], [2, 1]]
+    # Every sample is a batch of its chain
+    assert batches.batch_chains == [0, 1, 0]
+    assert batches.get_batches(0)[1][:, 1, 0].tolist() == [1, 1]
+
+
+def test_sample_store_errors(tmp_path, utilities_matrix_dummy, variables_dummy):
+    with pytest.raises(ValueError):
+        SampleStore(str(tmp_path / 'store'), dtype='int32')
+
+    with SampleStore(str(tmp_path / 'store')) as sample_store:
+        sample_store.create(0, utilities_matrix_dummy, ['A', 'B'], variables_dummy)
+
+    sample_store = SampleStore.open(str(tmp_path / 'store'))
+
+    assert sample_store.samples.shape == (0, 3)
+    assert [chunk for chunk in sample_store.iterate_chunks()] == []
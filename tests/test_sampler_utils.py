@@ -0,0 +1,280 @@
+import os
+import stat
+import sys
+import time
+
+import numpy as np
+import pytest
+
+from src.utagmsengine.utils.sampler_utils import HitAndRunSampler, RankingBatches, SamplerPolytope, SamplerUtils, SampleStream
+from src.utagmsengine.utils.solver_utils import SolverUtils
+from src.utagmsengine.utils.sparse_model import SparseModel
+from src.utagmsengine.utils.variable_registry import VariableRegistry
+from pulp import LpProblem, LpVariable, LpMaximize, lpSum
+
+
+@pytest.fixture()
+def performance_table_list_dummy():
+    return [[26.0, 40.0, 44.0],
+            [2.0, 2.0, 68.0],
+            [18.0, 17.0, 14.0],
+            [35.0, 62.0, 25.0],
+            [7.0, 55.0, 12.0],
+            [25.0, 30.0, 12.0],
+            [9.0, 62.0, 88.0],
+            [0.0, 24.0, 73.0],
+            [6.0, 15.0, 100.0],
+            [16.0, 9.0, 0.0],
+            [26.0, 17.0, 17.0],
+            [62.0, 43.0, 0.0]]
+
+
+@pytest.fixture()
+def simplex_polytope_dummy():
+    # x1 + x2 + x3 = 1, x >= 0, x1 >= x2
+    return SamplerPolytope(
+        np.array([[1.0, 1.0, 1.0], [1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0], [1.0, -1.0, 0.0]]),
+        ['=', '>=', '>=', '>=', '>='],
+        np.array([1.0, 0.0, 0.0, 0.0, 0.0])
+    )
+
+
+@pytest.fixture()
+def slow_java_dummy(tmp_path, monkeypatch):
+    # Prints a warning to the standard error and two samples of 1/3 after reading its input, the rest a minute later
+    java = tmp_path / 'java'
+    java.write_text(
+        f"#!{sys.executable}\n"
+        "import sys, time\n"
+        "rows = sys.stdin.read().splitlines()\n"
+        "n = int(sys.argv[sys.argv.index('-n') + 1])\n"
+        "sys.stderr.write('warning')\n"
+        "for i in range(n):\n"
+        "    if i == 2:\n"
+        "        time.sleep(60)\n"
+        "    print('\\t'.join(['0.3333'] * (len(rows[0].split()) - 2)), flush=True)\n"
+    )
+    java.chmod(java.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv('PATH', f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+
+
+@pytest.fixture()
+def seed_java_dummy(tmp_path, monkeypatch):
+    # Prints samples with every value equal to its seed
+    java = tmp_path / 'java'
+    java.write_text(
+        f"#!{sys.executable}\n"
+        "import sys\n"
+        "rows = sys.stdin.read().splitlines()\n"
+        "n = int(sys.argv[sys.argv.index('-n') + 1])\n"
+        "seed = sys.argv[sys.argv.index('-s') + 1]\n"
+        "for i in range(n):\n"
+        "    print('\\t'.join([seed] * (len(rows[0].split()) - 2)), flush=True)\n"
+    )
+    java.chmod(java.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv('PATH', f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+
+
+def test_hit_and_run_sampler_box():
+    sampler = HitAndRunSampler(
+        lhs=np.array([[1.0, 0.0], [0.0, 1.0], [1.0, 0.0], [0.0, 1.0]]),
+        senses=['<=', '<=', '>=', '>='],
+        rhs=np.array([2.0, 1.0, 0.0, 0.0]),
+        seed=1
+    )
+
+    samples = sampler.sample(2000)
+
+    assert samples.shape == (2000, 2)
+    assert (samples >= 0).all() and (samples[:, 0] <= 2).all() and (samples[:, 1] <= 1).all()
+    # Uniform distribution on [0, 2] x [0, 1]
+    assert np.allclose(samples.mean(axis=0), [1.0, 0.5], atol=0.05)
+
+
+def test_run_hit_and_run(simplex_polytope_dummy):
+    samples, error = SamplerUtils.run_hit_and_run(simplex_polytope_dummy, 100, {'seed': 3, 'thinning': 5})
+
+    assert error == ''
+    assert samples.shape == (100, 3)
+    assert np.allclose(samples.sum(axis=1), 1.0)
+    assert (samples >= -1e-9).all()
+    assert (samples[:, 0] >= samples[:, 1] - 1e-9).all()
+
+    same_samples, _ = SamplerUtils.run_hit_and_run(simplex_polytope_dummy, 100, {'seed': 3, 'thinning': 5})
+
+    assert np.array_equal(samples, same_samples)
+
+
+def test_run_hit_and_run_without_interior(simplex_polytope_dummy):
+    # x1 + x2 + x3 = 1 and x1 + x2 + x3 >= 2
+    polytope = SamplerPolytope(
+        np.vstack([simplex_polytope_dummy.lhs, [1.0, 1.0, 1.0]]),
+        simplex_polytope_dummy.senses + ['>='],
+        np.append(simplex_polytope_dummy.rhs, 2.0)
+    )
+    samples, error = SamplerUtils.run_hit_and_run(polytope, 10)
+
+    assert len(samples) == 0
+    assert error != ''
+
+
+def test_sample_stream(simplex_polytope_dummy):
+    stream = SampleStream(simplex_polytope_dummy, sampler='numpy', sampler_options={'seed': 3, 'thinning': 5})
+
+    first_samples, _ = stream.draw(40)
+    second_samples, _ = stream.draw(60)
+
+    # The chain continues between batches
+    samples, _ = SamplerUtils.run_hit_and_run(simplex_polytope_dummy, 100, {'seed': 3, 'thinning': 5})
+
+    assert np.array_equal(np.vstack([first_samples, second_samples]), samples)
+    assert stream.number_of_drawn == 100
+
+
+def test_sample_stream_chains(simplex_polytope_dummy):
+    with SampleStream(simplex_polytope_dummy, sampler='numpy', sampler_options={'seed': 3, 'thinning': 5, 'number_of_chains': 2}) as stream:
+        first_samples, first_chains, _ = stream.draw_chains(40)
+        second_samples, second_chains, _ = stream.draw_chains(59)
+
+    samples = np.vstack([first_samples, second_samples])
+    chains = np.concatenate([first_chains, second_chains])
+
+    # Samples of the chains are interleaved, every chain continues between batches from its own seed
+    assert first_chains.tolist() == [0, 1] * 20
+    assert np.array_equal(samples[chains == 0], SamplerUtils.run_hit_and_run(simplex_polytope_dummy, 50, {'seed': 3, 'thinning': 5})[0])
+    assert np.array_equal(samples[chains == 1], SamplerUtils.run_hit_and_run(simplex_polytope_dummy, 50, {'seed': 4, 'thinning': 5})[0])
+    assert stream.number_of_drawn == 100
+    assert stream.chain_numbers_of_drawn == [50, 50]
+    assert stream.chain_workers == []
+
+
+def test_run_polyrun(simplex_polytope_dummy, slow_java_dummy):
+    samples, error = SamplerUtils.run_polyrun(simplex_polytope_dummy, 'polyrun.jar', 2)
+
+    assert samples.tolist() == [[0.3333] * 3] * 2
+    assert error == 'warning'
+
+
+def test_sample_stream_chunks(simplex_polytope_dummy, slow_java_dummy):
+    started = time.time()
+    with SampleStream(simplex_polytope_dummy, sampler_path='polyrun.jar') as stream:
+        chunks = stream.draw_chunks(4, chunk_size=2)
+
+        # Samples are read while Polyrun is still sampling, closing the chunks stops it
+        samples, chains = next(chunks)
+        chunks.close()
+
+    assert samples.tolist() == [[0.3333] * 3] * 2
+    assert chains.tolist() == [0, 0]
+    assert stream.number_of_drawn == 2
+    assert stream.number_of_batches == 1
+    assert time.time() - started < 30
+
+
+def test_sample_stream_polyrun_chains(simplex_polytope_dummy, seed_java_dummy):
+    with SampleStream(simplex_polytope_dummy, sampler_path='polyrun.jar', sampler_options={'seed': 10, 'number_of_chains': 2}) as stream:
+        first_samples, first_chains, _ = stream.draw_chains(4)
+        second_samples, second_chains, _ = stream.draw_chains(3)
+
+    # Every batch is a new run of Polyrun for every chain, chain c of batch b starts from seed + 2 * b + c
+    assert first_chains.tolist() == [0, 1] * 2
+    assert first_samples[:, 0].tolist() == [10, 11] * 2
+    assert second_chains.tolist() == [0, 1] * 2
+    assert second_samples[:, 0].tolist() == [12, 13] * 2
+    assert stream.number_of_drawn == 8
+    assert stream.chain_numbers_of_drawn == [4, 4]
+    assert stream.get_chain_seed(1) == 15
+
+
+def test_get_sampler_polytope(performance_table_list_dummy):
+    registry = VariableRegistry.from_performance_table(performance_table_list_dummy, [3, 0, 4])
+    alternatives_columns = registry.get_alternatives_columns()
+    utility = [lpSum(registry.variables[column] for column in columns) for columns in alternatives_columns]
+    epsilon = LpVariable("epsilon")
+
+    problem = LpProblem("problem", LpMaximize)
+    problem += epsilon
+    for i in range(3):
+        variables = registry.get_characteristic_variables(i)
+        problem += variables[0] == 0
+        for k in range(len(variables) - 1):
+            problem += variables[k + 1] >= variables[k]
+    problem += lpSum(registry.get_characteristic_variables(i)[-1] for i in range(3)) == 1
+    for constraint in registry.get_interpolation_constraints():
+        problem += constraint
+    # Comparisons of alternatives with values between characteristic points, also on the same criterion
+    problem += utility[10] >= utility[2] + epsilon
+    problem += 2 * utility[4] - utility[5] >= utility[5] + epsilon
+    problem += utility[0] == utility[3]
+
+    model = SparseModel()
+    for constraint in problem.constraints.values():
+        model.add_lp_constraint(constraint)
+
+    polytope, sampled_columns = SamplerUtils.get_sampler_polytope(model, registry)
+    samples, error = SamplerUtils.run_hit_and_run(polytope, 200, {'seed': 1})
+
+    assert error == ''
+    assert sampled_columns.count(-1) == 1
+    assert sorted(column for column in sampled_columns if column >= 0) == np.nonzero(registry.characteristic)[0].tolist()
+    for sample in samples:
+        column_values = SamplerUtils.read_sample(sample, sampled_columns, registry)
+        for variable in problem.variables():
+            column = registry.column_index.get(variable.name, -1)
+            variable.varValue = column_values[column] if column >= 0 else sample[sampled_columns.index(-1)]
+
+        # Every constraint of the problem holds for the interpolated values
+        for constraint in problem.constraints.values():
+            assert (constraint.value() * constraint.sense >= -1e-9) if constraint.sense != 0 else abs(constraint.value()) <= 1e-9
+
+
+def test_calculate_utilities(performance_table_list_dummy):
+    registry = VariableRegistry.from_performance_table(performance_table_list_dummy, [3, 0, 4])
+    sampled_columns = [-1] + np.nonzero(registry.characteristic)[0].tolist()
+    alternatives_id_list = [str(i) for i in range(len(performance_table_list_dummy))]
+    # Utilities rounded to 2 decimal places have ties
+    samples = np.round(np.random.default_rng(5).random((200, len(sampled_columns))) / 3, 2)
+
+    utilities = SamplerUtils.calculate_utilities(
+        samples,
+        SamplerUtils.get_utilities_matrix(sampled_columns, registry),
+        len(alternatives_id_list)
+    )
+    positions = SamplerUtils.calculate_positions(utilities)
+
+    for sample, sample_utilities, sample_positions in zip(samples, utilities, positions):
+        alternatives_and_utilities_dict = SolverUtils.calculate_alternatives_utilities(
+            column_values=SamplerUtils.read_sample(sample, sampled_columns, registry),
+            alternatives_columns=registry.get_alternatives_columns(),
+            alternatives_id_list=alternatives_id_list
+        )
+        ranking = list(alternatives_and_utilities_dict.keys())
+
+        assert sample_utilities.tolist() == [alternatives_and_utilities_dict[alternative] for alternative in alternatives_id_list]
+        assert sample_positions.tolist() == [len(ranking) - ranking.index(alternative) for alternative in alternatives_id_list]
+
+
+def test_check_sampler():
+    SamplerUtils.check_sampler('numpy')
+
+    with pytest.raises(ValueError):
+        SamplerUtils.check_sampler('gibbs')
+
+
+def test_ranking_batches():
+    batches = RankingBatches(number_of_chains=2, number_of_alternatives=2, batch_size=2)
+
+    # Utilities of A and B, samples of the chains interleaved, the first chain has B better than A in its first two
+    batches.add(np.array([[0.1, 0.2], [0.5, 0.0], [0.1, 0.3]]), np.array([0, 1, 0]))
+    batches.add(np.array([[0.4, 0.0], [0.2, 0.1]]), np.array([0, 0]))
+
+    position_counts, pairwise_counts, sizes = batches.get_batches()
+
+    # Batches are consecutive samples of one chain, the current batch of every chain is the last one
+    assert batches.batch_chains == [0, 0]
+    assert sizes.tolist() == [2, 2, 1]
+    assert pairwise_counts[:, 1, 0].tolist() == [2, 0, 0]
+    assert pairwise_counts[:, 0, 1].tolist() == [0, 2, 1]
+    assert np.array_equal(position_counts.sum(axis=0), batches.chain_position_counts.sum(axis=0))
+    assert batches.chain_numbers_of_samples.tolist() == [4, 1]
+    assert batches.get_batches(1)[2].tolist() == [1]
@@ -0,0 +1,117 @@
+import os
+import stat
+import sys
+
+import numpy as np
+import pytest
+
+from src.utagmsengine.utils.sampler_utils import SamplerPolytope, SampleStream, SamplerUtils
+from src.utagmsengine.utils.sampler_worker import SamplerWorker, SamplerWorkerError
+
+
+@pytest.fixture()
+def simplex_polytope_dummy():
+    # x1 + x2 + x3 = 1, x >= 0, x1 >= x2
+    return SamplerPolytope(
+        np.array([[1.0, 1.0, 1.0], [1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0], [1.0, -1.0, 0.0]]),
+        ['=', '>=', '>=', '>=', '>='],
+        np.array([1.0, 0.0, 0.0, 0.0, 0.0])
+    )
+
+
+@pytest.fixture()
+def fake_java_dummy(tmp_path, monkeypatch):
+    # Appends a line to the returned file when it is started, prints n samples of 1/3 after reading its input
+    java = tmp_path / 'java'
+    starts = tmp_path / 'starts'
+    java.write_text(
+        f"#!{sys.executable}\n"
+        "import sys\n"
+        f"open({str(starts)!r}, 'a').write('started\\n')\n"
+        "rows = sys.stdin.read().splitlines()\n"
+        "n = int(sys.argv[sys.argv.index('-n') + 1])\n"
+        "for _ in range(n):\n"
+        "    print('\\t'.join(['0.3333'] * (len(rows[0].split()) - 2)))\n"
+    )
+    java.chmod(java.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv('PATH', f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+
+    return starts
+
+
+def test_sample_numpy(simplex_polytope_dummy):
+    with SamplerWorker() as worker:
+        samples, error = worker.sample(simplex_polytope_dummy, 50, sampler_options={'seed': 3, 'thinning': 5})
+
+    expected_samples, _ = SamplerUtils.run_hit_and_run(simplex_polytope_dummy, 50, {'seed': 3, 'thinning': 5})
+
+    assert error == ''
+    assert np.array_equal(samples, expected_samples)
+    assert worker.process is None
+
+
+def test_sample_chain(simplex_polytope_dummy):
+    with SamplerWorker() as worker:
+        first_samples, _ = worker.sample(simplex_polytope_dummy, 20, sampler_options={'seed': 3, 'thinning': 5}, chain='a')
+        second_samples, _ = worker.sample(simplex_polytope_dummy, 30, sampler_options={'seed': 3, 'thinning': 5}, chain='a')
+        worker.release('a')
+        third_samples, _ = worker.sample(simplex_polytope_dummy, 20, sampler_options={'seed': 3, 'thinning': 5}, chain='a')
+
+    expected_samples, _ = SamplerUtils.run_hit_and_run(simplex_polytope_dummy, 50, {'seed': 3, 'thinning': 5})
+
+    # The chain continues between jobs until it is released
+    assert np.array_equal(np.vstack([first_samples, second_samples]), expected_samples)
+    assert np.array_equal(third_samples, first_samples)
+
+
+def test_sample_stream_worker(simplex_polytope_dummy):
+    with SamplerWorker() as worker:
+        with SampleStream(simplex_polytope_dummy, sampler='numpy', sampler_options={'seed': 3, 'thinning': 5}, worker=worker) as stream:
+            first_samples, _ = stream.draw(20)
+            second_samples, _ = stream.draw(30)
+            chain = str(id(stream))
+
+        # The chain of the stream continues in the worker between batches and is released by close
+        assert np.array_equal(first_samples, worker.sample(simplex_polytope_dummy, 20, {'seed': 3, 'thinning': 5}, chain=chain)[0])
+
+    expected_samples, _ = SamplerUtils.run_hit_and_run(simplex_polytope_dummy, 50, {'seed': 3, 'thinning': 5})
+
+    assert np.array_equal(np.vstack([first_samples, second_samples]), expected_samples)
+
+
+def test_sample_stream_polyrun(simplex_polytope_dummy, fake_java_dummy):
+    with SamplerWorker() as worker:
+        with SampleStream(simplex_polytope_dummy, sampler_path='polyrun.jar', sampler_options={'seed': 1}, worker=worker) as stream:
+            for number_of_samples in [4, 6]:
+                samples, _ = stream.draw(number_of_samples)
+
+                assert samples.tolist() == [[0.3333] * 3] * number_of_samples
+
+        # Polyrun is run by the stream, the worker is never started
+        assert worker.process is None
+
+    assert fake_java_dummy.read_text().splitlines() == ['started'] * 2
+
+
+def test_restart(simplex_polytope_dummy):
+    with SamplerWorker() as worker:
+        assert worker.ping()
+        worker.process.kill()
+        worker.process.wait()
+
+        samples, error = worker.sample(simplex_polytope_dummy, 5)
+
+        assert len(samples) == 5
+        assert worker.number_of_restarts == 1
+
+
+def test_errors(simplex_polytope_dummy):
+    with SamplerWorker(timeout=1) as worker:
+        # Errors of the job are raised again
+        with pytest.raises(TypeError):
+            worker.sample(simplex_polytope_dummy, 5, {'thinning': 'ten'})
+
+        with pytest.raises(SamplerWorkerError):
+            worker.sample(simplex_polytope_dummy, 5, sampler_options={'thinning': 10 ** 9})
+
+        assert worker.ping()
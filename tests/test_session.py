@@ -0,0 +1,111 @@
+import pytest
+
+from src.utagmsengine.session import ElicitationSession
+from src.utagmsengine.solver import Solver
+from src.utagmsengine.dataclasses import Comparison, Criterion, Position, Intensity
+
+
+@pytest.fixture()
+def performance_table_dict_dummy():
+    return {
+        'A': {'g1': 26.0, 'g2': 40.0, 'g3': 44.0},
+        'B': {'g1': 2.0, 'g2': 2.0, 'g3': 68.0},
+        'C': {'g1': 18.0, 'g2': 17.0, 'g3': 14.0},
+        'D': {'g1': 35.0, 'g2': 62.0, 'g3': 25.0},
+        'E': {'g1': -7.0, 'g2': 55.0, 'g3': 12.0},
+        'F': {'g1': 25.0, 'g2': 30.0, 'g3': 12.0},
+        'G': {'g1': 9.0, 'g2': 62.0, 'g3': 88.0},
+        'H': {'g1': 0.0, 'g2': 24.0, 'g3': 73.0},
+        'I': {'g1': 6.0, 'g2': 15.0, 'g3': 100.0},
+        'J': {'g1': 16.0, 'g2': -9.0, 'g3': 0.0},
+        'K': {'g1': 26.0, 'g2': 17.0, 'g3': 17.0},
+        'L': {'g1': 62.0, 'g2': 43.0, 'g3': 0.0}
+    }
+
+
+@pytest.fixture()
+def criterions_dummy():
+    return [Criterion(criterion_id='g1', gain=True, number_of_linear_segments=0), Criterion(criterion_id='g2', gain=True, number_of_linear_segments=0), Criterion(criterion_id='g3', gain=True, number_of_linear_segments=0)]
+
+
+@pytest.fixture()
+def comparison_dummy():
+    return [
+        Comparison(alternative_1='G', alternative_2='F', sign='>'),
+        Comparison(alternative_1='F', alternative_2='E', sign='>'),
+        Comparison(alternative_1='D', alternative_2='G', sign='='),
+    ]
+
+
+@pytest.fixture()
+def intensities_dummy():
+    return [Intensity(alternative_id_1='H', alternative_id_2='G', alternative_id_3='B', alternative_id_4='D', criteria=['g1', 'g2'])]
+
+
+def get_relations(solver, performance_table_dict, criteria, comparisons, positions, intensities):
+    necessary, possible, _ = solver.get_relation_intervals_dict(performance_table_dict, comparisons, criteria, positions, intensities)
+
+    return necessary, possible
+
+
+def test_session_matches_full_analysis(
+        performance_table_dict_dummy,
+        criterions_dummy,
+        comparison_dummy,
+        intensities_dummy
+):
+    pytest.importorskip('highspy')
+    solver = Solver(backend='highs')
+    session = ElicitationSession(performance_table_dict_dummy, criterions_dummy, solver)
+
+    session.add_comparison(comparison_dummy[0])
+    session.get_necessary_and_possible_relations()
+    number_of_solved_from_scratch = session.number_of_solved
+
+    session.add_comparison(comparison_dummy[1])
+    session.add_comparison(comparison_dummy[2])
+    relations = session.get_necessary_and_possible_relations()
+
+    assert session.number_of_solved < number_of_solved_from_scratch
+    assert relations == get_relations(solver, performance_table_dict_dummy, criterions_dummy, comparison_dummy, [], [])
+
+    session.add_intensity(intensities_dummy[0])
+    session.add_position(Position(alternative_id='A', worst_position=12, best_position=2))
+
+    assert session.get_necessary_and_possible_relations() == get_relations(
+        solver, performance_table_dict_dummy, criterions_dummy, comparison_dummy, [Position(alternative_id='A', worst_position=12, best_position=2)], intensities_dummy
+    )
+
+    session.remove_comparison(Comparison(alternative_1='F', alternative_2='E', sign='>'))
+
+    assert session.get_necessary_and_possible_relations() == get_relations(
+        solver, performance_table_dict_dummy, criterions_dummy, [comparison_dummy[0], comparison_dummy[2]], [Position(alternative_id='A', worst_position=12, best_position=2)], intensities_dummy
+    )
+    assert session.get_hasse_diagram_dict() == solver.get_hasse_diagram_dict(
+        performance_table_dict_dummy, [comparison_dummy[0], comparison_dummy[2]], criterions_dummy, [Position(alternative_id='A', worst_position=12, best_position=2)], intensities_dummy
+    )
+
+
+def test_unchanged_session_is_not_solved_again(performance_table_dict_dummy, criterions_dummy, comparison_dummy):
+    pytest.importorskip('highspy')
+    session = ElicitationSession(performance_table_dict_dummy, criterions_dummy, Solver(backend='highs'))
+
+    session.add_comparison(comparison_dummy[0])
+    relations = session.get_necessary_and_possible_relations()
+    session.number_of_solved = 0
+
+    assert session.get_necessary_and_possible_relations() == relations
+    assert session.number_of_solved == 0
+
+
+def test_invalid_preference_information(performance_table_dict_dummy, criterions_dummy):
+    session = ElicitationSession(performance_table_dict_dummy, criterions_dummy)
+
+    with pytest.raises(ValueError):
+        session.add_comparison(Comparison(alternative_1='A', alternative_2='Z'))
+    with pytest.raises(ValueError):
+        session.remove_comparison(Comparison(alternative_1='A', alternative_2='B'))
+    with pytest.raises(ValueError):
+        session.add_position(Position(alternative_id='Z', worst_position=2, best_position=1))
+
+    assert session.comparisons == [] and session.positions == []
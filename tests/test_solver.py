@@ -1,5 +1,9 @@
 import pytest
+from pulp import GLPK_CMD
 from src.utagmsengine.solver import Solver, Inconsistency
+from src.utagmsengine.utils.result_cache import ResultCache
+from src.utagmsengine.utils.sample_store import SampleStore
+from src.utagmsengine.utils.solver_utils import SolverUtils
 from src.utagmsengine.dataclasses import Comparison, Criterion, Position, Intensity
 
 
@@ -80,6 +84,39 @@ def extreme_ranking_dummy():
     return {'A': ((11, 2), (7, 2)), 'B': ((12, 4), (12, 1)), 'C': ((12, 5), (11, 3)), 'D': ((7, 2), (4, 1)), 'E': ((12, 5), (12, 5)), 'F': ((11, 4), (10, 3)), 'G': ((7, 2), (4, 1)), 'H': ((12, 3), (12, 1)), 'I': ((11, 1), (10, 1)), 'J': ((12, 8), (12, 4)), 'K': ((12, 4), (10, 3)), 'L': ((12, 1), (11, 1))}
 
 
+@pytest.fixture()
+def sample_numpy_dummy(
+        performance_table_dict_dummy,
+        comparison_dummy,
+        criterions_dummy,
+        intensities_dummy
+):
+    # Representative value function with the 'numpy' sampler, the result as a dict of its named values
+    names = [
+        'representative_value_function_dict', 'criterion_functions', 'position_percentage', 'pairwise_percentage',
+        'number_of_samples_used', 'extreme_ranking', 'necessary', 'possible', 'sampler_error', 'sampler_metrics'
+    ]
+
+    def sample_numpy(number_of_samples, positions=(), sampler_options=None, **kwargs):
+        result = Solver().get_representative_value_function_dict(
+            performance_table_dict_dummy,
+            comparison_dummy,
+            criterions_dummy,
+            list(positions),
+            intensities_dummy,
+            sampler_path='',
+            number_of_samples=number_of_samples,
+            sampler='numpy',
+            sampler_options=sampler_options or {'seed': 1, 'thinning': 100},
+            return_sampler_metrics=True,
+            **kwargs
+        )
+
+        return dict(zip(names, result))
+
+    return sample_numpy
+
+
 def test_get_hasse_diagram_dict(
         performance_table_dict_dummy,
         comparison_dummy,
@@ -138,6 +175,93 @@ def test_get_representative_value_function_dict(
         assert resolved_inconsistencies == resolved_inconsistencies_dummy
 
 
+def test_get_representative_value_function_dict_numpy_sampler(sample_numpy_dummy, performance_table_dict_dummy):
+    result = sample_numpy_dummy('50')
+
+    assert result['sampler_error'] == ''
+    for alternative_id in performance_table_dict_dummy:
+        assert sum(result['position_percentage'][alternative_id]) == pytest.approx(100)
+    # G > F > E in every compatible value function
+    assert result['pairwise_percentage']['F']['G'] == 0
+    assert result['pairwise_percentage']['E']['F'] == 0
+
+    # The same seed gives the same samples, without Java
+    assert sample_numpy_dummy('50')['position_percentage'] == result['position_percentage']
+
+
+def test_get_representative_value_function_dict_rejected_samples(sample_numpy_dummy):
+    result = sample_numpy_dummy('30', positions=[Position(alternative_id='A', worst_position=3, best_position=3)])
+
+    # Samples in which A is not the third are rejected, sampling continues until 30 are accepted
+    assert result['sampler_error'] == ''
+    assert result['number_of_samples_used'] == 30
+    assert result['position_percentage']['A'][2] == 100
+
+
+def test_get_representative_value_function_dict_tolerance(sample_numpy_dummy):
+    result = sample_numpy_dummy('10000', tolerance=5)
+
+    # Batch means need at least 10 batches of 100 samples, sampling stops after the first batch after which
+    # the standard error is at most 5 percentage points
+    assert result['sampler_error'] == ''
+    assert result['sampler_metrics']['precision'] <= 5
+    assert result['number_of_samples_used'] % 100 == 0 and result['number_of_samples_used'] < 10000
+
+    previous_batch = sample_numpy_dummy(str(result['number_of_samples_used'] - 100))
+    assert previous_batch['sampler_metrics']['precision'] > 5
+
+
+def test_get_representative_value_function_dict_chains(sample_numpy_dummy):
+    result = sample_numpy_dummy('101', sampler_options={'seed': 1, 'thinning': 100, 'number_of_chains': 2})
+    chain_diagnostics = result['sampler_metrics']['chain_diagnostics']
+
+    # Samples of both chains are merged into the same percentages, every chain is reported on its own
+    assert result['sampler_error'] == ''
+    assert result['number_of_samples_used'] == 101
+    assert [chain['seed'] for chain in chain_diagnostics] == [1, 2]
+    assert [chain['number_of_accepted'] for chain in chain_diagnostics] == [51, 50]
+    assert all(chain['number_of_drawn'] >= chain['number_of_accepted'] for chain in chain_diagnostics)
+    assert all(chain['precision'] >= result['sampler_metrics']['precision'] for chain in chain_diagnostics)
+    assert all(chain['max_difference'] >= 0 for chain in chain_diagnostics)
+
+
+def test_get_representative_value_function_dict_sample_store(sample_numpy_dummy, performance_table_dict_dummy, tmp_path):
+    result = sample_numpy_dummy(
+        '30',
+        positions=[Position(alternative_id='A', worst_position=3, best_position=3)],
+        sample_store=SampleStore(str(tmp_path / 'samples'))
+    )
+
+    # Only the accepted samples are kept, of the only chain, and give the same percentages when read again
+    sample_store = SampleStore.open(str(tmp_path / 'samples'))
+
+    assert sample_store.number_of_samples == 30
+    assert sample_store.samples.shape == (30, sample_store.metadata['number_of_variables'])
+    assert sample_store.chains.tolist() == [0] * 30
+    assert sample_store.alternatives_id_list == list(performance_table_dict_dummy)
+    assert SolverUtils.get_sample_store_metrics(sample_store, chunk_size=7) == (
+        result['position_percentage'],
+        result['pairwise_percentage'],
+        result['number_of_samples_used'],
+        result['sampler_metrics']['precision']
+    )
+
+
+def test_get_representative_value_function_dict_inconsistency(
+        performance_table_dict_dummy,
+        criterions_dummy
+):
+    pytest.importorskip('highspy')
+
+    # Extreme ranking of inconsistent preference information has no optimum, inconsistency is reported first
+    comparisons = [Comparison(alternative_1='A', alternative_2='B', sign='>'), Comparison(alternative_1='B', alternative_2='A', sign='>')]
+
+    with pytest.raises(Inconsistency):
+        Solver(backend='highs').get_representative_value_function_dict(
+            performance_table_dict_dummy, comparisons, criterions_dummy, sampler_on=False
+        )
+
+
 def test_predefined_get_hasse_diagram_dict(
         performance_table_dict_dummy,
         comparison_dummy,
@@ -155,3 +279,84 @@ def test_predefined_get_hasse_diagram_dict(
     )
 
     assert hasse_diagram_list == predefined_hasse_diagram_dict_dummy
+
+
+def test_get_relation_intervals_dict(
+        performance_table_dict_dummy,
+        comparison_dummy,
+        criterions_dummy,
+        intensities_dummy
+):
+    solver = Solver()
+
+    necessary, possible, intervals = solver.get_relation_intervals_dict(
+        performance_table_dict_dummy,
+        comparison_dummy,
+        criterions_dummy,
+        [],
+        intensities_dummy
+    )
+
+    # D = G and G > F
+    assert intervals['D']['G'] == (0.0, 0.0)
+    assert intervals['G']['F'][0] >= 0.0001
+    assert intervals['F']['G'] == (-intervals['G']['F'][1], -intervals['G']['F'][0])
+    assert 'G' in necessary['D'] and 'F' in necessary['G'] and 'G' not in possible['F']
+
+
+def test_get_hasse_diagram_dict_cached(
+        performance_table_dict_dummy,
+        comparison_dummy,
+        criterions_dummy,
+        positions_dummy,
+        intensities_dummy,
+        hasse_diagram_dict_dummy,
+        monkeypatch
+):
+    solver = Solver(cache=ResultCache())
+
+    hasse_diagram_list = solver.get_hasse_diagram_dict(
+        performance_table_dict_dummy,
+        comparison_dummy,
+        criterions_dummy,
+        positions_dummy,
+        intensities_dummy
+    )
+
+    # The second call with equal inputs does not solve anything
+    monkeypatch.setattr(SolverUtils, 'get_necessary_relations', None)
+    cached_hasse_diagram_list = solver.get_hasse_diagram_dict(
+        dict(performance_table_dict_dummy),
+        list(comparison_dummy),
+        criterions_dummy,
+        positions_dummy,
+        intensities_dummy
+    )
+
+    assert hasse_diagram_list == hasse_diagram_dict_dummy
+    assert cached_hasse_diagram_list == hasse_diagram_dict_dummy
+
+
+def test_get_hasse_diagram_dict_not_cached_for_solver_instance(
+        performance_table_dict_dummy,
+        comparison_dummy,
+        criterions_dummy,
+        positions_dummy,
+        intensities_dummy,
+        hasse_diagram_dict_dummy
+):
+    # Options of a PuLP solver instance are not part of the key, its results are not cached
+    cache = ResultCache()
+    solver = Solver(backend=GLPK_CMD(msg=False), cache=cache)
+
+    hasse_diagram_list = solver.get_hasse_diagram_dict(
+        performance_table_dict_dummy,
+        comparison_dummy,
+        criterions_dummy,
+        positions_dummy,
+        intensities_dummy
+    )
+
+    assert hasse_diagram_list == hasse_diagram_dict_dummy
+    assert solver.cache is None
+    assert len(cache) == 0
@@ -1,7 +1,14 @@
+import os
 from typing import Dict, List
+import numpy as np
 import pytest
 from pulp import LpProblem, value
+from src.utagmsengine.utils.compiled_core import CompiledCore
+from src.utagmsengine.utils.sample_store import SampleStore
+from src.utagmsengine.utils.sampler_utils import SampleStream
 from src.utagmsengine.utils.solver_utils import SolverUtils
+from src.utagmsengine.utils.variable_registry import VariableRegistry
+from src.utagmsengine.dataclasses import Criterion
 
 
 @pytest.fixture()
@@ -74,6 +81,35 @@ def worst_best_positions_dummy():
     return [] #[[0, 6, 1]]
 
 
+@pytest.fixture()
+def sampler_core_dummy(performance_table_list_dummy, criteria_list_dummy, number_of_points_dummy):
+    # Model sampled by calculate_the_most_representative_function, G preferred to F
+    return CompiledCore(
+        performance_table_list=performance_table_list_dummy,
+        comparisons=[[6, 5, [], '>']],
+        criteria=criteria_list_dummy,
+        worst_best_position=[],
+        number_of_points=number_of_points_dummy,
+        comprehensive_intensities=[],
+        substitute_interpolated=True
+    )
+
+
+@pytest.fixture()
+def drawn_batches_dummy(monkeypatch):
+    # Number of samples drawn at once by every SampleStream
+    drawn_batches = []
+    count_drawn = SampleStream.count_drawn
+
+    def count_drawn_dummy(self, samples, chains):
+        drawn_batches.append(len(samples))
+        return count_drawn(self, samples, chains)
+
+    monkeypatch.setattr(SampleStream, 'count_drawn', count_drawn_dummy)
+
+    return drawn_batches
+
+
 def test_create_variables_list_and_dict(performance_table_list_dummy):
     u_arr, u_arr_dict = SolverUtils.create_variables_list_and_dict(performance_table_list_dummy)
 
@@ -133,3 +169,194 @@ def test_get_alternatives_and_utilities_dict(
     assert alternatives_and_utilities_dict == alternatives_and_utilities_dict_dummy
 
 
+def test_get_criterion_functions():
+    performance_table_list = [[-7.0, 2.0], [2.0, 4.0], [9.0, 2.0]]
+    criteria = [Criterion(criterion_id='g1', gain=True, number_of_linear_segments=2), Criterion(criterion_id='g2', gain=False, number_of_linear_segments=0)]
+    registry = VariableRegistry.from_performance_table(performance_table_list, [2, 0])
+
+    criterion_functions = SolverUtils.get_criterion_functions(
+        variables_and_values_dict={'epsilon': 0.1, 'u_0__7.0': 0.0, 'u_0_2.0': 0.3, 'u_0_9.0': 0.5, 'u_1_2.0': 0.5, 'u_1_4.0': 0.0},
+        criteria=criteria,
+        registry=registry
+    )
+
+    assert criterion_functions == {'g1': [(-7.0, 0.0), (2.0, 0.3), (9.0, 0.5)], 'g2': [(2.0, 0.5), (4.0, 0.0)]}
+
+
+def test_get_criterion_functions_without_registry():
+    criteria = [Criterion(criterion_id='g1', gain=True, number_of_linear_segments=2), Criterion(criterion_id='g2', gain=False, number_of_linear_segments=0)]
+
+    criterion_functions = SolverUtils.get_criterion_functions(
+        {'epsilon': 0.1, 'u_0__7.0': 0.0, 'u_0_2.0': 0.3, 'u_0_9.0': 0.5, 'u_1_2.0': 0.5, 'u_1_4.0': 0.0},
+        criteria
+    )
+
+    assert criterion_functions == {'g1': [(-7.0, 0.0), (2.0, 0.3), (9.0, 0.5)], 'g2': [(2.0, 0.5), (4.0, 0.0)]}
+
+
+def test_calculate_sampler_precision():
+    # 2 alternatives, A better than B in 60 of 200 samples, in 20 batches of 10 samples
+    def get_batches(pairwise_counts):
+        return (
+            [[[count, 10 - count], [10 - count, count]] for count in pairwise_counts],
+            [[[0, count], [10 - count, 0]] for count in pairwise_counts],
+            [10] * len(pairwise_counts)
+        )
+
+    # The same count in every batch, the precision of independent samples
+    precision = SolverUtils.calculate_sampler_precision(*get_batches([3] * 20))
+    assert precision == pytest.approx(100 * ((61 / 202) * (141 / 202) / 200) ** 0.5)
+
+    # All of them in the first 6 batches, as from a chain which barely moves, batch means are spread
+    correlated_precision = SolverUtils.calculate_sampler_precision(*get_batches([10] * 6 + [0] * 14))
+    assert correlated_precision == pytest.approx(100 * (20 / 19 * (6 * 7 ** 2 + 14 * 3 ** 2) / 200 ** 2) ** 0.5)
+    assert correlated_precision > 3 * precision
+
+    assert SolverUtils.calculate_sampler_precision(*get_batches([3] * (SolverUtils.MIN_NUMBER_OF_BATCHES - 1))) == float('inf')
+
+
+def test_calculate_the_most_representative_function_position(
+        performance_table_list_dummy,
+        alternatives_id_list_dummy,
+        criteria_list_dummy,
+        number_of_points_dummy
+):
+    problem, *_ = SolverUtils.calculate_the_most_representative_function(
+        performance_table_list=performance_table_list_dummy,
+        alternatives_id_list=alternatives_id_list_dummy,
+        comparisons=[],
+        criteria=criteria_list_dummy,
+        worst_best_position=[[0, 1, 1, []]],
+        number_of_points=number_of_points_dummy,
+        comprehensive_intensities=[],
+        sampler_on=False
+    )
+
+    variables_and_values_dict: Dict[str, float] = {variable.name: variable.varValue for variable in problem.variables()}
+    alternatives_and_utilities_dict: Dict[str, float] = SolverUtils.get_alternatives_and_utilities_dict(
+        variables_and_values_dict=variables_and_values_dict,
+        performance_table_list=performance_table_list_dummy,
+        alternatives_id_list=alternatives_id_list_dummy,
+    )
+
+    assert variables_and_values_dict['epsilon'] <= 1
+    assert max(alternatives_and_utilities_dict, key=alternatives_and_utilities_dict.get) == 'A'
+
+
+def get_sampler_metrics_dummy(sampler_core, performance_table_list, alternatives_id_list, positions, **kwargs):
+    return SolverUtils.get_sampler_metrics(
+        model=sampler_core.model,
+        performance_table_list=performance_table_list,
+        alternatives_id_list=alternatives_id_list,
+        sampler_path=None,
+        number_of_samples=20,
+        registry=sampler_core.registry,
+        positions=positions,
+        sampler='numpy',
+        **kwargs
+    )
+
+
+def test_get_sampler_metrics_rejection(
+        sampler_core_dummy,
+        performance_table_list_dummy,
+        alternatives_id_list_dummy,
+        drawn_batches_dummy
+):
+    # B is dominated by G, so it is never the best one and every sample is rejected
+    _, _, number_of_samples_used, _, _, sampler_error = get_sampler_metrics_dummy(
+        sampler_core_dummy, performance_table_list_dummy, alternatives_id_list_dummy, [[1, 1, 1]],
+        sampler_options={'seed': 1, 'thinning': 10}, max_number_of_drawn=150
+    )
+
+    # The batch after the first one is cut to the rest of the budget
+    assert drawn_batches_dummy == [20, 130]
+    assert number_of_samples_used is None
+    assert sampler_error == 'Rejection ratio to high'
+
+    drawn_batches_dummy.clear()
+    *_, sampler_error = get_sampler_metrics_dummy(
+        sampler_core_dummy, performance_table_list_dummy, alternatives_id_list_dummy, [[1, 1, 1]],
+        sampler_options={'seed': 1, 'thinning': 10}
+    )
+
+    # The default budget is 10 * number_of_samples
+    assert sum(drawn_batches_dummy) == 200
+    assert sampler_error == 'Rejection ratio to high'
+
+
+def test_get_sampler_metrics_number_of_drawn(
+        sampler_core_dummy,
+        performance_table_list_dummy,
+        alternatives_id_list_dummy,
+        drawn_batches_dummy
+):
+    # Most samples put D first, the second batch is sized by the acceptance rate of the first one
+    _, _, number_of_samples_used, _, chain_diagnostics, sampler_error = get_sampler_metrics_dummy(
+        sampler_core_dummy, performance_table_list_dummy, alternatives_id_list_dummy, [[3, 1, 1]],
+        sampler_options={'seed': 1, 'thinning': 10}
+    )
+
+    assert drawn_batches_dummy[0] == 20
+    assert len(drawn_batches_dummy) == 2
+    assert 0 < drawn_batches_dummy[1] < 20
+    assert number_of_samples_used == 20
+    assert chain_diagnostics[0]['number_of_drawn'] == sum(drawn_batches_dummy)
+    assert sampler_error == ''
+
+    drawn_batches_dummy.clear()
+    _, _, number_of_samples_used, _, chain_diagnostics, sampler_error = get_sampler_metrics_dummy(
+        sampler_core_dummy, performance_table_list_dummy, alternatives_id_list_dummy, [[6, 1, 1]],
+        sampler_options={'seed': 1, 'thinning': 10}
+    )
+
+    # Samples accepted with the last sample of the budget are used
+    assert sum(drawn_batches_dummy) == 200
+    assert number_of_samples_used == 20
+    assert chain_diagnostics[0]['number_of_drawn'] == 200
+    assert sampler_error == ''
+
+
+def test_get_sampler_metrics_chains(sampler_core_dummy, performance_table_list_dummy, alternatives_id_list_dummy):
+    _, _, number_of_samples_used, _, chain_diagnostics, _ = get_sampler_metrics_dummy(
+        sampler_core_dummy, performance_table_list_dummy, alternatives_id_list_dummy, [[3, 1, 1]],
+        sampler_options={'seed': 5, 'thinning': 10, 'number_of_chains': 3}
+    )
+
+    # Chain c starts from seed + c, every chain draws the same number of samples
+    assert [chain['seed'] for chain in chain_diagnostics] == [5, 6, 7]
+    assert len({chain['number_of_drawn'] for chain in chain_diagnostics}) == 1
+    assert all(chain['number_of_accepted'] <= chain['number_of_drawn'] for chain in chain_diagnostics)
+    assert sum(chain['number_of_accepted'] for chain in chain_diagnostics) == number_of_samples_used == 20
+
+
+def test_get_sampler_metrics_sample_store(
+        tmp_path,
+        sampler_core_dummy,
+        performance_table_list_dummy,
+        alternatives_id_list_dummy
+):
+    sample_store = SampleStore(str(tmp_path / 'store'))
+    position_percentage, _, number_of_samples_used, _, chain_diagnostics, _ = get_sampler_metrics_dummy(
+        sampler_core_dummy, performance_table_list_dummy, alternatives_id_list_dummy, [],
+        sampler_options={'seed': 5, 'thinning': 10, 'number_of_chains': 3}, sample_store=sample_store
+    )
+
+    # 3 chains draw 21 samples, the last one is cut off, the store is closed at the end
+    assert [chain['number_of_drawn'] for chain in chain_diagnostics] == [7, 7, 7]
+    assert number_of_samples_used == 20
+    assert sample_store.samples_map is None
+
+    sample_store = SampleStore.open(str(tmp_path / 'store'))
+    number_of_variables = sample_store.metadata['number_of_variables']
+
+    assert sample_store.number_of_samples == 20
+    assert sample_store.samples.shape == (20, number_of_variables)
+    assert os.path.getsize(tmp_path / 'store' / SampleStore.SAMPLES_FILE) == 20 * number_of_variables * 8
+    assert os.path.getsize(tmp_path / 'store' / SampleStore.CHAINS_FILE) == 20 * 4
+    assert np.bincount(sample_store.chains).tolist() == [chain['number_of_accepted'] for chain in chain_diagnostics]
+
+    # Statistics of the reopened store are the ones of the run
+    position_counts = sample_store.count_rankings(chunk_size=7).chain_position_counts.sum(axis=0)
+    for alternative_id, counts in zip(alternatives_id_list_dummy, position_counts.tolist()):
+        assert [100 * count / 20 for count in counts] == pytest.approx(position_percentage[alternative_id])
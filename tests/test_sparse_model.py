@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+from pulp import LpVariable, LpConstraintEQ, LpConstraintGE, LpConstraintLE
+
+from src.utagmsengine.utils.sparse_model import SparseModel
+
+
+@pytest.fixture()
+def sparse_model_dummy():
+    model = SparseModel()
+    model.add_column('epsilon')
+    model.add_column('u_0_1.0')
+    model.add_column('u_0_2.0')
+    model.add_column('v_0', 0, 1, integer=True)
+
+    model.add_row({1: 1.0}, 0, 0)
+    model.add_rows(
+        [0, 0, 0, 1, 1, 1, 1],
+        [2, 1, 0, 1, 2, 1, 3],
+        [1.0, -1.0, -1.0, 1.0, -1.0, -1.0, 1e20],
+        [0, -np.inf],
+        [np.inf, 1]
+    )
+
+    return model
+
+
+def test_add_column(sparse_model_dummy):
+    assert sparse_model_dummy.add_column('u_0_2.0') == 2
+    assert sparse_model_dummy.number_of_columns == 4
+    assert sparse_model_dummy.column_integer == [False, False, False, True]
+    assert sparse_model_dummy.column_lower[:2] == [-np.inf, -np.inf]
+
+
+def test_to_csr(sparse_model_dummy):
+    indptr, indices, data = sparse_model_dummy.to_csr()
+
+    assert indptr.tolist() == [0, 1, 4, 7]
+    assert indices.tolist() == [1, 0, 1, 2, 1, 2, 3]
+    # Entries summed to zero are kept
+    assert data.tolist() == [1.0, -1.0, -1.0, 1.0, 0.0, -1.0, 1e20]
+
+
+def test_get_row_bounds(sparse_model_dummy):
+    lower, upper = sparse_model_dummy.get_row_bounds()
+
+    assert lower.tolist() == [0, 0, -np.inf]
+    assert upper.tolist() == [0, np.inf, 1]
+
+
+def test_to_lp_constraints(sparse_model_dummy):
+    variables = [LpVariable('epsilon'), LpVariable('u_0_1.0'), LpVariable('u_0_2.0'), LpVariable('v_0', cat='Binary')]
+
+    constraints = sparse_model_dummy.to_lp_constraints(variables)
+
+    assert [constraint.sense for constraint in constraints] == [LpConstraintEQ, LpConstraintGE, LpConstraintLE]
+    assert str(constraints[1]) == str(variables[2] >= variables[1] + variables[0])
+    # Entries summed to zero are kept, as PuLP keeps them in u - u
+    assert dict(constraints[2].items()) == {variables[1]: 0.0, variables[2]: -1.0, variables[3]: 1e20}
+    assert constraints[2].constant == -1
+
+
+def test_add_lp_constraint():
+    model = SparseModel()
+    x = LpVariable('x', 0)
+    y = LpVariable('y', cat='Binary')
+
+    model.add_lp_constraint(2 * x + y <= 3)
+
+    assert model.column_names == ['x', 'y']
+    assert model.column_upper == [np.inf, 1]
+    assert model.get_row_bounds()[1].tolist() == [3]
@@ -0,0 +1,44 @@
+import pytest
+
+from src.utagmsengine.utils.utility_bounds import UtilityBounds
+from src.utagmsengine.utils.variable_registry import VariableRegistry
+
+
+@pytest.fixture()
+def performance_table_list_dummy():
+    return [[26.0, -7.0],
+            [2.0, 2.0],
+            [-7.5, 17.0],
+            [26.0, 2.0]]
+
+
+@pytest.fixture()
+def utility_bounds_dummy(performance_table_list_dummy):
+    registry = VariableRegistry.from_performance_table(performance_table_list_dummy, [3, 2])
+
+    return UtilityBounds(registry, performance_table_list_dummy, [True, False])
+
+
+def test_step_utilities(utility_bounds_dummy):
+    # Two steps of the gain criterion (at 9.25 and 26.0), one of the linear cost criterion
+    assert utility_bounds_dummy.step_criteria.tolist() == [0, 0, 1]
+    assert utility_bounds_dummy.step_utilities[0].tolist() == pytest.approx([1.0, 9.5 / 16.75, 0.0, 1.0])
+    assert utility_bounds_dummy.step_utilities[1].tolist() == [1.0, 0.0, 0.0, 1.0]
+    assert utility_bounds_dummy.step_utilities[2].tolist() == pytest.approx([1.0, 15 / 24, 0.0, 15 / 24])
+
+
+def test_get_maximum(utility_bounds_dummy):
+    assert utility_bounds_dummy.get_maximum([(1.0, 0, []), (-1.0, 3, [])]) == pytest.approx(9 / 24)
+    assert utility_bounds_dummy.get_maximum([(1.0, 1, [0]), (-1.0, 2, [0])]) == pytest.approx(9.5 / 16.75)
+
+    # Alternative 2 is dominated by alternative 1
+    assert utility_bounds_dummy.get_maximum([(1.0, 2, []), (-1.0, 1, [])]) == 0.0
+
+
+def test_get_big_m(utility_bounds_dummy):
+    # U(0) - U(3) >= 0 holds for every value function, U(3) - U(0) >= 0 does not
+    assert utility_bounds_dummy.get_big_m([(1.0, 0, []), (-1.0, 3, [])]) == 0.0
+    assert utility_bounds_dummy.get_big_m([(1.0, 3, []), (-1.0, 0, [])]) == pytest.approx(9 / 24)
+
+    assert utility_bounds_dummy.get_big_m([(1.0, 1, []), (-1.0, 2, [])], epsilon=0.0001) == 0.0001
+    assert UtilityBounds.negate([(1.0, 1, [0])]) == [(-1.0, 1, [0])]
@@ -0,0 +1,79 @@
+import pytest
+
+from src.utagmsengine.utils.variable_registry import VariableRegistry
+
+
+@pytest.fixture()
+def performance_table_list_dummy():
+    return [[26.0, -7.0],
+            [2.0, 2.0],
+            [-7.5, 17.0],
+            [26.0, 2.0]]
+
+
+@pytest.fixture()
+def registry_dummy(performance_table_list_dummy):
+    return VariableRegistry.from_performance_table(performance_table_list_dummy, [3, 2])
+
+
+def test_columns(registry_dummy):
+    assert registry_dummy.values == [[-7.5, 2.0, 9.25, 26.0], [-7.0, 2.0, 17.0]]
+    assert registry_dummy.number_of_columns == 7
+    assert registry_dummy.get_column(1, -7.0) == 4
+    assert registry_dummy.column_criterion == [0, 0, 0, 0, 1, 1, 1]
+    assert registry_dummy.characteristic == [True, False, True, True, True, False, True]
+
+
+def test_get_u_list_dict(registry_dummy):
+    u_list_dict = registry_dummy.get_u_list_dict()
+
+    # Performances in the order of their first appearance, then added characteristic points
+    assert list(u_list_dict[0].keys()) == [26.0, 2.0, -7.5, 9.25]
+    assert u_list_dict[1][17.0].name == 'u_1_17.0'
+
+
+def test_negative_values(registry_dummy):
+    # PuLP replaces '-' in names, values are kept in the registry
+    assert registry_dummy.get_variable(0, -7.5).name == 'u_0__7.5'
+    assert registry_dummy.column_value[registry_dummy.column_index['u_0__7.5']] == -7.5
+    assert [variable.name for variable in registry_dummy.get_criterion_variables(1)] == ['u_1__7.0', 'u_1_2.0', 'u_1_17.0']
+
+
+def test_get_surrounding_points(registry_dummy):
+    assert registry_dummy.get_surrounding_points(registry_dummy.get_column(0, 2.0)) == (-7.5, 9.25)
+    assert registry_dummy.get_surrounding_points(registry_dummy.get_column(1, 2.0)) == (-7.0, 17.0)
+
+
+def test_get_alternatives_columns(registry_dummy):
+    assert registry_dummy.get_alternatives_columns() == [[3, 4], [1, 5], [0, 6], [3, 5]]
+
+
+def test_from_performance_table(performance_table_list_dummy):
+    registry = VariableRegistry.from_performance_table(performance_table_list_dummy)
+
+    assert registry.values == [[-7.5, 2.0, 26.0], [-7.0, 2.0, 17.0]]
+    assert all(registry.characteristic)
+    assert registry.get_column_values({'u_0__7.5': 0.5, 'u_1_17.0': 0.25}) == [0.5, None, None, None, None, 0.25]
+
+
+def test_interpolation_arrays(registry_dummy):
+    assert registry_dummy.interpolated_columns.tolist() == [1, 5]
+    assert registry_dummy.lower_columns.tolist() == [0, 0, 2, 3, 4, 4, 6]
+    assert registry_dummy.upper_columns.tolist() == [0, 2, 2, 3, 4, 6, 6]
+
+
+def test_get_interpolation_constraints(registry_dummy):
+    constraints = registry_dummy.get_interpolation_constraints()
+
+    assert len(constraints) == 2
+    assert constraints[1].constant == 0
+    assert dict((variable.name, value) for variable, value in constraints[1].items()) == pytest.approx(
+        {'u_1_2.0': 1, 'u_1__7.0': -15 / 24, 'u_1_17.0': -9 / 24}
+    )
+
+
+def test_interpolate(registry_dummy):
+    column_values = registry_dummy.interpolate([0.0, None, 0.2, 0.5, 0.0, None, 0.4])
+
+    assert column_values.tolist()[:4] == [0.0, pytest.approx(0.2 * 9.5 / 16.75), 0.2, 0.5]
+    assert column_values[5] == pytest.approx(0.4 * 9 / 24)